@@ -0,0 +1,25 @@
+"""add_components_catalog_key_index
+
+Revision ID: 2b7e4c91d0a3
+Revises: 958f38a5c5d6
+Create Date: 2025-06-02 10:15:42.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b7e4c91d0a3'
+down_revision = '958f38a5c5d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Ключ сопоставления позиций фида с каталогом при массовой загрузке
+    op.create_index('ix_components_catalog_key', 'components', ['category_id', 'brand', 'model'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_components_catalog_key', table_name='components')
@@ -0,0 +1,84 @@
+"""price_history_partition_from_default
+
+Revision ID: 3f6a2c8e1b54
+Revises: e2b9470c1f58
+Create Date: 2025-06-12 11:37:20.504319
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6a2c8e1b54'
+down_revision = 'e2b9470c1f58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Если секция месяца создается с опозданием, его строки уже лежат в секции по умолчанию,
+    # и Postgres не даст создать секцию. Строки переносятся в новую секцию в той же транзакции;
+    # вставки в историю на это время блокируются
+    op.execute("""
+        CREATE OR REPLACE FUNCTION create_price_history_partition(month_date date) RETURNS text AS $$
+        DECLARE
+            month_start date := date_trunc('month', month_date)::date;
+            month_end date := (date_trunc('month', month_date) + interval '1 month')::date;
+            partition_name text := 'component_price_history_' || to_char(month_date, 'YYYY_MM');
+        BEGIN
+            IF to_regclass(partition_name) IS NOT NULL THEN
+                RETURN partition_name;
+            END IF;
+
+            LOCK TABLE component_price_history IN SHARE ROW EXCLUSIVE MODE;
+
+            IF EXISTS (
+                SELECT 1 FROM component_price_history_default
+                WHERE recorded_at >= month_start AND recorded_at < month_end
+            ) THEN
+                CREATE TEMP TABLE price_history_moved ON COMMIT DROP AS
+                SELECT * FROM component_price_history_default WITH NO DATA;
+
+                WITH moved AS (
+                    DELETE FROM component_price_history_default
+                    WHERE recorded_at >= month_start AND recorded_at < month_end
+                    RETURNING *
+                )
+                INSERT INTO price_history_moved SELECT * FROM moved;
+
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF component_price_history FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, month_end
+                );
+                INSERT INTO component_price_history OVERRIDING SYSTEM VALUE
+                SELECT * FROM price_history_moved;
+                DROP TABLE price_history_moved;
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF component_price_history FOR VALUES FROM (%L) TO (%L)',
+                    partition_name, month_start, month_end
+                );
+            END IF;
+
+            RETURN partition_name;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION create_price_history_partition(month_date date) RETURNS text AS $$
+        DECLARE
+            month_start date := date_trunc('month', month_date)::date;
+            partition_name text := 'component_price_history_' || to_char(month_date, 'YYYY_MM');
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF component_price_history FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + interval '1 month')::date
+            );
+            RETURN partition_name;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
@@ -0,0 +1,25 @@
+"""add_configuration_expected_delivery_date
+
+Revision ID: 7d3a5e2f8c61
+Revises: 2b7e4c91d0a3
+Create Date: 2025-06-04 14:02:17.530926
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3a5e2f8c61'
+down_revision = '2b7e4c91d0a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Ожидаемая дата поставки, пересчитывается вместе со статусом наличия
+    op.add_column('configurations', sa.Column('expected_delivery_date', sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('configurations', 'expected_delivery_date')
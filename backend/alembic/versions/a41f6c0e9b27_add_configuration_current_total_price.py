@@ -0,0 +1,25 @@
+"""add_configuration_current_total_price
+
+Revision ID: a41f6c0e9b27
+Revises: 7d3a5e2f8c61
+Create Date: 2025-06-05 11:37:50.204318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41f6c0e9b27'
+down_revision = '7d3a5e2f8c61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Стоимость по текущим ценам каталога (total_price считается по снимкам цен)
+    op.add_column('configurations', sa.Column('current_total_price', sa.Numeric(precision=10, scale=2), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('configurations', 'current_total_price')
@@ -0,0 +1,106 @@
+"""add_component_price_history
+
+Revision ID: c5e81d3b7a90
+Revises: a41f6c0e9b27
+Create Date: 2025-06-06 16:21:08.771045
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e81d3b7a90'
+down_revision = 'a41f6c0e9b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # История цен только дополняется и секционирована по месяцам
+    op.execute("""
+        CREATE TABLE component_price_history (
+            id bigint GENERATED ALWAYS AS IDENTITY,
+            component_id uuid NOT NULL REFERENCES components (id) ON DELETE CASCADE,
+            price numeric(10, 2) NOT NULL,
+            previous_price numeric(10, 2),
+            recorded_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, recorded_at)
+        ) PARTITION BY RANGE (recorded_at)
+    """)
+    op.execute("CREATE TABLE component_price_history_default PARTITION OF component_price_history DEFAULT")
+    op.execute("""
+        CREATE INDEX ix_component_price_history_component_recorded
+        ON component_price_history (component_id, recorded_at)
+    """)
+
+    # Секция на месяц, содержащий указанную дату
+    op.execute("""
+        CREATE OR REPLACE FUNCTION create_price_history_partition(month_date date) RETURNS text AS $$
+        DECLARE
+            month_start date := date_trunc('month', month_date)::date;
+            partition_name text := 'component_price_history_' || to_char(month_date, 'YYYY_MM');
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF component_price_history FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + interval '1 month')::date
+            );
+            RETURN partition_name;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Запись истории на уровне оператора: массовое обновление каталога дает один INSERT ... SELECT
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_component_price_insert() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO component_price_history (component_id, price)
+            SELECT id, price FROM new_rows WHERE price IS NOT NULL;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_component_price_update() RETURNS trigger AS $$
+        BEGIN
+            -- EXECUTE планирует запрос заново на каждый вызов: закешированный план для
+            -- обновления одной строки (nested loop) на массовом обновлении стал бы квадратичным
+            EXECUTE '
+                INSERT INTO component_price_history (component_id, price, previous_price)
+                SELECT n.id, n.price, o.price
+                FROM new_rows n
+                JOIN old_rows o ON o.id = n.id
+                WHERE n.price IS DISTINCT FROM o.price AND n.price IS NOT NULL
+            ';
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_components_price_history_insert
+        AFTER INSERT ON components
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION record_component_price_insert()
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_components_price_history_update
+        AFTER UPDATE ON components
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION record_component_price_update()
+    """)
+
+    # Секции на текущий и следующий месяцы, затем начальная точка истории для существующих цен
+    op.execute("SELECT create_price_history_partition((now() + make_interval(months => m))::date) FROM generate_series(0, 2) AS m")
+    op.execute("""
+        INSERT INTO component_price_history (component_id, price)
+        SELECT id, price FROM components WHERE price IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_components_price_history_update ON components")
+    op.execute("DROP TRIGGER IF EXISTS trg_components_price_history_insert ON components")
+    op.execute("DROP FUNCTION IF EXISTS record_component_price_update()")
+    op.execute("DROP FUNCTION IF EXISTS record_component_price_insert()")
+    op.execute("DROP FUNCTION IF EXISTS create_price_history_partition(date)")
+    op.drop_table('component_price_history')
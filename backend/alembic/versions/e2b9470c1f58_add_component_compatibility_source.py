@@ -0,0 +1,30 @@
+"""add_component_compatibility_source
+
+Revision ID: e2b9470c1f58
+Revises: c5e81d3b7a90
+Create Date: 2025-06-09 09:48:33.612850
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b9470c1f58'
+down_revision = 'c5e81d3b7a90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # computed - результат пакетного расчета матриц совместимости, manual - ручные исключения
+    op.add_column('component_compatibility', sa.Column('source', sa.String(length=20), server_default='manual', nullable=False))
+    # Пакетная запись через COPY идет без id
+    op.alter_column('component_compatibility', 'id', server_default=sa.text('gen_random_uuid()'))
+    op.create_index('ix_component_compatibility_source', 'component_compatibility', ['source'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_component_compatibility_source', table_name='component_compatibility')
+    op.alter_column('component_compatibility', 'id', server_default=None)
+    op.drop_column('component_compatibility', 'source')
@@ -0,0 +1,187 @@
+"""
+Команды обслуживания бэкенда.
+
+Запуск из каталога backend:
+    python -m app.cli import-catalog catalog.csv
+    python -m app.cli import-catalog feed.jsonl --format jsonl
+    python -m app.cli sync-stock snapshot.json --full
+    python -m app.cli recompute-availability
+    python -m app.cli reprice --keep-snapshots
+    python -m app.cli ensure-price-partitions
+    python -m app.cli compute-compatibility --pair cpu:motherboard
+    python -m app.cli generate-data --components 100000 --configurations 10000
+"""
+import argparse
+import json
+import logging
+import sys
+from typing import List, Optional
+from uuid import UUID
+from .database import SessionLocal
+from .schemas.stock import StockSnapshot
+from .services.catalog_import_service import CatalogImportService
+from .services.stock_sync_service import StockSyncService
+from .services.availability_service import AvailabilityService
+from .services.repricing_service import RepricingService
+from .services.price_history_service import PriceHistoryService
+from .services.compatibility_matrix_service import CompatibilityMatrixService
+from .services.data_generator import DataGenerator, DEFAULT_PREFIX
+
+
+def import_catalog(args: argparse.Namespace) -> int:
+    """Массовая загрузка каталога из CSV/JSONL файла"""
+    file_format = args.format
+    if file_format is None:
+        file_format = "jsonl" if args.path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+    with open(args.path, encoding="utf-8-sig", newline="") as stream, SessionLocal() as db:
+        result = CatalogImportService(db).import_stream(stream, file_format)
+        print(result.model_dump_json(indent=2))
+
+        if args.reprice and result.price_changed_component_ids:
+            repricing = RepricingService(db).reprice(result.price_changed_component_ids)
+            print(repricing.model_dump_json(indent=2))
+
+    return 1 if args.strict and result.rows_invalid else 0
+
+
+def sync_stock(args: argparse.Namespace) -> int:
+    """Синхронизация наличия со снимком склада (JSON список позиций или объект StockSnapshot)"""
+    with open(args.path, encoding="utf-8-sig") as stream:
+        payload = json.load(stream)
+
+    if isinstance(payload, list):
+        payload = {"items": payload}
+    if args.full:
+        payload["full"] = True
+    snapshot = StockSnapshot.model_validate(payload)
+
+    with SessionLocal() as db:
+        result = StockSyncService(db).sync(snapshot)
+        # В CLI фонового воркера нет - пересчитываем наличие конфигураций сразу
+        AvailabilityService(db).recompute_for_components(result.affected_component_ids)
+
+    print(result.model_dump_json(indent=2))
+    return 0
+
+
+def recompute_availability(args: argparse.Namespace) -> int:
+    """Пересчет статуса наличия всех конфигураций"""
+    with SessionLocal() as db:
+        stats = AvailabilityService(db, batch_size=args.batch_size).recompute_all()
+
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+def reprice(args: argparse.Namespace) -> int:
+    """Переоценка сохраненных конфигураций по текущим ценам каталога"""
+    with SessionLocal() as db:
+        result = RepricingService(db, batch_size=args.batch_size).reprice(
+            args.component_ids, keep_snapshots=args.keep_snapshots
+        )
+
+    print(result.model_dump_json(indent=2))
+    return 1 if result.skipped_configuration_ids else 0
+
+
+def ensure_price_partitions(args: argparse.Namespace) -> int:
+    """Создание секций истории цен на ближайшие месяцы"""
+    with SessionLocal() as db:
+        partitions = PriceHistoryService(db).ensure_partitions(args.months_ahead)
+
+    print("\n".join(partitions))
+    return 0
+
+
+def compute_compatibility(args: argparse.Namespace) -> int:
+    """Пересчет матриц совместимости пар категорий"""
+    pairs = None
+    if args.pairs:
+        pairs = [tuple(pair.split(":", 1)) for pair in args.pairs]
+
+    with SessionLocal() as db:
+        try:
+            stats = CompatibilityMatrixService(db).rebuild(pairs)
+        except ValueError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+def generate_data(args: argparse.Namespace) -> int:
+    """Генерация синтетического каталога и конфигураций для нагрузочных тестов"""
+    with SessionLocal() as db:
+        generator = DataGenerator(db, seed=args.seed, prefix=args.prefix)
+        stats = {}
+        if args.purge:
+            stats["purged"] = generator.purge()
+        if args.components:
+            stats["catalog"] = generator.generate_catalog(args.components)
+        if args.configurations:
+            try:
+                configuration_ids = generator.generate_configurations(args.configurations)
+            except ValueError as e:
+                print(str(e), file=sys.stderr)
+                return 1
+            stats["configurations"] = len(configuration_ids)
+            stats["availability"] = AvailabilityService(db).recompute_configurations(configuration_ids)
+
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Команды обслуживания бэкенда")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    catalog_parser = subparsers.add_parser("import-catalog", help="Загрузить каталог из CSV/JSONL")
+    catalog_parser.add_argument("path", help="Путь к файлу фида")
+    catalog_parser.add_argument("--format", choices=["csv", "jsonl"], help="Формат фида (по умолчанию по расширению)")
+    catalog_parser.add_argument("--strict", action="store_true", help="Код возврата 1, если есть невалидные строки")
+    catalog_parser.add_argument("--reprice", action="store_true", help="Переоценить конфигурации с изменившимися ценами")
+    catalog_parser.set_defaults(handler=import_catalog)
+
+    stock_parser = subparsers.add_parser("sync-stock", help="Синхронизировать наличие со снимком склада")
+    stock_parser.add_argument("path", help="Путь к JSON файлу снимка")
+    stock_parser.add_argument("--full", action="store_true", help="Полный снимок: отсутствующие позиции обнуляются")
+    stock_parser.set_defaults(handler=sync_stock)
+
+    availability_parser = subparsers.add_parser("recompute-availability", help="Пересчитать наличие всех конфигураций")
+    availability_parser.add_argument("--batch-size", type=int, help="Размер пачки конфигураций")
+    availability_parser.set_defaults(handler=recompute_availability)
+
+    reprice_parser = subparsers.add_parser("reprice", help="Переоценить конфигурации по текущим ценам")
+    reprice_parser.add_argument("--component-id", dest="component_ids", action="append", type=UUID,
+                                help="Компонент с измененной ценой (можно несколько; по умолчанию все конфигурации)")
+    reprice_parser.add_argument("--keep-snapshots", action="store_true", help="Не менять снимки цен, обновить текущую стоимость")
+    reprice_parser.add_argument("--batch-size", type=int, help="Размер пачки конфигураций")
+    reprice_parser.set_defaults(handler=reprice)
+
+    partitions_parser = subparsers.add_parser("ensure-price-partitions", help="Создать секции истории цен")
+    partitions_parser.add_argument("--months-ahead", type=int, help="Сколько месяцев наперед")
+    partitions_parser.set_defaults(handler=ensure_price_partitions)
+
+    compatibility_parser = subparsers.add_parser("compute-compatibility", help="Пересчитать матрицы совместимости")
+    compatibility_parser.add_argument("--pair", dest="pairs", action="append",
+                                      help="Пара категорий вида cpu:motherboard (можно несколько; по умолчанию все)")
+    compatibility_parser.set_defaults(handler=compute_compatibility)
+
+    generate_parser = subparsers.add_parser("generate-data", help="Сгенерировать синтетический каталог и конфигурации")
+    generate_parser.add_argument("--components", type=int, default=0, help="Количество компонентов")
+    generate_parser.add_argument("--configurations", type=int, default=0, help="Количество конфигураций")
+    generate_parser.add_argument("--seed", type=int, default=42, help="Seed генератора")
+    generate_parser.add_argument("--prefix", default=DEFAULT_PREFIX, help="Префикс моделей и названий конфигураций")
+    generate_parser.add_argument("--purge", action="store_true", help="Сначала удалить ранее сгенерированные данные")
+    generate_parser.set_defaults(handler=generate_data)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
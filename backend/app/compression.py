@@ -0,0 +1,134 @@
+"""
+Сжатие ответов (gzip, brotli).
+
+Кодировка выбирается по Accept-Encoding клиента; brotli используется, если
+установлен пакет brotli, иначе только gzip. Middleware сжимает ответы,
+отданные одним сообщением тела, начиная с COMPRESSION_MIN_SIZE байт; потоковые
+ответы и ответы, уже имеющие Content-Encoding (например, заранее сжатые записи
+кэша ответов), проходят как есть
+"""
+import gzip
+from typing import Dict, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from .config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli не установлен - только gzip
+    brotli = None
+
+# Кодировки в порядке предпочтения при равном q
+SUPPORTED_ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+_COMPRESSIBLE_TYPES = ("application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Кодировка из SUPPORTED_ENCODINGS с наибольшим q в Accept-Encoding; None - без сжатия"""
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """
+    Сжать тело ответа. level - уровень gzip (1-9) или качество brotli (0-11);
+    по умолчанию COMPRESSION_GZIP_LEVEL / COMPRESSION_BROTLI_QUALITY
+    """
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=level or settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(body, quality=level if level is not None else settings.COMPRESSION_BROTLI_QUALITY)
+    raise ValueError(f"Неподдерживаемая кодировка: {encoding}")
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith("text/") or media_type in _COMPRESSIBLE_TYPES or media_type.endswith("+json")
+
+
+class CompressionMiddleware:
+    """
+    Сжатие ответов по Accept-Encoding. Ответ начинает отправляться только после
+    первого сообщения тела: если оно единственное и достаточно большое, тело
+    сжимается и заголовки Content-Encoding, Content-Length и Vary дополняются
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            passthrough = True
+            headers = MutableHeaders(raw=list(start_message.get("headers", [])))
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type"))
+            ):
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            if "accept-encoding" not in headers.get("vary", "").lower():
+                headers.add_vary_header("Accept-Encoding")
+            if len(compressed) < len(body):
+                headers["content-encoding"] = encoding
+                headers["content-length"] = str(len(compressed))
+                body = compressed
+            await send({**start_message, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -26,6 +26,76 @@ class Settings(BaseSettings):
 
     PDF_TEMP_PATH: str = "/tmp/pc_configs"
 
+    # Пул процессов для CPU-нагруженных задач (None - по числу ядер)
+    PROCESS_POOL_WORKERS: Optional[int] = None
+
+    # Пакетный экспорт конфигураций
+    EXPORT_BATCH_MAX_SIZE: int = 100
+
+    # Импорт конфигураций из PDF
+    PDF_IMPORT_MAX_BYTES: int = 10 * 1024 * 1024
+    PDF_IMPORT_MAX_PAGES: int = 50
+    PDF_IMPORT_TOP_K: int = 3  # Количество кандидатов из каталога на каждую позицию
+
+    # Фоновый пересчет наличия конфигураций после изменения складских остатков
+    AVAILABILITY_WORKER_ENABLED: bool = True
+    AVAILABILITY_BATCH_SIZE: int = 1000
+    # Минимальная доля известных компонентов в полном снимке склада: иначе снимок из чужого
+    # пространства ID или устаревший фид обнулил бы наличие всего каталога
+    STOCK_SYNC_FULL_MIN_KNOWN_FRACTION: float = 0.5
+
+    # Переоценка конфигураций после изменения цен каталога
+    REPRICING_BATCH_SIZE: int = 500
+    REPRICING_LOCK_TIMEOUT_MS: int = 2000
+    REPRICING_MAX_RETRIES: int = 3
+
+    # История цен
+    PRICE_HISTORY_PARTITIONS_AHEAD: int = 2  # Секций наперед (по месяцам)
+    PRICE_HISTORY_MAX_POINTS: int = 400  # Максимум точек в ответе
+
+    # Индекс каталога в памяти (подбор сборок, альтернативы)
+    CATALOG_INDEX_TTL_SECONDS: int = 300
+    OPTIMIZER_TIME_LIMIT_MS: int = 800
+    COMPATIBILITY_ALTERNATIVES_LIMIT: int = 3  # Замен на каждый проблемный компонент
+
+    # Логирование: json или text; успешные запросы пишутся в журнал с долей ACCESS_LOG_SAMPLE_RATE
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_SLOW_MS: int = 1000  # Медленные запросы пишутся всегда
+
+    # Метрики Prometheus (/metrics)
+    METRICS_ENABLED: bool = True
+
+    # Учет SQL запросов на HTTP запрос; в DEBUG итоги в заголовках X-DB-*
+    QUERY_TRACKING_ENABLED: bool = True
+    QUERY_REPEAT_THRESHOLD: int = 10  # Одинаковых запросов на HTTP запрос - признак N+1
+
+    # Профилирование работающего процесса (/api/v1/debug/profile, заголовок X-Profile);
+    # без PROFILING_TOKEN доступ открыт, поэтому в production токен обязателен
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: Optional[str] = None
+    PROFILING_MAX_SECONDS: int = 60
+    PROFILING_KEEP_RESULTS: int = 20  # Профилей отдельных запросов в памяти
+
+    # Сжатие ответов (gzip, brotli при установленном пакете brotli) от COMPRESSION_MIN_SIZE байт
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Кэш ответов с заранее сжатыми телами (категории, варианты фильтров, публичные конфигурации)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    # Уровни сжатия записи при заполнении: выше, чем для сжатия на лету, но без brotli 11,
+    # который на больших конфигурациях занимает сотни миллисекунд на каждом промахе
+    RESPONSE_CACHE_GZIP_LEVEL: int = 9
+    RESPONSE_CACHE_BROTLI_QUALITY: int = 6
+
+    # Ручные исключения из правил совместимости (полная перезагрузка индекса в памяти)
+    COMPATIBILITY_OVERRIDES_TTL_SECONDS: int = 600
+
     @field_validator("CORS_ORIGINS", mode="before")
     @classmethod
     def split_cors(cls, v):
@@ -1,17 +1,27 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, PlainTextResponse
 from .config import settings
-from .database import engine, Base
-from .routers import components, configurations, categories, accessories
+from .database import engine, Base, SessionLocal
+from .routers import components, configurations, categories, accessories, stock, compatibility, profiling
+from .services.process_pool import shutdown_process_pool
+from .services.availability_service import availability_worker
+from .services.stock_sync_service import register_stock_change_listener
+from .services.price_history_service import PriceHistoryService
+from .services.catalog_index import invalidate_catalog_index
+from .services.response_cache import invalidate_catalog_responses
+from .compression import CompressionMiddleware
+from .routing import ApiPrefixRewriteMiddleware, find_shadowed_routes, top_segments
+from .monitoring.metrics import registry as metrics_registry
+from .monitoring.middleware import AccessLogMiddleware, MetricsMiddleware, QueryTrackingMiddleware
+from .monitoring.logging_config import setup_logging, shutdown_logging
+from .monitoring.profiling import RequestProfilingMiddleware
 import os
 import logging
-import time
-import traceback
 
 # Настройка логирования
-logging.basicConfig(level=logging.INFO)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
@@ -19,7 +29,8 @@ app = FastAPI(
     description="API для веб-конфигуратора персональных компьютеров",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Настройка CORS
@@ -31,39 +42,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Middleware для логирования запросов
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    
-    # Логируем входящий запрос
-    logger.info(f"🔵 {request.method} {request.url}")
-    
-    # Выполняем запрос
-    try:
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        
-        # Логируем ответ
-        if response.status_code >= 400:
-            logger.error(f"🔴 {request.method} {request.url} - {response.status_code} ({process_time:.3f}s)")
-        else:
-            logger.info(f"🟢 {request.method} {request.url} - {response.status_code} ({process_time:.3f}s)")
-        
-        return response
-    except Exception as e:
-        process_time = time.time() - start_time
-        logger.error(f"💥 {request.method} {request.url} - ERROR ({process_time:.3f}s): {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
-        return JSONResponse(
-            status_code=500,
-            content={"detail": f"Внутренняя ошибка сервера: {str(e)}"}
-        )
+# Сжатие ответов; заранее сжатые ответы кэша проходят без повторного сжатия
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Профиль отдельного запроса по заголовку X-Profile; выключенное профилирование ничего не стоит
+if settings.PROFILING_ENABLED:
+    app.add_middleware(RequestProfilingMiddleware)
+
+# Журнал запросов и ответ 500 на необработанные ошибки
+app.add_middleware(AccessLogMiddleware)
+
+# Метрики подключаются последними, чтобы быть внешним слоем и учитывать время всех остальных
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Учет SQL запросов снаружи метрик: статистику запроса заводит он, метрики ее читают
+if settings.QUERY_TRACKING_ENABLED:
+    app.add_middleware(QueryTrackingMiddleware)
 
 # Создание директории для PDF файлов
 os.makedirs(settings.PDF_TEMP_PATH, exist_ok=True)
 
-# Подключение статических файлов
+# Подключение статических файлов (каталога нет в репозитории - без него приложение не стартует вне Docker)
+os.makedirs("static", exist_ok=True)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Подключение роутеров
@@ -71,12 +73,21 @@ app.include_router(categories.router, prefix="/api/v1", tags=["Категори
 app.include_router(components.router, prefix="/api/v1", tags=["Компоненты"])
 app.include_router(configurations.router, prefix="/api/v1", tags=["Конфигурации"])
 app.include_router(accessories.router, prefix="/api/v1", tags=["Аксессуары"])
+app.include_router(stock.router, prefix="/api/v1", tags=["Наличие"])
+app.include_router(compatibility.router, prefix="/api/v1", tags=["Совместимость"])
+if settings.PROFILING_ENABLED:
+    app.include_router(profiling.router, prefix="/api/v1", tags=["Профилирование"])
 
-# Добавляем роутеры без префикса для совместимости с фронтендом
-app.include_router(categories.router, tags=["Категории (без префикса)"])
-app.include_router(components.router, tags=["Компоненты (без префикса)"])
-app.include_router(configurations.router, tags=["Конфигурации (без префикса)"])
-app.include_router(accessories.router, tags=["Аксессуары (без префикса)"])
+# Адреса без префикса (их использует фронтенд) переписываются на /api/v1, роутеры не подключаются повторно
+app.add_middleware(
+    ApiPrefixRewriteMiddleware,
+    prefix="/api/v1",
+    segments=top_segments(
+        route
+        for module in (categories, components, configurations, accessories, stock, compatibility)
+        for route in module.router.routes
+    ),
+)
 
 @app.get("/")
 async def root():
@@ -92,4 +103,45 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Проверка здоровья сервиса"""
-    return {"status": "ok", "environment": settings.ENVIRONMENT} 
\ No newline at end of file
+    return {"status": "ok", "environment": settings.ENVIRONMENT}
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Метрики в текстовом формате Prometheus"""
+        return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.on_event("startup")
+def check_routes():
+    """Предупреждение о маршрутах, перекрытых объявленными раньше маршрутами с параметрами"""
+    for shadowing, shadowed, methods in find_shadowed_routes(app.routes):
+        logger.warning(f"Маршрут {shadowed} ({', '.join(methods)}) недостижим: его перекрывает {shadowing}")
+
+
+@app.on_event("startup")
+def start_workers():
+    """Запуск фоновых воркеров"""
+    # Секции истории цен на ближайшие месяцы (entrypoint тоже создает их при старте контейнера)
+    try:
+        with SessionLocal() as db:
+            PriceHistoryService(db).ensure_partitions()
+    except Exception as e:
+        logger.warning(f"Не удалось создать секции истории цен: {e}")
+
+    # Индекс каталога в памяти и кэш ответов зависят от наличия
+    register_stock_change_listener(invalidate_catalog_index)
+    register_stock_change_listener(invalidate_catalog_responses)
+
+    if settings.AVAILABILITY_WORKER_ENABLED:
+        availability_worker.start()
+        register_stock_change_listener(availability_worker.enqueue)
+
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    """Остановка фоновых воркеров при завершении приложения"""
+    availability_worker.stop()
+    shutdown_process_pool()
+    shutdown_logging()
@@ -1,4 +1,4 @@
-from .component import Component, ComponentCategory, ComponentCompatibility, ComponentStock
+from .component import Component, ComponentCategory, ComponentCompatibility, ComponentStock, ComponentPriceHistory
 from .configuration import Configuration, ConfigurationItem, ConfigurationAccessory
 
 __all__ = [
@@ -6,6 +6,7 @@ __all__ = [
     "ComponentCategory", 
     "ComponentCompatibility",
     "ComponentStock",
+    "ComponentPriceHistory",
     "Configuration",
     "ConfigurationItem",
     "ConfigurationAccessory"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Date, Numeric
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, DateTime, Text, ForeignKey, Date, Numeric, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -54,6 +54,11 @@ class Component(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now())
     is_active = Column(Boolean, default=True)
     
+    # Ключ сопоставления с фидами поставщиков при массовой загрузке каталога
+    __table_args__ = (
+        Index("ix_components_catalog_key", "category_id", "brand", "model"),
+    )
+    
     # Связи
     stock = relationship("ComponentStock", back_populates="component", uselist=False)
     compatibility_as_component1 = relationship(
@@ -91,12 +96,13 @@ class ComponentCompatibility(Base):
     """Совместимость между компонентами"""
     __tablename__ = "component_compatibility"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, server_default=func.gen_random_uuid(), index=True)
     component1_id = Column(UUID(as_uuid=True), ForeignKey("components.id"), nullable=False, index=True)
     component2_id = Column(UUID(as_uuid=True), ForeignKey("components.id"), nullable=False, index=True)
     
     # Тип совместимости
     compatibility_type = Column(String(20), nullable=False)  # "compatible", "incompatible", "warning"
+    source = Column(String(20), nullable=False, server_default="manual")  # "computed", "manual"
     
     # Дополнительная информация
     notes = Column(Text)  # Комментарии о совместимости
@@ -104,4 +110,23 @@ class ComponentCompatibility(Base):
     
     # Связи
     component1 = relationship("Component", foreign_keys=[component1_id])
-    component2 = relationship("Component", foreign_keys=[component2_id]) 
\ No newline at end of file
+    component2 = relationship("Component", foreign_keys=[component2_id])
+
+
+class ComponentPriceHistory(Base):
+    """
+    История цен компонентов (только добавление, секции по месяцам).
+    Заполняется триггерами на components, секции создает create_price_history_partition()
+    """
+    __tablename__ = "component_price_history"
+    
+    id = Column(BigInteger, primary_key=True)
+    component_id = Column(UUID(as_uuid=True), ForeignKey("components.id", ondelete="CASCADE"), nullable=False)
+    price = Column(Numeric(precision=10, scale=2), nullable=False)
+    previous_price = Column(Numeric(precision=10, scale=2))
+    recorded_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_component_price_history_component_recorded", "component_id", "recorded_at"),
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
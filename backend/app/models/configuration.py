@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, Text, ForeignKey, Numeric
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -19,6 +19,8 @@ class Configuration(Base):
     
     # Общая стоимость
     total_price = Column(Numeric(precision=10, scale=2), default=0.0)
+    # Стоимость по текущим ценам каталога (обновляется задачей переоценки)
+    current_total_price = Column(Numeric(precision=10, scale=2))
     
     # Общее энергопотребление
     total_power_consumption = Column(Integer)
@@ -30,6 +32,7 @@ class Configuration(Base):
     
     # Статус наличия
     availability_status = Column(String(20), default="unknown")  # "available", "partial", "unavailable"
+    expected_delivery_date = Column(Date)  # Самая поздняя дата поступления компонентов
     
     # Статус конфигурации
     status = Column(String(20), default="draft")  # "draft", "completed", "exported"
@@ -42,8 +45,15 @@ class Configuration(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Связи
-    items = relationship("ConfigurationItem", back_populates="configuration")
-    accessories = relationship("ConfigurationAccessory", back_populates="configuration")
+    items = relationship("ConfigurationItem", back_populates="configuration", cascade="all, delete-orphan")
+    accessories = relationship("ConfigurationAccessory", back_populates="configuration", cascade="all, delete-orphan")
+
+    @property
+    def price_delta(self):
+        """Разница между текущей стоимостью и стоимостью по снимкам цен"""
+        if self.current_total_price is None:
+            return None
+        return self.current_total_price - (self.total_price or 0)
 
 
 class ConfigurationItem(Base):
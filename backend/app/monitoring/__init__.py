@@ -0,0 +1 @@
+"""Метрики, учет SQL запросов и диагностика работающего приложения"""
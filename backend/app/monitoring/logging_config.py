@@ -0,0 +1,90 @@
+"""
+Логирование приложения: записи через очередь (QueueHandler), форматирование и
+вывод в отдельном потоке (QueueListener), чтобы запись в stdout не блокировала
+цикл событий. Формат - JSON по строке на запись или обычный текст (LOG_FORMAT).
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from ..config import settings
+
+# ID текущего HTTP запроса, подставляется во все записи лога
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Стандартные атрибуты LogRecord, все остальное (extra=...) попадает в JSON как поля
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога одной строкой JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and value is not None:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _RequestQueueHandler(QueueHandler):
+    """
+    Кладет запись в очередь, предварительно добавив ID запроса (контекст есть
+    только в потоке, где записано сообщение). Сообщение и трассировка
+    подставляются здесь же, чтобы в очередь не уходили ссылки на аргументы и кадры стека
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.request_id = request_id_var.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging() -> None:
+    """Настроить корневой логгер; повторный вызов ничего не делает"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [_RequestQueueHandler(log_queue)]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Дописать оставшиеся в очереди записи и остановить поток вывода"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,242 @@
+"""
+Метрики в текстовом формате Prometheus.
+
+Реестр свой и минимальный: счетчики, гистограммы и датчики с метками, обновление -
+пара операций со словарем под блокировкой. Метрики живут в памяти процесса
+(приложение запускается одним процессом uvicorn).
+"""
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Границы корзин по умолчанию, как в клиентах Prometheus (секунды)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Монотонный счетчик; значения меток передаются позиционно"""
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Gauge(_Metric):
+    """Значение, которое может расти и уменьшаться"""
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        if not values and not self.labelnames:
+            values = [((), 0)]
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    """Гистограмма: счетчики по корзинам, сумма и количество наблюдений"""
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Для каждой комбинации меток: [счетчики корзин (последняя - +Inf), сумма, количество]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, *labels: str) -> "_Timer":
+        """Контекстный менеджер, измеряющий длительность блока"""
+        return _Timer(self, labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(state[0]), state[1], state[2]) for key, state in self._values.items()]
+
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "Количество HTTP запросов", ("method", "route", "status")
+))
+HTTP_REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "Длительность обработки HTTP запросов", ("method", "route")
+))
+HTTP_REQUESTS_IN_PROGRESS = registry.register(Gauge(
+    "http_requests_in_progress", "HTTP запросы в обработке"
+))
+HTTP_REQUEST_DB_QUERIES = registry.register(Histogram(
+    "http_request_db_queries", "Количество SQL запросов на один HTTP запрос", ("method", "route"),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+))
+HTTP_REQUEST_N_PLUS_ONE = registry.register(Counter(
+    "http_request_n_plus_one_total", "HTTP запросы с повторяющимися SQL запросами (признак N+1)", ("method", "route")
+))
+JOB_DURATION = registry.register(Histogram(
+    "app_job_duration_seconds", "Длительность импорта, экспорта и синхронизации", ("job",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+))
+JOB_FAILURES = registry.register(Counter(
+    "app_job_failures_total", "Импорты, экспорты и синхронизации, завершившиеся ошибкой", ("job",)
+))
+
+
+def timed_job(job: str) -> Callable:
+    """
+    Декоратор: длительность вызова в app_job_duration_seconds{job=...}.
+    Для генераторов измеряется полный проход (потоковые экспорты)
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                with _JobTimer(job):
+                    yield from func(*args, **kwargs)
+            return generator_wrapper
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with _JobTimer(job):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _JobTimer(job):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+class _JobTimer:
+    def __init__(self, job: str):
+        self.job = job
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        JOB_DURATION.observe(time.perf_counter() - self.started, self.job)
+        # Закрытие генератора на середине (клиент оборвал загрузку) ошибкой не считается
+        if exc_type is not None and exc_type is not GeneratorExit:
+            JOB_FAILURES.inc(self.job)
@@ -0,0 +1,190 @@
+"""ASGI middleware наблюдаемости: без обертки над Response, только перехват send"""
+import logging
+import random
+import time
+import uuid
+from starlette.responses import JSONResponse
+from ..config import settings
+from .metrics import (
+    HTTP_REQUESTS,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_PROGRESS,
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_N_PLUS_ONE
+)
+from .logging_config import request_id_var
+from .queries import current_stats, finish_request, start_tracking, stop_tracking
+
+access_logger = logging.getLogger("app.access")
+
+_MAX_REQUEST_ID_LENGTH = 128
+
+# Метка для запросов, не попавших ни в один маршрут (404), чтобы сырые URL не раздували число серий
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope) -> str:
+    """Шаблон пути маршрута (/api/v1/components/{component_id}), выставляется роутером в scope"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Количество, длительность и число SQL запросов по шаблонам маршрутов"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        # Статистику SQL обычно уже завел QueryTrackingMiddleware
+        stats, token = current_stats(), None
+        if stats is None:
+            stats, token = start_tracking()
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            if token is not None:
+                stop_tracking(token)
+
+            method = scope["method"]
+            route = route_template(scope)
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            HTTP_REQUEST_DURATION.observe(elapsed, method, route)
+            HTTP_REQUEST_DB_QUERIES.observe(stats.count, method, route)
+
+
+class QueryTrackingMiddleware:
+    """
+    Счетчик и время SQL запросов на HTTP запрос, поиск повторяющихся запросов (N+1).
+    В режиме DEBUG итоги отдаются в заголовках ответа X-DB-Query-Count,
+    X-DB-Query-Time-Ms и X-DB-N-Plus-One (число форм запросов, повторенных
+    не меньше QUERY_REPEAT_THRESHOLD раз на момент отправки заголовков)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_tracking()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-query-time-ms", f"{stats.duration * 1000:.1f}".encode()))
+                repeated = len(stats.repeated())
+                if repeated:
+                    headers.append((b"x-db-n-plus-one", str(repeated).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stop_tracking(token)
+            route = route_template(scope)
+            if finish_request(route, stats):
+                HTTP_REQUEST_N_PLUS_ONE.inc(scope["method"], route)
+
+
+class AccessLogMiddleware:
+    """
+    Журнал запросов: одна структурированная запись на запрос (метод, путь, маршрут,
+    статус, длительность, ID запроса). Успешные быстрые запросы пишутся с долей
+    ACCESS_LOG_SAMPLE_RATE, ошибки и медленные (дольше ACCESS_LOG_SLOW_MS) - всегда.
+    ID берется из X-Request-ID клиента или создается и возвращается в том же заголовке.
+    Необработанное исключение превращается в JSON ответ 500
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope) or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", request_id.encode())]}
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            access_logger.error(
+                "Необработанная ошибка: %s", e, exc_info=True,
+                extra=_access_fields(scope, 500, elapsed)
+            )
+            # Ответ уже начат - остается только оборвать соединение
+            if status_code is not None:
+                raise
+            response = JSONResponse(status_code=500, content={"detail": f"Внутренняя ошибка сервера: {str(e)}"})
+            await response(scope, receive, send_wrapper)
+        else:
+            elapsed = time.perf_counter() - started
+            status_code = status_code or 500
+            if (
+                status_code >= 400
+                or elapsed * 1000 >= settings.ACCESS_LOG_SLOW_MS
+                or random.random() < settings.ACCESS_LOG_SAMPLE_RATE
+            ):
+                level = logging.ERROR if status_code >= 500 else logging.WARNING if status_code >= 400 else logging.INFO
+                if access_logger.isEnabledFor(level):
+                    access_logger.log(
+                        level, "%s %s %s %.1f мс", scope["method"], scope["path"], status_code, elapsed * 1000,
+                        extra=_access_fields(scope, status_code, elapsed)
+                    )
+        finally:
+            request_id_var.reset(token)
+
+
+def _incoming_request_id(scope):
+    for name, value in scope["headers"]:
+        if name == b"x-request-id":
+            value = value.decode("latin-1")
+            # Чужой ID принимается, только если он короткий и без управляющих символов
+            if 0 < len(value) <= _MAX_REQUEST_ID_LENGTH and value.isprintable():
+                return value
+            return None
+    return None
+
+
+def _access_fields(scope, status_code: int, elapsed: float) -> dict:
+    client = scope.get("client")
+    return {
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": route_template(scope),
+        "status": status_code,
+        "duration_ms": round(elapsed * 1000, 2),
+        "client": client[0] if client else None,
+    }
@@ -0,0 +1,175 @@
+"""
+Профилирование работающего процесса (включается PROFILING_ENABLED).
+
+- Сэмплирующий профайлер: отдельный поток раз в interval снимает стеки всех потоков
+  через sys._current_frames() и копит их в формате folded stacks
+  (flamegraph.pl, speedscope, inferno). Накладные расходы есть только пока идет съемка.
+- Профиль одного запроса: при заголовке X-Profile запрос выполняется под cProfile,
+  результат сохраняется в памяти и отдается файлом .prof (snakeviz, flameprof)
+"""
+import cProfile
+import hmac
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Tuple
+from ..config import settings
+
+
+class ProfilerBusyError(RuntimeError):
+    """Профайлер уже занят другой съемкой"""
+
+
+_sampling_lock = threading.Lock()
+_request_lock = threading.Lock()
+
+
+def _frame_label(code, labels: Dict[object, str]) -> str:
+    label = labels.get(code)
+    if label is None:
+        label = labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label
+
+
+def sample_stacks(seconds: float, interval: float) -> Tuple[str, int]:
+    """
+    Снимать стеки всех потоков процесса seconds секунд с шагом interval.
+    Возвращает folded stacks («поток;внешний;...;внутренний количество») и число срезов.
+    Выполняется в вызывающем потоке, его собственный стек в профиль не попадает
+    """
+    if not _sampling_lock.acquire(blocking=False):
+        raise ProfilerBusyError("Профилирование уже идет")
+
+    try:
+        own_thread = threading.get_ident()
+        labels: Dict[object, str] = {}
+        stacks: Counter = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code, labels))
+                    frame = frame.f_back
+                stack.append(thread_names.get(thread_id, str(thread_id)))
+                stacks[";".join(reversed(stack))] += 1
+            samples += 1
+            time.sleep(interval)
+    finally:
+        _sampling_lock.release()
+
+    folded = "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+    return folded + "\n", samples
+
+
+class RequestProfiles:
+    """Последние профили отдельных запросов (ID -> данные pstats), не больше limit"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._profiles: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: cProfile.Profile) -> str:
+        profile.create_stats()
+        data = marshal.dumps(profile.stats)
+        profile_id = uuid.uuid4().hex
+        with self._lock:
+            self._profiles[profile_id] = data
+            while len(self._profiles) > self.limit:
+                self._profiles.popitem(last=False)
+        return profile_id
+
+    def get(self, profile_id: str) -> Optional[bytes]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def summary(self, profile_id: str, limit: int = 40) -> Optional[str]:
+        """Текстовая сводка профиля: функции по суммарному времени"""
+        data = self.get(profile_id)
+        if data is None:
+            return None
+        stats = pstats.Stats(_MarshalledStats(data), stream=io.StringIO())
+        stats.sort_stats("cumulative").print_stats(limit)
+        return stats.stream.getvalue()
+
+
+class _MarshalledStats:
+    """Источник для pstats.Stats из сохраненных данных без временного файла"""
+
+    def __init__(self, data: bytes):
+        self.stats = marshal.loads(data)
+
+    def create_stats(self):
+        pass
+
+
+request_profiles = RequestProfiles(settings.PROFILING_KEEP_RESULTS)
+
+
+def check_token(token: Optional[str]) -> bool:
+    """Пустой PROFILING_TOKEN - доступ без токена (только для локальной отладки)"""
+    if not settings.PROFILING_TOKEN:
+        return True
+    return token is not None and hmac.compare_digest(token, settings.PROFILING_TOKEN)
+
+
+class RequestProfilingMiddleware:
+    """
+    Запрос с заголовком X-Profile (и X-Profile-Token, если задан PROFILING_TOKEN) выполняется
+    под cProfile; ID сохраненного профиля возвращается в заголовке X-Profile-Id.
+    cProfile видит только поток цикла событий, поэтому в профиль попадают и другие
+    запросы, обработанные в это же время; одновременно профилируется один запрос
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not _request_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile = cProfile.Profile()
+        stored = False
+
+        async def send_wrapper(message):
+            nonlocal stored
+            if message["type"] == "http.response.start":
+                # Профиль закрывается до отправки ответа, чтобы клиент сразу мог его скачать
+                profile.disable()
+                profile_id = request_profiles.add(profile)
+                stored = True
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        try:
+            profile.enable()
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not stored:
+                profile.disable()
+            _request_lock.release()
+
+    @staticmethod
+    def _requested(scope) -> bool:
+        headers = dict(scope["headers"])
+        if b"x-profile" not in headers:
+            return False
+        token = headers.get(b"x-profile-token")
+        return check_token(token.decode("latin-1") if token is not None else None)
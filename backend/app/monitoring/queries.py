@@ -0,0 +1,140 @@
+"""
+Учет SQL запросов в рамках HTTP запроса.
+
+Middleware создает QueryStats и кладет его в contextvar; обработчики событий
+SQLAlchemy считают запросы, их время и повторы одинаковых по форме запросов
+(признак N+1). Контекст копируется в потоки run_in_threadpool и в синхронные
+обработчики, поэтому сам объект статистики изменяемый и общий.
+"""
+import re
+import time
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Ключ в info соединения для времени начала запросов (стек на случай вложенных вызовов)
+_STARTED_KEY = "query_started_at"
+
+# Параметры (%(id_1)s, %(id_1_3)s) и раскрытые списки IN любой длины, включая
+# одноэлементные, приводятся к одной форме
+_PARAM_RE = re.compile(r"%\([^)]+\)s")
+_LIST_RE = re.compile(r"\(\?(?:, \?)*\)")
+
+
+def statement_shape(statement: str) -> str:
+    """Форма запроса без значений параметров: одинаковая для всех ленивых загрузок одной связи"""
+    return _LIST_RE.sub("(?...)", _PARAM_RE.sub("?", statement))
+
+
+class QueryStats:
+    """Статистика SQL запросов одного HTTP запроса (или блока assert_max_queries)"""
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def repeated(self, threshold: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Формы запросов, выполненные не меньше threshold раз (кандидаты в N+1)"""
+        threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        return [(shape, count) for shape, count in self.shapes().most_common() if count >= threshold]
+
+    def shapes(self) -> Counter:
+        shapes: Counter = Counter()
+        for statement, count in self.statements.items():
+            shapes[statement_shape(statement)] += count
+        return shapes
+
+    def summary(self) -> str:
+        lines = [f"{self.count} запросов за {self.duration * 1000:.1f} мс"]
+        for shape, count in self.shapes().most_common(5):
+            lines.append(f"  {count} x {shape[:200]}")
+        return "\n".join(lines)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+# Сборщики статистики завершенных HTTP запросов (assert_max_queries в тестах)
+_collectors: List[List[Tuple[str, QueryStats]]] = []
+
+
+def start_tracking() -> Tuple[QueryStats, Token]:
+    stats = QueryStats()
+    return stats, _current_stats.set(stats)
+
+
+def stop_tracking(token: Token) -> None:
+    _current_stats.reset(token)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+def finish_request(route: str, stats: QueryStats) -> int:
+    """
+    Итоги HTTP запроса: предупреждение в лог о повторяющихся запросах и передача
+    статистики сборщикам. Возвращает число форм запросов с признаками N+1
+    """
+    repeated = stats.repeated()
+    for shape, count in repeated:
+        logger.warning(f"Возможный N+1 в {route}: {count} одинаковых запросов: {shape[:300]}")
+    for collector in _collectors:
+        collector.append((route, stats))
+    return len(repeated)
+
+
+@contextmanager
+def assert_max_queries(limit: int, allow_repeats: bool = False) -> Iterator[List[Tuple[str, QueryStats]]]:
+    """
+    Проверка в тестах: ни один HTTP запрос внутри блока (через TestClient) и сам блок
+    при прямом вызове сервисов не выполняет больше limit SQL запросов;
+    без allow_repeats повторяющиеся формы запросов тоже считаются ошибкой.
+
+        with assert_max_queries(3):
+            client.get("/api/v1/components")
+    """
+    collected: List[Tuple[str, QueryStats]] = []
+    _collectors.append(collected)
+    stats, token = start_tracking()
+    try:
+        yield collected
+    finally:
+        stop_tracking(token)
+        _collectors.remove(collected)
+
+    if stats.count:
+        collected.append(("<вне HTTP запроса>", stats))
+    for route, request_stats in collected:
+        if request_stats.count > limit:
+            raise AssertionError(f"{route}: больше {limit} SQL запросов\n{request_stats.summary()}")
+        if not allow_repeats and request_stats.repeated():
+            raise AssertionError(f"{route}: повторяющиеся SQL запросы (N+1)\n{request_stats.summary()}")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None:
+        conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    started = conn.info.get(_STARTED_KEY)
+    if started:
+        stats.duration += time.perf_counter() - started.pop()
+    stats.count += 1
+    # Форма считается лениво (в repeated), здесь только счетчик по тексту запроса
+    stats.statements[statement] += 1
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_
 from typing import List, Optional
 from ..database import get_db
 from ..models import Component, ComponentCategory, ComponentStock
 from ..schemas.component import ComponentResponse, ComponentFilter
+from ..services.component_projection import ComponentListResponse, parse_fields
+from ..services.response_cache import CATALOG_TAG, response_cache
 
 router = APIRouter()
 
@@ -20,10 +22,16 @@ async def get_accessories(
     search: Optional[str] = Query(None, description="Поиск по названию/модели"),
     page: int = Query(1, ge=1, description="Номер страницы"),
     limit: int = Query(20, ge=1, le=100, description="Количество на странице"),
+    fields: Optional[str] = Query(None, description="Поля ответа через запятую или набор: full (по умолчанию), card"),
     db: Session = Depends(get_db)
 ):
     """Получить аксессуары с фильтрацией"""
     
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     # Получаем категорию аксессуаров
     accessories_category = db.query(ComponentCategory).filter(
         ComponentCategory.slug == "accessories"
@@ -32,10 +40,7 @@ async def get_accessories(
     if not accessories_category:
         raise HTTPException(status_code=404, detail="Категория аксессуаров не найдена")
     
-    query = db.query(Component).options(
-        joinedload(Component.category),
-        joinedload(Component.stock)
-    ).filter(
+    query = projection.query(db).filter(
         Component.category_id == accessories_category.id,
         Component.is_active == True
     )
@@ -56,7 +61,7 @@ async def get_accessories(
     
     # Фильтр по наличию
     if only_in_stock:
-        query = query.join(ComponentStock).filter(ComponentStock.status == "in_stock")
+        query = query.filter(ComponentStock.status == "in_stock")
     
     # Фильтр по типу подключения
     if connection:
@@ -73,33 +78,20 @@ async def get_accessories(
     
     # Пагинация
     offset = (page - 1) * limit
-    accessories = query.offset(offset).limit(limit).all()
-    
-    return accessories
-
-
-@router.get("/accessories/{accessory_id}", response_model=ComponentResponse)
-async def get_accessory(accessory_id: str, db: Session = Depends(get_db)):
-    """Получить аксессуар по ID"""
-    accessory = db.query(Component).options(
-        joinedload(Component.category),
-        joinedload(Component.stock)
-    ).filter(Component.id == accessory_id).first()
-    
-    if not accessory:
-        raise HTTPException(status_code=404, detail="Аксессуар не найден")
-    
-    # Проверяем, что это действительно аксессуар
-    if accessory.category.slug != "accessories":
-        raise HTTPException(status_code=400, detail="Компонент не является аксессуаром")
+    rows = query.offset(offset).limit(limit).all()
     
-    return accessory
+    return ComponentListResponse(projection.to_dicts(rows))
 
 
 @router.get("/accessories/filters/options")
-async def get_accessories_filter_options(db: Session = Depends(get_db)):
+async def get_accessories_filter_options(request: Request, db: Session = Depends(get_db)):
     """Получить доступные опции для фильтров аксессуаров"""
-    
+    return response_cache.respond(
+        request, "accessories/filters/options", [CATALOG_TAG], lambda: _accessories_filter_options(db)
+    )
+
+
+def _accessories_filter_options(db: Session) -> dict:
     # Получаем категорию аксессуаров
     accessories_category = db.query(ComponentCategory).filter(
         ComponentCategory.slug == "accessories"
@@ -135,9 +127,14 @@ async def get_accessories_filter_options(db: Session = Depends(get_db)):
 
 
 @router.get("/accessories/categories")
-async def get_accessories_categories(db: Session = Depends(get_db)):
+async def get_accessories_categories(request: Request, db: Session = Depends(get_db)):
     """Получить категории аксессуаров (типы)"""
-    
+    return response_cache.respond(
+        request, "accessories/categories", [CATALOG_TAG], lambda: _accessories_categories(db)
+    )
+
+
+def _accessories_categories(db: Session) -> list:
     # Получаем категорию аксессуаров
     accessories_category = db.query(ComponentCategory).filter(
         ComponentCategory.slug == "accessories"
@@ -178,4 +175,22 @@ async def get_accessories_categories(db: Session = Depends(get_db)):
             "count": count
         })
     
-    return sorted(categories, key=lambda x: x["name"]) 
\ No newline at end of file
+    return sorted(categories, key=lambda x: x["name"]) 
+
+
+@router.get("/accessories/{accessory_id}", response_model=ComponentResponse)
+async def get_accessory(accessory_id: str, db: Session = Depends(get_db)):
+    """Получить аксессуар по ID"""
+    accessory = db.query(Component).options(
+        joinedload(Component.category),
+        joinedload(Component.stock)
+    ).filter(Component.id == accessory_id).first()
+    
+    if not accessory:
+        raise HTTPException(status_code=404, detail="Аксессуар не найден")
+    
+    # Проверяем, что это действительно аксессуар
+    if accessory.category.slug != "accessories":
+        raise HTTPException(status_code=400, detail="Компонент не является аксессуаром")
+    
+    return accessory
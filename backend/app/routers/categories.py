@@ -1,18 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
 from ..models import ComponentCategory
 from ..schemas.component import ComponentCategoryCreate, ComponentCategoryResponse
+from ..services.response_cache import CATALOG_TAG, response_cache
 
 router = APIRouter()
 
 
 @router.get("/categories", response_model=List[ComponentCategoryResponse])
-async def get_categories(db: Session = Depends(get_db)):
+async def get_categories(request: Request, db: Session = Depends(get_db)):
     """Получить все категории компонентов"""
-    categories = db.query(ComponentCategory).order_by(ComponentCategory.order_priority).all()
-    return categories
+    def build():
+        categories = db.query(ComponentCategory).order_by(ComponentCategory.order_priority).all()
+        return [ComponentCategoryResponse.model_validate(category) for category in categories]
+
+    return response_cache.respond(request, "categories", [CATALOG_TAG], build)
 
 
 @router.get("/categories/{category_id}", response_model=ComponentCategoryResponse)
@@ -0,0 +1,124 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_
+from typing import List, Optional
+from uuid import UUID
+from ..database import get_db
+from ..models import Component, ComponentCompatibility
+from ..schemas.compatibility import (
+    CompatibilityVerdict,
+    CompatibilityOverrideCreate,
+    CompatibilityOverrideUpdate,
+    CompatibilityOverrideResponse
+)
+
+router = APIRouter()
+
+
+def _get_manual_override(override_id: UUID, db: Session) -> ComponentCompatibility:
+    override = db.query(ComponentCompatibility).filter(
+        ComponentCompatibility.id == override_id,
+        ComponentCompatibility.source == "manual"
+    ).first()
+
+    if not override:
+        raise HTTPException(status_code=404, detail="Исключение совместимости не найдено")
+
+    return override
+
+
+@router.get("/compatibility/overrides", response_model=List[CompatibilityOverrideResponse])
+async def get_compatibility_overrides(
+    component_id: Optional[UUID] = Query(None, description="Исключения с участием компонента"),
+    compatibility_type: Optional[CompatibilityVerdict] = Query(None, description="Фильтр по вердикту"),
+    page: int = Query(1, ge=1, description="Номер страницы"),
+    limit: int = Query(50, ge=1, le=500, description="Количество на странице"),
+    db: Session = Depends(get_db)
+):
+    """Ручные исключения из правил совместимости"""
+    query = db.query(ComponentCompatibility).filter(ComponentCompatibility.source == "manual")
+
+    if component_id:
+        query = query.filter(or_(
+            ComponentCompatibility.component1_id == component_id,
+            ComponentCompatibility.component2_id == component_id
+        ))
+
+    if compatibility_type:
+        query = query.filter(ComponentCompatibility.compatibility_type == compatibility_type.value)
+
+    offset = (page - 1) * limit
+    return query.order_by(ComponentCompatibility.created_at.desc()).offset(offset).limit(limit).all()
+
+
+@router.post("/compatibility/overrides", response_model=CompatibilityOverrideResponse)
+async def create_compatibility_override(
+    override_data: CompatibilityOverrideCreate,
+    db: Session = Depends(get_db)
+):
+    """Добавить ручное исключение для пары компонентов"""
+    if override_data.component1_id == override_data.component2_id:
+        raise HTTPException(status_code=400, detail="Исключение задается для двух разных компонентов")
+
+    found = db.query(Component.id).filter(
+        Component.id.in_([override_data.component1_id, override_data.component2_id])
+    ).count()
+    if found != 2:
+        raise HTTPException(status_code=404, detail="Компонент не найден")
+
+    # Одна ручная запись на пару, в любом порядке компонентов
+    existing = db.query(ComponentCompatibility.id).filter(
+        ComponentCompatibility.source == "manual",
+        or_(
+            and_(ComponentCompatibility.component1_id == override_data.component1_id,
+                 ComponentCompatibility.component2_id == override_data.component2_id),
+            and_(ComponentCompatibility.component1_id == override_data.component2_id,
+                 ComponentCompatibility.component2_id == override_data.component1_id)
+        )
+    ).first()
+    if existing:
+        raise HTTPException(status_code=400, detail=f"Для этой пары уже есть исключение {existing.id}")
+
+    override = ComponentCompatibility(
+        component1_id=override_data.component1_id,
+        component2_id=override_data.component2_id,
+        compatibility_type=override_data.compatibility_type.value,
+        source="manual",
+        notes=override_data.notes
+    )
+    db.add(override)
+    db.commit()
+    db.refresh(override)
+
+    return override
+
+
+@router.put("/compatibility/overrides/{override_id}", response_model=CompatibilityOverrideResponse)
+async def update_compatibility_override(
+    override_id: UUID,
+    override_data: CompatibilityOverrideUpdate,
+    db: Session = Depends(get_db)
+):
+    """Изменить вердикт или комментарий исключения"""
+    override = _get_manual_override(override_id, db)
+
+    if override_data.compatibility_type is not None:
+        override.compatibility_type = override_data.compatibility_type.value
+    if override_data.notes is not None:
+        override.notes = override_data.notes
+
+    db.commit()
+    db.refresh(override)
+
+    return override
+
+
+@router.delete("/compatibility/overrides/{override_id}")
+async def delete_compatibility_override(override_id: UUID, db: Session = Depends(get_db)):
+    """Удалить исключение совместимости"""
+    override = _get_manual_override(override_id, db)
+
+    db.delete(override)
+    db.commit()
+
+    return {"message": "Исключение совместимости удалено"}
@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, select, union
 from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
 from ..database import get_db
-from ..models import Component, ComponentCategory, ComponentStock
-from ..schemas.component import ComponentResponse, ComponentFilter
+from ..models import Component, ComponentCategory, ComponentStock, ComponentCompatibility
+from ..schemas.component import ComponentResponse, ComponentFilter, CatalogFeedFormat, CatalogImportResult
 from ..schemas.configuration import CompatibilityCheck
+from ..schemas.price_history import PriceHistoryBucket, ComponentPriceHistoryResponse
 from ..services.compatibility_service import CompatibilityService
+from ..services.catalog_import_service import CatalogImportService
+from ..services.component_projection import ComponentListResponse, parse_fields
+from ..services.price_history_service import PriceHistoryService
+from ..services.response_cache import CATALOG_TAG, response_cache
+import io
 import uuid
 
 router = APIRouter()
@@ -27,18 +36,21 @@ async def get_components(
     interface: Optional[List[str]] = Query(None, description="Фильтр по интерфейсу"),
     page: int = Query(1, ge=1, description="Номер страницы"),
     limit: int = Query(20, ge=1, le=100, description="Количество на странице"),
+    fields: Optional[str] = Query(None, description="Поля ответа через запятую или набор: full (по умолчанию), card"),
     db: Session = Depends(get_db)
 ):
     """Получить компоненты с фильтрацией"""
     
-    query = db.query(Component).options(
-        joinedload(Component.category),
-        joinedload(Component.stock)
-    ).filter(Component.is_active == True)
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    query = projection.query(db).filter(Component.is_active == True)
     
     # Фильтр по категории
     if category_slug:
-        query = query.join(ComponentCategory).filter(ComponentCategory.slug == category_slug)
+        query = query.filter(ComponentCategory.slug == category_slug)
     
     # Фильтр по бренду
     if brand:
@@ -52,7 +64,7 @@ async def get_components(
     
     # Фильтр по наличию
     if only_in_stock:
-        query = query.join(ComponentStock).filter(ComponentStock.status == "in_stock")
+        query = query.filter(ComponentStock.status == "in_stock")
     
     # Фильтр по форм-фактору
     if form_factor:
@@ -90,9 +102,85 @@ async def get_components(
     
     # Пагинация
     offset = (page - 1) * limit
-    components = query.offset(offset).limit(limit).all()
+    rows = query.offset(offset).limit(limit).all()
     
-    return components
+    return ComponentListResponse(projection.to_dicts(rows))
+
+
+@router.get("/components/debug/ids")
+async def get_all_component_ids(db: Session = Depends(get_db)):
+    """Получить все ID компонентов для отладки"""
+    components = db.query(Component.id, Component.name, Component.brand, Component.is_active).all()
+    
+    return {
+        "total_count": len(components),
+        "active_count": len([c for c in components if c.is_active]),
+        "components": [
+            {
+                "id": str(comp.id),
+                "name": comp.name,
+                "brand": comp.brand,
+                "is_active": comp.is_active
+            }
+            for comp in components
+        ]
+    }
+
+
+@router.get("/components/filters/options")
+async def get_filter_options(
+    request: Request,
+    category_slug: Optional[str] = Query(None, description="Категория для фильтров"),
+    db: Session = Depends(get_db)
+):
+    """Получить доступные варианты для фильтров"""
+    return response_cache.respond(
+        request, f"components/filters/options:{category_slug or ''}", [CATALOG_TAG],
+        lambda: _filter_options(db, category_slug)
+    )
+
+
+def _filter_options(db: Session, category_slug: Optional[str]) -> dict:
+    query = db.query(Component).filter(Component.is_active == True)
+    
+    if category_slug:
+        query = query.join(ComponentCategory).filter(ComponentCategory.slug == category_slug)
+    
+    components = query.all()
+    
+    # Собираем уникальные значения для фильтров
+    brands = list(set(comp.brand for comp in components if comp.brand))
+    form_factors = list(set(comp.form_factor for comp in components if comp.form_factor))
+    
+    # Специфичные фильтры из specifications
+    sockets = set()
+    memory_types = set()
+    interfaces = set()
+    
+    for comp in components:
+        specs = comp.specifications or {}
+        
+        if "socket" in specs:
+            sockets.add(specs["socket"])
+        if "memory_type" in specs:
+            if isinstance(specs["memory_type"], list):
+                memory_types.update(specs["memory_type"])
+            else:
+                memory_types.add(specs["memory_type"])
+        if "interface" in specs:
+            interfaces.add(specs["interface"])
+    
+    return {
+        "brands": sorted(brands),
+        "form_factors": sorted(form_factors),
+        "sockets": sorted(list(sockets)),
+        "memory_types": sorted(list(memory_types)),
+        "interfaces": sorted(list(interfaces)),
+        "price_range": {
+            "min": min((comp.price for comp in components), default=0),
+            "max": max((comp.price for comp in components), default=0)
+        }
+    } 
 
 
 @router.get("/components/{component_id}", response_model=ComponentResponse)
@@ -109,6 +197,78 @@ async def get_component(component_id: str, db: Session = Depends(get_db)):
     return component
 
 
+@router.get("/components/{component_id}/price-history", response_model=ComponentPriceHistoryResponse)
+async def get_component_price_history(
+    component_id: UUID,
+    start: Optional[datetime] = Query(None, description="Начало периода (по умолчанию 90 дней назад)"),
+    end: Optional[datetime] = Query(None, description="Конец периода (по умолчанию сейчас)"),
+    bucket: Optional[PriceHistoryBucket] = Query(None, description="Интервал агрегации"),
+    db: Session = Depends(get_db)
+):
+    """История цены компонента, агрегированная по интервалам"""
+    if not db.query(Component.id).filter(Component.id == component_id).first():
+        raise HTTPException(status_code=404, detail="Компонент не найден")
+    
+    try:
+        return PriceHistoryService(db).get_component_history(component_id, start, end, bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/components/{component_id}/compatible", response_model=List[ComponentResponse])
+async def get_compatible_components(
+    component_id: UUID,
+    category_slug: Optional[str] = Query(None, description="Фильтр по категории"),
+    only_in_stock: bool = Query(False, description="Только товары в наличии"),
+    page: int = Query(1, ge=1, description="Номер страницы"),
+    limit: int = Query(20, ge=1, le=100, description="Количество на странице"),
+    fields: Optional[str] = Query(None, description="Поля ответа через запятую или набор: full (по умолчанию), card"),
+    db: Session = Depends(get_db)
+):
+    """Совместимые компоненты по матрице совместимости (component_compatibility)"""
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not db.query(Component.id).filter(Component.id == component_id).first():
+        raise HTTPException(status_code=404, detail="Компонент не найден")
+
+    # Пары хранятся в одном направлении, поэтому ищем компонент с обеих сторон
+    def partners(*conditions):
+        return union(
+            select(ComponentCompatibility.component2_id).where(
+                ComponentCompatibility.component1_id == component_id, *conditions
+            ),
+            select(ComponentCompatibility.component1_id).where(
+                ComponentCompatibility.component2_id == component_id, *conditions
+            )
+        )
+
+    compatible_ids = partners(ComponentCompatibility.compatibility_type == "compatible")
+    # Ручной вердикт «несовместимы» перекрывает рассчитанную совместимость
+    excluded_ids = partners(
+        ComponentCompatibility.compatibility_type == "incompatible",
+        ComponentCompatibility.source == "manual"
+    )
+
+    query = projection.query(db).filter(
+        Component.is_active == True,
+        Component.id.in_(compatible_ids),
+        ~Component.id.in_(excluded_ids)
+    )
+
+    if category_slug:
+        query = query.filter(ComponentCategory.slug == category_slug)
+
+    if only_in_stock:
+        query = query.filter(ComponentStock.status == "in_stock")
+
+    offset = (page - 1) * limit
+    rows = query.order_by(Component.price, Component.id).offset(offset).limit(limit).all()
+    return ComponentListResponse(projection.to_dicts(rows))
+
+
 @router.get("/components/category/{category_slug}", response_model=List[ComponentResponse])
 async def get_components_by_category(
     category_slug: str,
@@ -125,19 +285,22 @@ async def get_components_by_category(
     page: int = Query(1, ge=1, description="Номер страницы"),
     limit: int = Query(20, ge=1, le=100, description="Количество на странице"),
     compatible_with: Optional[List[str]] = Query(None, description="ID компонентов для проверки совместимости"),
+    fields: Optional[str] = Query(None, description="Поля ответа через запятую или набор: full (по умолчанию), card"),
     db: Session = Depends(get_db)
 ):
     """Получить компоненты категории с фильтрацией и поиском"""
     
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     # Проверяем существование категории
     category = db.query(ComponentCategory).filter(ComponentCategory.slug == category_slug).first()
     if not category:
         raise HTTPException(status_code=404, detail="Категория не найдена")
     
-    query = db.query(Component).options(
-        joinedload(Component.category),
-        joinedload(Component.stock)
-    ).filter(
+    query = projection.query(db).filter(
         Component.category_id == category.id,
         Component.is_active == True
     )
@@ -154,7 +317,7 @@ async def get_components_by_category(
     
     # Фильтр по наличию
     if only_in_stock:
-        query = query.join(ComponentStock).filter(ComponentStock.status == "in_stock")
+        query = query.filter(ComponentStock.status == "in_stock")
     
     # Фильтр по форм-фактору
     if form_factor:
@@ -192,7 +355,7 @@ async def get_components_by_category(
     
     # Пагинация
     offset = (page - 1) * limit
-    components = query.offset(offset).limit(limit).all()
+    components = projection.to_dicts(query.offset(offset).limit(limit).all())
     
     # Если нужна проверка совместимости
     if compatible_with:
@@ -200,7 +363,7 @@ async def get_components_by_category(
         compatible_components = []
         
         for component in components:
-            test_config = compatible_with + [str(component.id)]
+            test_config = compatible_with + [str(component["id"])]
             compatibility = compatibility_service.check_configuration_compatibility(test_config)
             
             # Добавляем только совместимые компоненты или с предупреждениями
@@ -209,7 +372,7 @@ async def get_components_by_category(
         
         components = compatible_components
     
-    return components
+    return ComponentListResponse(components)
 
 
 @router.post("/components/check-compatibility", response_model=CompatibilityCheck)
@@ -257,75 +420,34 @@ async def check_components_compatibility(
         )
     
     compatibility_service = CompatibilityService(db)
-    result = compatibility_service.check_configuration_compatibility(component_ids)
+    result = compatibility_service.check_configuration_compatibility(component_ids, with_alternatives=True)
     
     return result
 
 
-@router.get("/components/debug/ids")
-async def get_all_component_ids(db: Session = Depends(get_db)):
-    """Получить все ID компонентов для отладки"""
-    components = db.query(Component.id, Component.name, Component.brand, Component.is_active).all()
-    
-    return {
-        "total_count": len(components),
-        "active_count": len([c for c in components if c.is_active]),
-        "components": [
-            {
-                "id": str(comp.id),
-                "name": comp.name,
-                "brand": comp.brand,
-                "is_active": comp.is_active
-            }
-            for comp in components
-        ]
-    }
-
-
-@router.get("/components/filters/options")
-async def get_filter_options(
-    category_slug: Optional[str] = Query(None, description="Категория для фильтров"),
+@router.post("/components/import", response_model=CatalogImportResult)
+async def import_catalog(
+    file: UploadFile = File(...),
+    format: Optional[CatalogFeedFormat] = Query(None, description="Формат фида (по умолчанию по расширению файла)"),
     db: Session = Depends(get_db)
 ):
-    """Получить доступные варианты для фильтров"""
-    
-    query = db.query(Component).filter(Component.is_active == True)
-    
-    if category_slug:
-        query = query.join(ComponentCategory).filter(ComponentCategory.slug == category_slug)
-    
-    components = query.all()
-    
-    # Собираем уникальные значения для фильтров
-    brands = list(set(comp.brand for comp in components if comp.brand))
-    form_factors = list(set(comp.form_factor for comp in components if comp.form_factor))
-    
-    # Специфичные фильтры из specifications
-    sockets = set()
-    memory_types = set()
-    interfaces = set()
-    
-    for comp in components:
-        specs = comp.specifications or {}
-        
-        if "socket" in specs:
-            sockets.add(specs["socket"])
-        if "memory_type" in specs:
-            if isinstance(specs["memory_type"], list):
-                memory_types.update(specs["memory_type"])
-            else:
-                memory_types.add(specs["memory_type"])
-        if "interface" in specs:
-            interfaces.add(specs["interface"])
-    
-    return {
-        "brands": sorted(brands),
-        "form_factors": sorted(form_factors),
-        "sockets": sorted(list(sockets)),
-        "memory_types": sorted(list(memory_types)),
-        "interfaces": sorted(list(interfaces)),
-        "price_range": {
-            "min": min((comp.price for comp in components), default=0),
-            "max": max((comp.price for comp in components), default=0)
-        }
-    } 
\ No newline at end of file
+    """Массовая загрузка компонентов и наличия из CSV/JSONL фида"""
+    
+    if format is None:
+        filename = (file.filename or "").lower()
+        if filename.endswith(".jsonl") or filename.endswith(".ndjson"):
+            format = CatalogFeedFormat.JSONL
+        elif filename.endswith(".csv"):
+            format = CatalogFeedFormat.CSV
+        else:
+            raise HTTPException(status_code=400, detail="Не удалось определить формат фида, укажите параметр format")
+    
+    # Файл читается потоково, загрузка выполняется вне event loop
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    import_service = CatalogImportService(db)
+    
+    try:
+        return await run_in_threadpool(import_service.import_stream, stream, format.value)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Не удалось загрузить каталог: {str(e)}")
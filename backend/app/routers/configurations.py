@@ -1,23 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session, joinedload
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Optional
 import uuid
 from datetime import datetime
 from uuid import UUID
+from urllib.parse import quote
 from ..database import get_db
 from ..models import Configuration, ConfigurationItem, ConfigurationAccessory, Component
 from ..schemas.configuration import (
     ConfigurationCreate, ConfigurationResponse, 
     ConfigurationItemCreate, ConfigurationAccessoryCreate, CompatibilityCheck,
-    ConfigurationExport
+    ConfigurationExport, ConfigurationBatchExportRequest, ExportFormat,
+    ConfigurationRepriceRequest, ConfigurationRepriceResult,
+    BuildOptimizeRequest, BuildOptimizeResponse
 )
+from ..schemas.price_history import PriceHistoryBucket, ConfigurationPriceHistoryResponse
 from ..services.compatibility_service import CompatibilityService
 from ..services.pdf_service import PDFService
 from ..services.pdf_import_service import PDFImportService
+from ..services.batch_export_service import BatchExportService
+from ..services.repricing_service import RepricingService
+from ..services.price_history_service import PriceHistoryService
+from ..services.build_optimizer import BuildOptimizerService
+from ..services.availability_service import AvailabilityService
+from ..services.response_cache import CATALOG_TAG, configuration_tag, response_cache
+from ..config import settings
 
 router = APIRouter()
 
+# Позиции и аксессуары загружаются отдельными запросами (selectinload): цепочки joinedload
+# по двум коллекциям дают декартово произведение строк items x accessories
+_CONFIGURATION_LOAD_OPTIONS = (
+    selectinload(Configuration.items).joinedload(ConfigurationItem.component).joinedload(Component.category),
+    selectinload(Configuration.items).joinedload(ConfigurationItem.component).joinedload(Component.stock),
+    selectinload(Configuration.accessories).joinedload(ConfigurationAccessory.component).joinedload(Component.category),
+    selectinload(Configuration.accessories).joinedload(ConfigurationAccessory.component).joinedload(Component.stock),
+)
+
 
 @router.post("/configurations", response_model=ConfigurationResponse)
 async def create_configuration(
@@ -45,10 +66,7 @@ async def get_configurations(
     db: Session = Depends(get_db)
 ):
     """Получить список конфигураций"""
-    configs = db.query(Configuration).options(
-        joinedload(Configuration.items).joinedload(ConfigurationItem.component),
-        joinedload(Configuration.accessories).joinedload(ConfigurationAccessory.component)
-    ).offset(skip).limit(limit).all()
+    configs = db.query(Configuration).options(*_CONFIGURATION_LOAD_OPTIONS).offset(skip).limit(limit).all()
     
     return configs
 
@@ -56,12 +74,7 @@ async def get_configurations(
 @router.get("/configurations/{config_id}", response_model=ConfigurationResponse)
 async def get_configuration(config_id: UUID, db: Session = Depends(get_db)):
     """Получить конфигурацию по ID"""
-    config = db.query(Configuration).options(
-        joinedload(Configuration.items).joinedload(ConfigurationItem.component).joinedload(Component.category),
-        joinedload(Configuration.items).joinedload(ConfigurationItem.component).joinedload(Component.stock),
-        joinedload(Configuration.accessories).joinedload(ConfigurationAccessory.component).joinedload(Component.category),
-        joinedload(Configuration.accessories).joinedload(ConfigurationAccessory.component).joinedload(Component.stock)
-    ).filter(Configuration.id == config_id).first()
+    config = db.query(Configuration).options(*_CONFIGURATION_LOAD_OPTIONS).filter(Configuration.id == config_id).first()
     
     if not config:
         raise HTTPException(status_code=404, detail="Конфигурация не найдена")
@@ -70,19 +83,21 @@ async def get_configuration(config_id: UUID, db: Session = Depends(get_db)):
 
 
 @router.get("/configurations/uuid/{public_uuid}", response_model=ConfigurationResponse)
-async def get_configuration_by_uuid(public_uuid: str, db: Session = Depends(get_db)):
+async def get_configuration_by_uuid(public_uuid: str, request: Request, db: Session = Depends(get_db)):
     """Получить конфигурацию по публичному UUID"""
-    config = db.query(Configuration).options(
-        joinedload(Configuration.items).joinedload(ConfigurationItem.component).joinedload(Component.category),
-        joinedload(Configuration.items).joinedload(ConfigurationItem.component).joinedload(Component.stock),
-        joinedload(Configuration.accessories).joinedload(ConfigurationAccessory.component).joinedload(Component.category),
-        joinedload(Configuration.accessories).joinedload(ConfigurationAccessory.component).joinedload(Component.stock)
-    ).filter(Configuration.public_uuid == public_uuid).first()
-    
-    if not config:
-        raise HTTPException(status_code=404, detail="Конфигурация не найдена")
-    
-    return config
+    def build():
+        config = db.query(Configuration).options(*_CONFIGURATION_LOAD_OPTIONS).filter(Configuration.public_uuid == public_uuid).first()
+        
+        if not config:
+            raise HTTPException(status_code=404, detail="Конфигурация не найдена")
+        
+        return ConfigurationResponse.model_validate(config)
+
+    # Позиции содержат цены и наличие компонентов, поэтому запись зависит и от каталога
+    return response_cache.respond(
+        request, f"configurations/uuid:{public_uuid}",
+        lambda config: [CATALOG_TAG, configuration_tag(config.id)], build
+    )
 
 
 @router.post("/configurations/{config_id}/items")
@@ -252,6 +267,24 @@ async def remove_component_from_configuration(
     return {"message": "Компонент удален из конфигурации"}
 
 
+@router.get("/configurations/{config_id}/price-history", response_model=ConfigurationPriceHistoryResponse)
+async def get_configuration_price_history(
+    config_id: UUID,
+    start: Optional[datetime] = Query(None, description="Начало периода (по умолчанию 90 дней назад)"),
+    end: Optional[datetime] = Query(None, description="Конец периода (по умолчанию сейчас)"),
+    bucket: Optional[PriceHistoryBucket] = Query(None, description="Интервал агрегации"),
+    db: Session = Depends(get_db)
+):
+    """История стоимости компонентов конфигурации, агрегированная по интервалам"""
+    if not db.query(Configuration.id).filter(Configuration.id == config_id).first():
+        raise HTTPException(status_code=404, detail="Конфигурация не найдена")
+    
+    try:
+        return PriceHistoryService(db).get_configuration_history(config_id, start, end, bucket)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/configurations/{config_id}/check-compatibility", response_model=CompatibilityCheck)
 async def check_configuration_compatibility(config_id: UUID, db: Session = Depends(get_db)):
     """Проверить совместимость конфигурации"""
@@ -265,50 +298,62 @@ async def check_configuration_compatibility(config_id: UUID, db: Session = Depen
         raise HTTPException(status_code=400, detail="Конфигурация пуста")
     
     component_ids = [item.component_id for item in config_items]
+    quantities = {item.component_id: item.quantity for item in config_items}
     
     compatibility_service = CompatibilityService(db)
-    result = compatibility_service.check_configuration_compatibility(component_ids)
+    result = compatibility_service.check_configuration_compatibility(
+        component_ids, with_alternatives=True, quantities=quantities
+    )
     
     # Обновляем статус совместимости в конфигурации
     config = db.query(Configuration).filter(Configuration.id == config_id).first()
     if config:
         config.compatibility_status = result.status.value
-        config.compatibility_issues = [issue.dict() for issue in result.issues]
+        config.compatibility_issues = [issue.model_dump(mode="json") for issue in result.issues]
         db.commit()
     
     return result
 
 
-@router.get("/configurations/{config_id}/export/pdf")
-async def export_configuration_pdf(config_id: UUID, db: Session = Depends(get_db)):
-    """Экспортировать конфигурацию в PDF"""
+@router.get("/configurations/{config_id}/export")
+async def export_configuration(
+    config_id: UUID,
+    format: ExportFormat = Query(ExportFormat.PDF, description="Формат экспорта: pdf, html или json"),
+    db: Session = Depends(get_db)
+):
+    """Экспортировать конфигурацию в выбранном формате"""
     
-    # Получаем конфигурацию с аксессуарами
-    config = db.query(Configuration).options(
-        joinedload(Configuration.items).joinedload(ConfigurationItem.component).joinedload(Component.category),
-        joinedload(Configuration.items).joinedload(ConfigurationItem.component).joinedload(Component.stock),
-        joinedload(Configuration.accessories).joinedload(ConfigurationAccessory.component).joinedload(Component.category),
-        joinedload(Configuration.accessories).joinedload(ConfigurationAccessory.component).joinedload(Component.stock)
-    ).filter(Configuration.id == config_id).first()
+    if format == ExportFormat.PDF:
+        return await export_configuration_pdf(config_id, db)
     
-    if not config:
-        raise HTTPException(status_code=404, detail="Конфигурация не найдена")
+    config, export_data = _prepare_configuration_export(config_id, db)
     
-    if not config.items:
-        raise HTTPException(status_code=400, detail="Конфигурация пуста")
+    # Обновляем статус конфигурации
+    config.status = "exported"
+    db.commit()
     
-    # Проверяем совместимость
-    component_ids = [item.component_id for item in config.items]
-    compatibility_service = CompatibilityService(db)
-    compatibility_check = compatibility_service.check_configuration_compatibility(component_ids)
+    pdf_service = PDFService()
     
-    # Создаем данные для экспорта
-    export_data = ConfigurationExport(
-        configuration=config,
-        compatibility_check=compatibility_check,
-        export_date=datetime.now(),
-        notes="Конфигурация создана с помощью веб-конфигуратора ПК"
+    if format == ExportFormat.JSON:
+        return Response(
+            content=pdf_service.render_compact_json(export_data),
+            media_type="application/json"
+        )
+    
+    # HTML рендерится потоково из скомпилированного шаблона
+    filename = f"конфигурация_{config.name}.html"
+    return StreamingResponse(
+        (chunk.encode("utf-8") for chunk in pdf_service.stream_html(export_data)),
+        media_type="text/html; charset=utf-8",
+        headers={"Content-Disposition": f"inline; filename*=UTF-8''{quote(filename)}"}
     )
+
+
+@router.get("/configurations/{config_id}/export/pdf")
+async def export_configuration_pdf(config_id: UUID, db: Session = Depends(get_db)):
+    """Экспортировать конфигурацию в PDF"""
+    
+    config, export_data = _prepare_configuration_export(config_id, db)
     
     # Генерируем PDF файл
     pdf_service = PDFService()
@@ -333,6 +378,78 @@ async def export_configuration_pdf(config_id: UUID, db: Session = Depends(get_db
     )
 
 
+@router.post("/configurations/export/batch")
+async def export_configurations_batch(
+    export_request: ConfigurationBatchExportRequest,
+    db: Session = Depends(get_db)
+):
+    """Экспортировать несколько конфигураций в один ZIP архив"""
+    
+    # Убираем дубликаты, сохраняя порядок
+    config_ids = list(dict.fromkeys(export_request.config_ids))
+    
+    if len(config_ids) > settings.EXPORT_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Можно экспортировать не более {settings.EXPORT_BATCH_MAX_SIZE} конфигураций за раз"
+        )
+    
+    export_service = BatchExportService(db)
+    configs = export_service.load_configurations(config_ids)
+    
+    found_ids = {config.id for config in configs}
+    missing_ids = [str(config_id) for config_id in config_ids if config_id not in found_ids]
+    if missing_ids:
+        raise HTTPException(
+            status_code=404,
+            detail={"message": "Конфигурации не найдены", "missing_ids": missing_ids}
+        )
+    
+    empty_ids = [str(config.id) for config in configs if not config.items]
+    if empty_ids:
+        raise HTTPException(
+            status_code=400,
+            detail={"message": "Конфигурации пусты", "empty_ids": empty_ids}
+        )
+    
+    # Данные готовим до начала стриминга, пока сессия БД открыта
+    exports = export_service.build_export_data(configs)
+    export_service.mark_exported(configs)
+    
+    filename = f"конфигурации_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return StreamingResponse(
+        export_service.stream_zip(exports, export_request.format),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}"}
+    )
+
+
+@router.post("/configurations/optimize", response_model=BuildOptimizeResponse)
+async def optimize_configuration(
+    request: BuildOptimizeRequest,
+    db: Session = Depends(get_db)
+):
+    """Подобрать самую дешевую совместимую сборку в рамках бюджета"""
+    optimizer = BuildOptimizerService(db)
+    
+    try:
+        return await run_in_threadpool(optimizer.optimize, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/configurations/reprice", response_model=ConfigurationRepriceResult)
+async def reprice_configurations(
+    request: ConfigurationRepriceRequest,
+    db: Session = Depends(get_db)
+):
+    """Применить изменения цен каталога к сохраненным конфигурациям"""
+    repricing_service = RepricingService(db)
+    return await run_in_threadpool(
+        repricing_service.reprice, request.component_ids, request.keep_snapshots
+    )
+
+
 @router.put("/configurations/{config_id}", response_model=ConfigurationResponse)
 async def update_configuration(
     config_id: UUID,
@@ -380,10 +497,15 @@ async def import_configuration_from_pdf(
     if not file.content_type == "application/pdf":
         raise HTTPException(status_code=400, detail="Файл должен быть в формате PDF")
     
+    # Читаем не больше лимита, чтобы не держать в памяти слишком большие файлы
+    pdf_content = await file.read(settings.PDF_IMPORT_MAX_BYTES + 1)
+    if len(pdf_content) > settings.PDF_IMPORT_MAX_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Размер файла превышает {settings.PDF_IMPORT_MAX_BYTES // (1024 * 1024)} МБ"
+        )
+    
     try:
-        # Читаем содержимое файла
-        pdf_content = await file.read()
-        
         # Создаем сервис импорта
         import_service = PDFImportService(db)
         
@@ -396,6 +518,36 @@ async def import_configuration_from_pdf(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _prepare_configuration_export(config_id: UUID, db: Session):
+    """Загрузить конфигурацию и подготовить данные для экспорта"""
+    
+    # Получаем конфигурацию с аксессуарами
+    config = db.query(Configuration).options(*_CONFIGURATION_LOAD_OPTIONS).filter(Configuration.id == config_id).first()
+    
+    if not config:
+        raise HTTPException(status_code=404, detail="Конфигурация не найдена")
+    
+    if not config.items:
+        raise HTTPException(status_code=400, detail="Конфигурация пуста")
+    
+    # Проверяем совместимость на уже загруженных компонентах
+    compatibility_service = CompatibilityService(db)
+    compatibility_check = compatibility_service.check_components_compatibility(
+        [item.component for item in config.items],
+        quantities={item.component_id: item.quantity for item in config.items}
+    )
+    
+    # Создаем данные для экспорта
+    export_data = ConfigurationExport(
+        configuration=config,
+        compatibility_check=compatibility_check,
+        export_date=datetime.now(),
+        notes="Конфигурация создана с помощью веб-конфигуратора ПК"
+    )
+    
+    return config, export_data
+
+
 async def _update_configuration_totals(config_id: UUID, db: Session):
     """Обновить общие показатели конфигурации"""
     
@@ -405,7 +557,7 @@ async def _update_configuration_totals(config_id: UUID, db: Session):
     
     # Получаем все элементы конфигурации
     items = db.query(ConfigurationItem).options(
-        joinedload(ConfigurationItem.component).joinedload(Component.stock)
+        joinedload(ConfigurationItem.component)
     ).filter(ConfigurationItem.configuration_id == config_id).all()
     
     # Считаем общую стоимость
@@ -413,25 +565,14 @@ async def _update_configuration_totals(config_id: UUID, db: Session):
         (item.price_snapshot or item.component.price) * item.quantity 
         for item in items
     )
-    
-    # Определяем статус наличия
-    availability_statuses = []
-    for item in items:
-        if item.component.stock:
-            availability_statuses.append(item.component.stock.status)
-        else:
-            availability_statuses.append("out_of_stock")
-    
-    if all(status == "in_stock" for status in availability_statuses):
-        availability_status = "available"
-    elif any(status == "in_stock" for status in availability_statuses):
-        availability_status = "partial"
-    else:
-        availability_status = "unavailable"
+    # Стоимость по текущим ценам каталога (как в задаче переоценки)
+    current_total_price = sum(item.component.price * item.quantity for item in items)
     
     # Обновляем конфигурацию
     config.total_price = total_price
-    config.availability_status = availability_status
+    config.current_total_price = current_total_price
     config.updated_at = datetime.now()
+    db.flush()
     
-    db.commit()
\ No newline at end of file
+    # Статус наличия и дата поставки - по тем же правилам, что и в фоновом пересчете
+    AvailabilityService(db).recompute_configurations([config_id])
\ No newline at end of file
@@ -0,0 +1,63 @@
+from datetime import datetime
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response
+from typing import Optional
+from ..config import settings
+from ..monitoring.profiling import ProfilerBusyError, check_token, request_profiles, sample_stacks
+
+router = APIRouter()
+
+
+def _require_token(token: Optional[str]) -> None:
+    if not check_token(token):
+        raise HTTPException(status_code=403, detail="Неверный токен профилирования")
+
+
+@router.get("/debug/profile", response_class=PlainTextResponse)
+async def profile_process(
+    seconds: float = Query(10, gt=0, description="Длительность съемки, секунды"),
+    interval_ms: float = Query(10, ge=1, le=1000, description="Шаг снятия стеков, мс"),
+    x_profile_token: Optional[str] = Header(None),
+):
+    """Сэмплирующий профиль всех потоков процесса в формате folded stacks (для flamegraph)"""
+    _require_token(x_profile_token)
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Длительность профилирования не больше {settings.PROFILING_MAX_SECONDS} с"
+        )
+
+    try:
+        folded, samples = await run_in_threadpool(sample_stacks, seconds, interval_ms / 1000)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    filename = f"profile-{datetime.now():%Y%m%d-%H%M%S}.folded"
+    return PlainTextResponse(folded, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "X-Profile-Samples": str(samples),
+    })
+
+
+@router.get("/debug/profile/requests/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    format: str = Query("prof", pattern="^(prof|text)$", description="prof - данные pstats, text - сводка"),
+    x_profile_token: Optional[str] = Header(None),
+):
+    """Профиль запроса, выполненного с заголовком X-Profile (ID из заголовка ответа X-Profile-Id)"""
+    _require_token(x_profile_token)
+
+    if format == "text":
+        summary = request_profiles.summary(profile_id)
+        if summary is None:
+            raise HTTPException(status_code=404, detail="Профиль не найден")
+        return PlainTextResponse(summary)
+
+    data = request_profiles.get(profile_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Профиль не найден")
+    return Response(data, media_type="application/octet-stream", headers={
+        "Content-Disposition": f'attachment; filename="request-{profile_id}.prof"'
+    })
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..schemas.stock import StockSnapshot, StockSyncResult
+from ..services.stock_sync_service import StockSyncService
+from ..services.availability_service import AvailabilityService, availability_worker
+
+router = APIRouter()
+
+
+@router.post("/stock/sync", response_model=StockSyncResult)
+async def sync_stock(snapshot: StockSnapshot, db: Session = Depends(get_db)):
+    """Синхронизировать наличие со снимком склада (полным или частичным)"""
+    sync_service = StockSyncService(db)
+    
+    try:
+        return await run_in_threadpool(sync_service.sync, snapshot)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Не удалось синхронизировать наличие: {str(e)}")
+
+
+@router.get("/stock/availability/metrics")
+async def get_availability_metrics():
+    """Метрики фонового пересчета наличия конфигураций"""
+    return availability_worker.metrics()
+
+
+@router.post("/stock/availability/recompute")
+async def recompute_availability(db: Session = Depends(get_db)):
+    """Пересчитать наличие всех конфигураций"""
+    availability_service = AvailabilityService(db)
+    return await run_in_threadpool(availability_service.recompute_all)
@@ -0,0 +1,62 @@
+"""
+Маршрутизация API.
+
+Роутеры подключаются один раз, с префиксом /api/v1. Старые адреса без префикса
+(/components, /configurations/... - их использует фронтенд) переписываются на
+/api/v1 до роутера: таблица маршрутов, которую Starlette перебирает линейно на
+каждый запрос, не удваивается.
+"""
+from typing import Iterable, List, Tuple
+from starlette.routing import Route
+
+
+class ApiPrefixRewriteMiddleware:
+    """
+    Путь, первый сегмент которого входит в segments, получает префикс prefix.
+    scope изменяется на месте, чтобы внешние middleware видели выбранный роутером
+    маршрут (scope["route"]) и итоговый путь
+    """
+
+    def __init__(self, app, prefix: str, segments: Iterable[str]):
+        self.app = app
+        self.prefix = prefix.rstrip("/")
+        self.raw_prefix = self.prefix.encode()
+        self.segments = frozenset(segments)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            self.rewrite(scope)
+        await self.app(scope, receive, send)
+
+    def rewrite(self, scope) -> None:
+        path = scope["path"]
+        if path[1:].split("/", 1)[0] in self.segments:
+            scope["path"] = self.prefix + path
+            raw_path = scope.get("raw_path")
+            if raw_path is not None:
+                scope["raw_path"] = self.raw_prefix + raw_path
+
+
+def top_segments(routes: Iterable) -> List[str]:
+    """Первые сегменты путей маршрутов роутера (components, configurations, ...)"""
+    segments = {route.path.lstrip("/").split("/", 1)[0] for route in routes if isinstance(route, Route)}
+    return sorted(segment for segment in segments if segment and not segment.startswith("{"))
+
+
+def find_shadowed_routes(routes: Iterable) -> List[Tuple[str, str, List[str]]]:
+    """
+    Маршруты без параметров, недостижимые из-за объявленного раньше маршрута с параметром
+    для тех же методов (например, /accessories/{accessory_id} перед /accessories/categories).
+    Возвращает (перекрывающий путь, перекрытый путь, методы)
+    """
+    routes = [route for route in routes if isinstance(route, Route)]
+    shadowed = []
+    for index, route in enumerate(routes):
+        if "{" in route.path:
+            continue
+        for earlier in routes[:index]:
+            methods = (earlier.methods or set()) & (route.methods or set())
+            if "{" in earlier.path and methods and earlier.path_regex.match(route.path):
+                shadowed.append((earlier.path, route.path, sorted(methods)))
+                break
+    return shadowed
@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from enum import Enum
+from uuid import UUID
+
+
+class CompatibilityVerdict(str, Enum):
+    COMPATIBLE = "compatible"
+    INCOMPATIBLE = "incompatible"
+    WARNING = "warning"
+
+
+class CompatibilityOverrideCreate(BaseModel):
+    """Ручное исключение из правил совместимости для пары компонентов"""
+    component1_id: UUID
+    component2_id: UUID
+    compatibility_type: CompatibilityVerdict
+    notes: Optional[str] = None
+
+
+class CompatibilityOverrideUpdate(BaseModel):
+    compatibility_type: Optional[CompatibilityVerdict] = None
+    notes: Optional[str] = None
+
+
+class CompatibilityOverrideResponse(BaseModel):
+    id: UUID
+    component1_id: UUID
+    component2_id: UUID
+    compatibility_type: CompatibilityVerdict
+    source: str
+    notes: Optional[str]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
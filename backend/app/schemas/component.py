@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import Optional, Dict, Any, List
 from datetime import datetime, date
 from enum import Enum
@@ -11,6 +11,11 @@ class StockStatus(str, Enum):
     OUT_OF_STOCK = "out_of_stock"
 
 
+class CatalogFeedFormat(str, Enum):
+    CSV = "csv"
+    JSONL = "jsonl"
+
+
 class ComponentCategoryCreate(BaseModel):
     name: str = Field(..., max_length=100)
     slug: str = Field(..., max_length=50)
@@ -55,6 +60,46 @@ class ComponentCreate(BaseModel):
     power_consumption: Optional[int] = None
 
 
+class ComponentImportRow(ComponentCreate):
+    """Строка фида каталога для массовой загрузки (CSV/JSONL)"""
+    category_id: Optional[UUID] = None
+    category_slug: Optional[str] = Field(None, max_length=50)
+    is_active: bool = True
+    
+    # Наличие (необязательно: без статуса запись о наличии не трогаем)
+    stock_status: Optional[StockStatus] = None
+    stock_quantity: int = Field(0, ge=0)
+    expected_date: Optional[date] = None
+    
+    @model_validator(mode="after")
+    def check_category(self):
+        if self.category_id is None and not self.category_slug:
+            raise ValueError("Нужно указать category_slug или category_id")
+        return self
+
+
+class CatalogImportError(BaseModel):
+    """Ошибка валидации строки фида"""
+    line: int
+    message: str
+
+
+class CatalogImportResult(BaseModel):
+    """Результат массовой загрузки каталога"""
+    rows_read: int
+    rows_valid: int
+    rows_invalid: int
+    inserted: int
+    updated: int
+    unchanged: int
+    stock_inserted: int
+    stock_updated: int
+    price_changed_component_ids: List[UUID] = []
+    errors: List[CatalogImportError] = []
+    elapsed_seconds: float
+    rows_per_second: float
+
+
 class ComponentResponse(BaseModel):
     id: UUID
     name: str
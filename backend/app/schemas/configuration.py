@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 from uuid import UUID
 from .component import ComponentResponse
@@ -12,6 +12,12 @@ class ConfigurationStatus(str, Enum):
     EXPORTED = "exported"
 
 
+class ExportFormat(str, Enum):
+    PDF = "pdf"
+    HTML = "html"
+    JSON = "json"
+
+
 class CompatibilityStatus(str, Enum):
     COMPATIBLE = "compatible"
     INCOMPATIBLE = "incompatible"
@@ -73,9 +79,13 @@ class ConfigurationResponse(BaseModel):
     description: Optional[str]
     public_uuid: Optional[str]
     total_price: float
+    current_total_price: Optional[float] = None
+    price_delta: Optional[float] = None
     total_power_consumption: Optional[int]
     compatibility_status: CompatibilityStatus
     compatibility_notes: Optional[str]
+    availability_status: Optional[AvailabilityStatus] = None
+    expected_delivery_date: Optional[date] = None
     status: ConfigurationStatus
     is_public: bool
     created_at: datetime
@@ -87,6 +97,17 @@ class ConfigurationResponse(BaseModel):
         from_attributes = True
 
 
+class ComponentAlternative(BaseModel):
+    """Замена компонента, устраняющая проблему совместимости"""
+    replaces: UUID
+    component_id: UUID
+    category: str
+    name: str
+    brand: str
+    price: float
+    in_stock: bool
+
+
 class CompatibilityIssue(BaseModel):
     """Проблема совместимости"""
     type: str  # "socket_mismatch", "power_insufficient", "form_factor_conflict"
@@ -94,6 +115,19 @@ class CompatibilityIssue(BaseModel):
     message: str
     component_ids: List[UUID]
     suggestions: Optional[List[str]] = None
+    # Конкретные замены, лучшие первыми (в наличии, ближе по цене)
+    alternatives: List[ComponentAlternative] = []
+
+
+class PowerBudgetSummary(BaseModel):
+    """Бюджет мощности сборки с учетом количества, Вт"""
+    peak_power: int
+    typical_power: int
+    transient_power: int  # Кратковременные пики (видеокарты, турбо-режим процессора)
+    rail_12v_load: int
+    psu_load_percent: Optional[float] = None  # Нагрузка БП при типичном потреблении
+    psu_efficiency: Optional[float] = None
+    estimated_wall_draw: Optional[int] = None  # Потребление из розетки при типичной нагрузке
 
 
 class CompatibilityCheck(BaseModel):
@@ -103,6 +137,7 @@ class CompatibilityCheck(BaseModel):
     issues: List[CompatibilityIssue]
     total_power_consumption: Optional[int]
     recommended_psu_wattage: Optional[int]
+    power_budget: Optional[PowerBudgetSummary] = None
 
 
 class ConfigurationExport(BaseModel):
@@ -110,4 +145,65 @@ class ConfigurationExport(BaseModel):
     configuration: ConfigurationResponse
     compatibility_check: CompatibilityCheck
     export_date: datetime
-    notes: Optional[str] = None 
\ No newline at end of file
+    notes: Optional[str] = None
+
+
+class ConfigurationBatchExportRequest(BaseModel):
+    """Запрос пакетного экспорта конфигураций в ZIP архив"""
+    config_ids: List[UUID] = Field(..., min_length=1)
+    format: ExportFormat = ExportFormat.PDF
+
+
+class ConfigurationRepriceRequest(BaseModel):
+    """Запрос на переоценку сохраненных конфигураций"""
+    # Компоненты, цены которых изменились (None - переоценить все конфигурации)
+    component_ids: Optional[List[UUID]] = None
+    # Сохранить снимки цен и обновить только текущую стоимость
+    keep_snapshots: bool = False
+
+
+class ConfigurationRepriceResult(BaseModel):
+    """Результат переоценки конфигураций"""
+    configurations_checked: int
+    configurations_updated: int
+    items_repriced: int
+    batches: int
+    lock_retries: int
+    skipped_configuration_ids: List[UUID] = []
+    elapsed_seconds: float
+
+
+# Основные категории полной сборки ПК
+ESSENTIAL_CATEGORIES = ["cpu", "motherboard", "ram", "storage", "gpu", "psu", "case"]
+
+
+class BuildOptimizeRequest(BaseModel):
+    """Запрос на подбор самой дешевой совместимой сборки"""
+    budget: float = Field(..., gt=0)
+    categories: List[str] = Field(default_factory=lambda: list(ESSENTIAL_CATEGORIES), min_length=1)
+    fixed_component_ids: List[UUID] = []
+    only_in_stock: bool = True
+
+
+class OptimizedBuildItem(BaseModel):
+    component_id: UUID
+    category: str
+    name: str
+    brand: str
+    price: float
+    power_consumption: int
+    in_stock: bool
+    fixed: bool = False
+
+
+class BuildOptimizeResponse(BaseModel):
+    """Результат подбора сборки"""
+    found: bool
+    # False, если поиск остановлен по лимиту времени (результат - лучший из найденных)
+    optimal: bool
+    total_price: Optional[float] = None
+    total_power_consumption: Optional[int] = None
+    items: List[OptimizedBuildItem] = []
+    compatibility: Optional[CompatibilityCheck] = None
+    nodes_explored: int
+    elapsed_ms: float
@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+from enum import Enum
+from uuid import UUID
+
+
+class PriceHistoryBucket(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class PriceHistoryPoint(BaseModel):
+    """Цена на конец интервала (последняя известная)"""
+    bucket_start: datetime
+    price: Optional[float]
+
+
+class ConfigurationPriceHistoryPoint(PriceHistoryPoint):
+    # False, если для части компонентов на этот момент еще нет истории цен
+    complete: bool
+
+
+class ComponentPriceHistoryResponse(BaseModel):
+    component_id: UUID
+    start: datetime
+    end: datetime
+    bucket: PriceHistoryBucket
+    points: List[PriceHistoryPoint]
+
+
+class ConfigurationPriceHistoryResponse(BaseModel):
+    configuration_id: UUID
+    start: datetime
+    end: datetime
+    bucket: PriceHistoryBucket
+    points: List[ConfigurationPriceHistoryPoint]
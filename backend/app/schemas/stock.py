@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List
+from datetime import date
+from uuid import UUID
+from .component import StockStatus
+
+
+class StockSnapshotItem(BaseModel):
+    """Состояние наличия одного компонента на складе"""
+    component_id: UUID
+    status: StockStatus
+    quantity: int = Field(0, ge=0)
+    expected_date: Optional[date] = None
+
+
+class StockSnapshot(BaseModel):
+    """Снимок наличия от склада"""
+    items: List[StockSnapshotItem]
+    # Полный снимок: компоненты, которых нет в снимке, считаются отсутствующими
+    full: bool = False
+
+    @model_validator(mode="after")
+    def check_full_not_empty(self):
+        # Пустой полный снимок обнулил бы наличие всего каталога
+        if self.full and not self.items:
+            raise ValueError("Полный снимок не может быть пустым")
+        return self
+
+
+class StockSyncResult(BaseModel):
+    """Результат синхронизации наличия"""
+    received: int
+    inserted: int
+    updated: int
+    zeroed: int
+    unchanged: int
+    unknown_component_ids: List[UUID] = []
+    affected_component_ids: List[UUID] = []
+    elapsed_seconds: float
@@ -2,10 +2,12 @@ from .component_service import ComponentService
 from .compatibility_service import CompatibilityService
 from .configuration_service import ConfigurationService
 from .pdf_service import PDFService
+from .batch_export_service import BatchExportService
 
 __all__ = [
     "ComponentService",
     "CompatibilityService", 
     "ConfigurationService",
-    "PDFService"
+    "PDFService",
+    "BatchExportService"
 ] 
\ No newline at end of file
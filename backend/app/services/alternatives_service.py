@@ -0,0 +1,161 @@
+import heapq
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models import Component
+from ..schemas.configuration import CompatibilityIssue, ComponentAlternative
+from .catalog_index import CatalogIndex, IndexedComponent, get_catalog_index, is_compatible
+from .compatibility_overrides import get_override_index
+from .power_model import PowerBudget
+
+
+class AlternativesService:
+    """
+    Подбор конкретных замен для компонентов, участвующих в проблемах совместимости.
+    Кандидаты берутся из индекса каталога по сокету, типу памяти и форм-фактору,
+    ранжируются по наличию и близости цены к заменяемому компоненту
+    """
+
+    def __init__(self, db: Session, index: Optional[CatalogIndex] = None):
+        self.db = db
+        self.index = index
+
+    def attach_alternatives(
+        self,
+        issues: List[CompatibilityIssue],
+        components: List[Component],
+        limit: Optional[int] = None
+    ) -> None:
+        """Заполнить issue.alternatives для каждой проблемы"""
+        if not issues:
+            return
+
+        index = self.index or get_catalog_index(self.db)
+        limit = limit or settings.COMPATIBILITY_ALTERNATIVES_LIMIT
+        overrides = get_override_index(self.db)
+
+        build = [self._to_indexed(component, index) for component in components]
+        build_ids = {component.id for component in build}
+        by_id = {component.id: component for component in build}
+        by_category: Dict[str, List[IndexedComponent]] = defaultdict(list)
+        for component in build:
+            by_category[component.category].append(component)
+        # Нагрузка на БП по той же модели, что и в CompatibilityService (блоки питания не входят)
+        budget = PowerBudget(peak=0, typical=0, transient=0, rail_12v=0)
+        for component in build:
+            if component.category != "psu":
+                budget = budget.add(component.power_profile)
+
+        cache: Dict[UUID, List[IndexedComponent]] = {}
+        for issue in issues:
+            alternatives = []
+            for component_id in issue.component_ids:
+                original = by_id.get(component_id)
+                if original is None:
+                    continue
+                if component_id not in cache:
+                    others = build_ids - {component_id}
+                    candidates = (
+                        candidate for candidate in self._candidate_pool(original, by_category, index)
+                        if candidate.id not in build_ids
+                        and self._fits(candidate, original, by_category, budget)
+                        and not overrides.conflicts(candidate.id, others)
+                    )
+                    cache[component_id] = heapq.nsmallest(
+                        limit, candidates,
+                        key=lambda c: (not c.in_stock, abs(c.price - original.price), c.price)
+                    )
+                alternatives.extend(
+                    ComponentAlternative(
+                        replaces=original.id,
+                        component_id=candidate.id,
+                        category=candidate.category,
+                        name=candidate.name,
+                        brand=candidate.brand,
+                        price=candidate.price,
+                        in_stock=candidate.in_stock
+                    )
+                    for candidate in cache[component_id]
+                )
+            issue.alternatives = alternatives
+
+    def _to_indexed(self, component: Component, index: CatalogIndex) -> IndexedComponent:
+        """Компонент сборки в представлении индекса (неактивных компонентов в индексе нет)"""
+        indexed = index.get(component.id)
+        if indexed is not None:
+            return indexed
+        return IndexedComponent.from_row(
+            component.id, component.category.slug, component.name, component.brand, component.price,
+            component.power_consumption, component.form_factor, component.specifications,
+            component.stock.status if component.stock else None
+        )
+
+    def _candidate_pool(
+        self,
+        original: IndexedComponent,
+        by_category: Dict[str, List[IndexedComponent]],
+        index: CatalogIndex
+    ) -> Iterable[IndexedComponent]:
+        """Сужение кандидатов по индексам характеристик остальной сборки"""
+        category = original.category
+        motherboard = next(iter(by_category.get("motherboard", [])), None)
+        cpu = next(iter(by_category.get("cpu", [])), None)
+
+        if category == "cpu" and motherboard and motherboard.socket:
+            return index.by_socket("cpu", motherboard.socket)
+        if category == "ram" and motherboard and motherboard.memory_types:
+            pool = {}
+            for memory_type in motherboard.memory_types:
+                for candidate in index.by_memory_type("ram", memory_type):
+                    pool[candidate.id] = candidate
+            return pool.values()
+        if category == "case" and motherboard and motherboard.form_factor:
+            return index.by_form_factor("case", motherboard.form_factor)
+        if category == "motherboard" and cpu and cpu.socket:
+            return index.by_socket("motherboard", cpu.socket)
+        return index.by_category(category)
+
+    def _fits(
+        self,
+        candidate: IndexedComponent,
+        original: IndexedComponent,
+        by_category: Dict[str, List[IndexedComponent]],
+        budget: PowerBudget
+    ) -> bool:
+        """Замена совместима с остальной сборкой по правилам, в которых она участвует"""
+        category = candidate.category
+        if category != original.category:
+            return False
+
+        if category == "motherboard":
+            rams = by_category.get("ram", [])
+            if not all(is_compatible(part, {"motherboard": candidate}) for slug in ("cpu", "ram", "case") for part in by_category.get(slug, [])):
+                return False
+            if candidate.max_memory_gb > 0 and sum(ram.capacity_gb for ram in rams) > candidate.max_memory_gb:
+                return False
+            if candidate.memory_slots > 0 and len(rams) > candidate.memory_slots:
+                return False
+        elif category in ("cpu", "ram", "case"):
+            motherboard = next(iter(by_category.get("motherboard", [])), None)
+            if motherboard and not is_compatible(candidate, {"motherboard": motherboard}):
+                return False
+            if category == "ram" and motherboard and motherboard.max_memory_gb > 0:
+                total_ram = sum(ram.capacity_gb for ram in by_category["ram"]) - original.capacity_gb + candidate.capacity_gb
+                if total_ram > motherboard.max_memory_gb:
+                    return False
+
+        if category == "psu":
+            return candidate.psu.covers(budget)
+
+        # Замена не должна создавать проблему с блоком питания, если ее не было
+        psu = next(iter(by_category.get("psu", [])), None)
+        original_profile, profile = original.power_profile, candidate.power_profile
+        if psu and (
+            profile.peak > original_profile.peak
+            or profile.transient > original_profile.transient
+            or profile.rail_12v > original_profile.rail_12v
+        ):
+            return psu.psu.covers(budget.add(original_profile, -1).add(profile))
+        return True
@@ -0,0 +1,218 @@
+import time
+import queue
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Правила совпадают с ConfigurationService._calculate_availability_status и
+# _calculate_expected_delivery_date: учитываются компоненты конфигурации,
+# компонент без записи о наличии считается отсутствующим
+_RECOMPUTE_SQL = text("""
+    WITH stock AS (
+        SELECT ci.configuration_id,
+               bool_and(coalesce(cs.status, 'out_of_stock') = 'in_stock') AS all_in_stock,
+               bool_or(coalesce(cs.status, 'out_of_stock') IN ('in_stock', 'expected')) AS any_available,
+               max(cs.expected_date) AS expected_date
+        FROM configuration_items ci
+        LEFT JOIN component_stock cs ON cs.component_id = ci.component_id
+        WHERE ci.configuration_id = ANY(:config_ids)
+        GROUP BY ci.configuration_id
+    ),
+    target AS (
+        SELECT c.id,
+               CASE
+                   WHEN stock.configuration_id IS NULL THEN 'unknown'
+                   WHEN stock.all_in_stock THEN 'available'
+                   WHEN stock.any_available THEN 'partial'
+                   ELSE 'unavailable'
+               END AS availability_status,
+               stock.expected_date
+        FROM configurations c
+        LEFT JOIN stock ON stock.configuration_id = c.id
+        WHERE c.id = ANY(:config_ids)
+    )
+    UPDATE configurations c
+    SET availability_status = t.availability_status,
+        expected_delivery_date = t.expected_date
+    FROM target t
+    WHERE c.id = t.id
+      AND (c.availability_status, c.expected_delivery_date)
+          IS DISTINCT FROM
+          (t.availability_status, t.expected_date)
+""")
+
+_AFFECTED_CONFIGURATIONS_SQL = text("""
+    SELECT DISTINCT configuration_id
+    FROM configuration_items
+    WHERE component_id = ANY(:component_ids)
+""")
+
+
+class AvailabilityService:
+    """
+    Пересчет статуса наличия и ожидаемой даты поставки конфигураций.
+    Затронутые конфигурации находятся по индексу configuration_items.component_id,
+    пересчет идет пачками, одним UPDATE с агрегатами на пачку
+    """
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.AVAILABILITY_BATCH_SIZE
+
+    def find_affected_configurations(self, component_ids: Iterable[UUID]) -> List[UUID]:
+        """Конфигурации, в которые входят указанные компоненты"""
+        ids = list(component_ids)
+        if not ids:
+            return []
+        return [row[0] for row in self.db.execute(_AFFECTED_CONFIGURATIONS_SQL, {"component_ids": ids})]
+
+    def recompute_for_components(self, component_ids: Iterable[UUID]) -> Dict[str, int]:
+        """Пересчитать конфигурации, затронутые изменением наличия компонентов"""
+        return self.recompute_configurations(self.find_affected_configurations(component_ids))
+
+    def recompute_configurations(self, config_ids: List[UUID]) -> Dict[str, int]:
+        """Пересчитать конфигурации пачками, каждая пачка - отдельная транзакция"""
+        stats = {"checked": 0, "updated": 0, "batches": 0}
+        for start in range(0, len(config_ids), self.batch_size):
+            batch = config_ids[start:start + self.batch_size]
+            stats["updated"] += self.db.execute(_RECOMPUTE_SQL, {"config_ids": batch}).rowcount
+            self.db.commit()
+            stats["checked"] += len(batch)
+            stats["batches"] += 1
+        return stats
+
+    def recompute_all(self) -> Dict[str, int]:
+        """Пересчитать все конфигурации (обход по ключу, без OFFSET)"""
+        stats = {"checked": 0, "updated": 0, "batches": 0}
+        last_id = None
+        while True:
+            if last_id is None:
+                rows = self.db.execute(
+                    text("SELECT id FROM configurations ORDER BY id LIMIT :limit"),
+                    {"limit": self.batch_size}
+                )
+            else:
+                rows = self.db.execute(
+                    text("SELECT id FROM configurations WHERE id > :last_id ORDER BY id LIMIT :limit"),
+                    {"last_id": last_id, "limit": self.batch_size}
+                )
+            batch = [row[0] for row in rows]
+            if not batch:
+                return stats
+
+            batch_stats = self.recompute_configurations(batch)
+            for key, value in batch_stats.items():
+                stats[key] += value
+            last_id = batch[-1]
+
+
+class AvailabilityWorker:
+    """
+    Фоновый поток пересчета наличия.
+    Изменения, накопившиеся в очереди, объединяются в один пересчет,
+    поэтому частые синхронизации склада не создают лишних проходов
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[Set[UUID]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._metrics = {
+            "runs": 0,
+            "batches": 0,
+            "components": 0,
+            "configurations_checked": 0,
+            "configurations_updated": 0,
+            "errors": 0,
+            "busy_seconds": 0.0,
+            "last_run_seconds": 0.0,
+        }
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="availability-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def enqueue(self, component_ids: Iterable[UUID]) -> None:
+        """Поставить в очередь пересчет для изменившихся компонентов"""
+        ids = set(component_ids)
+        if ids:
+            self._queue.put(ids)
+
+    def metrics(self) -> Dict[str, float]:
+        """Счетчики воркера и пропускная способность (конфигураций в секунду)"""
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics["busy_seconds"] = round(metrics["busy_seconds"], 3)
+        metrics["pending"] = self._queue.qsize()
+        metrics["configurations_per_second"] = round(
+            metrics["configurations_checked"] / metrics["busy_seconds"], 1
+        ) if metrics["busy_seconds"] > 0 else 0.0
+        return metrics
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            # Забираем все, что успело накопиться, и обрабатываем одним проходом
+            component_ids = set(item)
+            stop = False
+            while True:
+                try:
+                    pending = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stop = True
+                    break
+                component_ids.update(pending)
+
+            self._process(component_ids)
+            if stop:
+                return
+
+    def _process(self, component_ids: Set[UUID]) -> None:
+        started = time.perf_counter()
+        try:
+            with SessionLocal() as db:
+                stats = AvailabilityService(db).recompute_for_components(component_ids)
+        except Exception as e:
+            logger.error(f"Ошибка пересчета наличия конфигураций: {e}", exc_info=True)
+            with self._lock:
+                self._metrics["errors"] += 1
+            return
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._metrics["runs"] += 1
+            self._metrics["batches"] += stats["batches"]
+            self._metrics["components"] += len(component_ids)
+            self._metrics["configurations_checked"] += stats["checked"]
+            self._metrics["configurations_updated"] += stats["updated"]
+            self._metrics["busy_seconds"] += elapsed
+            self._metrics["last_run_seconds"] = round(elapsed, 3)
+
+        logger.info(
+            f"Пересчет наличия: компонентов {len(component_ids)}, конфигураций {stats['checked']}, "
+            f"обновлено {stats['updated']} за {elapsed:.3f}с"
+        )
+
+
+availability_worker = AvailabilityWorker()
@@ -0,0 +1,129 @@
+import re
+import logging
+import zipfile
+from concurrent.futures import as_completed
+from datetime import datetime
+from typing import List, Iterator
+from uuid import UUID
+from sqlalchemy.orm import Session, selectinload
+from ..models import Configuration, ConfigurationItem, ConfigurationAccessory, Component
+from ..schemas.configuration import ConfigurationExport, ExportFormat
+from .compatibility_service import CompatibilityService
+from .pdf_service import render_configuration_document_in_worker
+from .process_pool import get_process_pool
+from ..monitoring.metrics import timed_job
+
+logger = logging.getLogger(__name__)
+
+
+class _ZipStreamBuffer:
+    """Файловый объект только для записи: ZipFile пишет в него, а мы забираем готовые куски архива"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class BatchExportService:
+    """Сервис пакетного экспорта конфигураций в один ZIP архив"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.compatibility_service = CompatibilityService(db)
+
+    def load_configurations(self, config_ids: List[UUID]) -> List[Configuration]:
+        """
+        Загрузить конфигурации со всеми компонентами: позиции и аксессуары - отдельными
+        запросами (selectinload), без декартова произведения двух коллекций
+        """
+        configs = self.db.query(Configuration).options(
+            selectinload(Configuration.items).joinedload(ConfigurationItem.component).joinedload(Component.category),
+            selectinload(Configuration.items).joinedload(ConfigurationItem.component).joinedload(Component.stock),
+            selectinload(Configuration.accessories).joinedload(ConfigurationAccessory.component).joinedload(Component.category),
+            selectinload(Configuration.accessories).joinedload(ConfigurationAccessory.component).joinedload(Component.stock)
+        ).filter(Configuration.id.in_(config_ids)).all()
+
+        # Сохраняем порядок, в котором ID были переданы
+        configs_by_id = {config.id: config for config in configs}
+        return [configs_by_id[config_id] for config_id in config_ids if config_id in configs_by_id]
+
+    def build_export_data(self, configs: List[Configuration]) -> List[ConfigurationExport]:
+        """Подготовить данные для экспорта без дополнительных запросов к БД"""
+        export_date = datetime.now()
+        exports = []
+
+        for config in configs:
+            # Компоненты уже загружены вместе с категориями
+            components = [item.component for item in config.items]
+            quantities = {item.component_id: item.quantity for item in config.items}
+            compatibility_check = self.compatibility_service.check_components_compatibility(
+                components, quantities=quantities
+            )
+
+            exports.append(ConfigurationExport(
+                configuration=config,
+                compatibility_check=compatibility_check,
+                export_date=export_date,
+                notes="Конфигурация создана с помощью веб-конфигуратора ПК"
+            ))
+
+        return exports
+
+    def mark_exported(self, configs: List[Configuration]) -> None:
+        """Обновить статус всех экспортированных конфигураций одним коммитом"""
+        for config in configs:
+            config.status = "exported"
+        self.db.commit()
+
+    @timed_job("batch_export")
+    def stream_zip(
+        self,
+        exports: List[ConfigurationExport],
+        export_format: ExportFormat = ExportFormat.PDF
+    ) -> Iterator[bytes]:
+        """
+        Рендерит отчеты параллельно в пуле процессов и отдает ZIP архив
+        по мере готовности файлов
+        """
+        pool = get_process_pool()
+        futures = {
+            pool.submit(render_configuration_document_in_worker, export_data, export_format): export_data
+            for export_data in exports
+        }
+
+        buffer = _ZipStreamBuffer()
+        with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for future in as_completed(futures):
+                export_data = futures[future]
+                try:
+                    content, extension = future.result()
+                except Exception as e:
+                    logger.error(
+                        f"Ошибка рендеринга конфигурации {export_data.configuration.id}: {e}",
+                        exc_info=True
+                    )
+                    content = f"Не удалось сформировать отчет: {e}".encode("utf-8")
+                    extension = "error.txt"
+
+                archive.writestr(self._build_filename(export_data, extension), content)
+                yield buffer.drain()
+
+        # Центральный каталог архива дописывается при закрытии
+        yield buffer.drain()
+
+    def _build_filename(self, export_data: ConfigurationExport, extension: str) -> str:
+        """Имя файла внутри архива (уникальное за счет префикса ID)"""
+        config = export_data.configuration
+        safe_name = re.sub(r'[\\/:*?"<>|\s]+', "_", config.name).strip("_") or "конфигурация"
+        return f"конфигурация_{safe_name}_{str(config.id)[:8]}.{extension}"
@@ -0,0 +1,289 @@
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload
+from ..config import settings
+from ..models import Component
+from ..schemas.configuration import BuildOptimizeRequest, BuildOptimizeResponse, OptimizedBuildItem
+from .catalog_index import CatalogIndex, IndexedComponent, get_catalog_index, is_compatible
+from .compatibility_service import CompatibilityService
+from .power_model import PowerBudget, PowerProfile, PsuProfile
+
+# Порядок перебора: сначала категории с ограничениями совместимости, чтобы отсекать ветви раньше
+_SEARCH_ORDER = ["motherboard", "cpu", "ram", "case"]
+
+# Как часто проверять лимит времени (в узлах поиска)
+_TIME_CHECK_INTERVAL = 1024
+
+
+def _signature(component: IndexedComponent) -> Tuple:
+    """Характеристики, от которых зависит совместимость компонента с остальной сборкой"""
+    category = component.category
+    if category == "cpu":
+        return (component.socket,)
+    if category == "motherboard":
+        return (
+            component.socket, component.memory_types, component.form_factor,
+            component.max_memory_gb, component.memory_slots
+        )
+    if category == "ram":
+        return (component.memory_types, component.capacity_gb)
+    if category == "case":
+        return (component.supported_form_factors,)
+    return ()
+
+
+_EMPTY_BUDGET = PowerBudget(peak=0, typical=0, transient=0, rail_12v=0)
+
+
+def _draws_no_more(profile: PowerProfile, other: PowerProfile) -> bool:
+    """Нагрузка profile не больше other по всем величинам, которые проверяются для БП"""
+    return profile.peak <= other.peak and profile.transient <= other.transient and profile.rail_12v <= other.rail_12v
+
+
+def _supplies_no_less(psu: PsuProfile, other: PsuProfile) -> bool:
+    """БП psu выдерживает любую нагрузку, которую выдерживает other"""
+    return (
+        psu.wattage >= other.wattage
+        and psu.rail_12v >= other.rail_12v
+        and psu.wattage * psu.transient_tolerance >= other.wattage * other.transient_tolerance
+    )
+
+
+def _budget(components: Iterable[IndexedComponent]) -> PowerBudget:
+    budget = _EMPTY_BUDGET
+    for component in components:
+        budget = budget.add(component.power_profile)
+    return budget
+
+
+def _pareto_front(candidates: List[IndexedComponent]) -> List[IndexedComponent]:
+    """
+    Отсечение доминируемых кандидатов: среди компонентов с одинаковыми характеристиками
+    совместимости остаются только те, у которых нет варианта дешевле и с меньшей нагрузкой на БП
+    """
+    groups: Dict[Tuple, List[IndexedComponent]] = {}
+    for component in candidates:
+        groups.setdefault(_signature(component), []).append(component)
+
+    front = []
+    for group in groups.values():
+        kept: List[IndexedComponent] = []
+        for component in sorted(group, key=lambda c: (c.price, c.power)):
+            if not any(_draws_no_more(other.power_profile, component.power_profile) for other in kept):
+                kept.append(component)
+        front.extend(kept)
+    front.sort(key=lambda c: c.price)
+    return front
+
+
+def _psu_front(candidates: List[IndexedComponent]) -> List[IndexedComponent]:
+    """Блоки питания, для которых нет варианта дешевле, выдерживающего ту же нагрузку"""
+    front: List[IndexedComponent] = []
+    for psu in sorted(candidates, key=lambda c: (c.price, -c.wattage, c.power)):
+        if not any(_supplies_no_less(other.psu, psu.psu) for other in front):
+            front.append(psu)
+    return front
+
+
+class _BranchAndBound:
+    """
+    Поиск самой дешевой совместимой сборки методом ветвей и границ.
+    Кандидаты каждой категории перебираются по возрастанию цены, ветвь отсекается,
+    если нижняя оценка стоимости (уже выбранное + самые дешевые варианты оставшихся
+    категорий + самый дешевый подходящий БП) не лучше найденного решения или бюджета
+    """
+
+    def __init__(
+        self,
+        categories: List[str],
+        candidates: Dict[str, List[IndexedComponent]],
+        psu_candidates: Optional[List[IndexedComponent]],
+        fixed: Dict[str, IndexedComponent],
+        budget: float,
+        time_limit: float
+    ):
+        self.categories = categories
+        self.candidates = candidates
+        self.psu_candidates = psu_candidates
+        self.fixed = fixed
+        self.deadline = time.perf_counter() + time_limit
+
+        # Нижние оценки для оставшихся категорий (нагрузка - минимум по каждой величине отдельно)
+        self.rest_min_price = [0.0] * (len(categories) + 1)
+        self.rest_min_budget = [_EMPTY_BUDGET] * (len(categories) + 1)
+        for i in range(len(categories) - 1, -1, -1):
+            options = candidates[categories[i]]
+            self.rest_min_price[i] = self.rest_min_price[i + 1] + min(c.price for c in options)
+            self.rest_min_budget[i] = self.rest_min_budget[i + 1].add(PowerProfile(
+                peak=min(c.power_profile.peak for c in options),
+                typical=min(c.power_profile.typical for c in options),
+                transient=min(c.power_profile.transient for c in options),
+                rail_12v=min(c.power_profile.rail_12v for c in options),
+            ))
+
+        self.min_psu_price = min(c.price for c in psu_candidates) if psu_candidates else 0.0
+
+        # Цена в пределах бюджета (с точностью до копейки)
+        self.best_cost = budget + 0.005
+        self.best: Optional[Dict[str, IndexedComponent]] = None
+        self.nodes = 0
+        self.timed_out = False
+
+    def run(self) -> Optional[Dict[str, IndexedComponent]]:
+        fixed_cost = sum(c.price for c in self.fixed.values())
+        self._search(0, dict(self.fixed), fixed_cost, _budget(self.fixed.values()))
+        return self.best
+
+    def _cheapest_psu(self, budget: PowerBudget) -> Optional[IndexedComponent]:
+        """Самый дешевый БП, который проверка совместимости примет без предупреждений"""
+        for psu in self.psu_candidates:
+            if psu.psu.covers(budget):
+                return psu
+        return None
+
+    def _search(self, depth: int, chosen: Dict[str, IndexedComponent], cost: float, budget: PowerBudget) -> None:
+        self.nodes += 1
+        if self.nodes % _TIME_CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            self.timed_out = True
+        if self.timed_out:
+            return
+
+        if depth == len(self.categories):
+            if self.psu_candidates is not None:
+                psu = self._cheapest_psu(budget)
+                if psu is None:
+                    return
+                cost += psu.price
+                chosen = {**chosen, "psu": psu}
+            if cost < self.best_cost:
+                self.best_cost = cost
+                self.best = dict(chosen)
+            return
+
+        category = self.categories[depth]
+        rest_price = self.rest_min_price[depth + 1]
+        rest_budget = self.rest_min_budget[depth + 1]
+
+        for candidate in self.candidates[category]:
+            new_cost = cost + candidate.price
+            # Кандидаты идут по возрастанию цены: дальше оценка только хуже
+            if new_cost + rest_price + self.min_psu_price >= self.best_cost:
+                break
+            if not is_compatible(candidate, chosen):
+                continue
+
+            new_budget = budget.add(candidate.power_profile)
+            if self.psu_candidates is not None:
+                psu = self._cheapest_psu(new_budget.add(rest_budget))
+                if psu is None or new_cost + rest_price + psu.price >= self.best_cost:
+                    continue
+
+            chosen[category] = candidate
+            self._search(depth + 1, chosen, new_cost, new_budget)
+            del chosen[category]
+            if self.timed_out:
+                return
+
+
+class BuildOptimizerService:
+    """Подбор самой дешевой совместимой сборки по индексу каталога в памяти"""
+
+    def __init__(self, db: Session, index: Optional[CatalogIndex] = None):
+        self.db = db
+        self.index = index
+        self.compatibility_service = CompatibilityService(db)
+
+    def optimize(self, request: BuildOptimizeRequest) -> BuildOptimizeResponse:
+        started = time.perf_counter()
+        index = self.index or get_catalog_index(self.db)
+
+        fixed: Dict[str, IndexedComponent] = {}
+        for component_id in request.fixed_component_ids:
+            component = index.get(component_id)
+            if component is None:
+                raise ValueError(f"Компонент {component_id} не найден среди активных")
+            if component.category in fixed:
+                raise ValueError(f"Можно закрепить только один компонент категории {component.category}")
+            fixed[component.category] = component
+
+        if not all(is_compatible(component, fixed) for component in fixed.values()):
+            raise ValueError("Закрепленные компоненты несовместимы между собой")
+
+        requested = list(dict.fromkeys(request.categories))
+        search_categories = sorted(
+            (slug for slug in requested if slug != "psu" and slug not in fixed),
+            key=lambda slug: _SEARCH_ORDER.index(slug) if slug in _SEARCH_ORDER else len(_SEARCH_ORDER)
+        )
+
+        candidates: Dict[str, List[IndexedComponent]] = {}
+        for slug in search_categories:
+            options = [
+                c for c in index.by_category(slug)
+                if c.in_stock or not request.only_in_stock
+            ]
+            # Ограничения закрепленной платы применяются сразу, до перебора
+            options = [c for c in options if is_compatible(c, fixed)]
+            if not options:
+                return self._not_found(started, 0)
+            candidates[slug] = _pareto_front(options)
+
+        psu_candidates = None
+        if "psu" in fixed:
+            psu_candidates = [fixed.pop("psu")]
+        elif "psu" in requested:
+            psu_candidates = _psu_front([
+                c for c in index.by_category("psu")
+                if c.in_stock or not request.only_in_stock
+            ])
+            if not psu_candidates:
+                return self._not_found(started, 0)
+
+        search = _BranchAndBound(
+            search_categories, candidates, psu_candidates, fixed,
+            request.budget, settings.OPTIMIZER_TIME_LIMIT_MS / 1000
+        )
+        best = search.run()
+        if best is None:
+            return self._not_found(started, search.nodes, optimal=not search.timed_out)
+
+        fixed_ids = set(request.fixed_component_ids)
+        order = {slug: position for position, slug in enumerate(requested)}
+        build = sorted(best.values(), key=lambda c: order.get(c.category, len(order)))
+
+        return BuildOptimizeResponse(
+            found=True,
+            optimal=not search.timed_out,
+            total_price=round(sum(c.price for c in build), 2),
+            total_power_consumption=sum(c.power for c in build),
+            items=[
+                OptimizedBuildItem(
+                    component_id=c.id,
+                    category=c.category,
+                    name=c.name,
+                    brand=c.brand,
+                    price=c.price,
+                    power_consumption=c.power,
+                    in_stock=c.in_stock,
+                    fixed=c.id in fixed_ids
+                )
+                for c in build
+            ],
+            compatibility=self._verify(build),
+            nodes_explored=search.nodes,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 1)
+        )
+
+    def _verify(self, build: List[IndexedComponent]):
+        """Итоговая проверка сборки тем же сервисом совместимости, что и для конфигураций"""
+        components = self.db.query(Component).options(
+            joinedload(Component.category)
+        ).filter(Component.id.in_([c.id for c in build])).all()
+        return self.compatibility_service.check_components_compatibility(components)
+
+    def _not_found(self, started: float, nodes: int, optimal: bool = True) -> BuildOptimizeResponse:
+        return BuildOptimizeResponse(
+            found=False,
+            optimal=optimal,
+            nodes_explored=nodes,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 1)
+        )
@@ -0,0 +1,62 @@
+import csv
+import json
+import tempfile
+from typing import Any, Iterable, Sequence
+from sqlalchemy.orm import Session
+
+# Порог, после которого буфер для COPY сбрасывается из памяти на диск
+_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+
+def _to_csv_value(value: Any) -> Any:
+    """Привести значение к виду, который понимает COPY в формате CSV"""
+    if value is None:
+        return None  # Пустое поле без кавычек - NULL
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value)
+
+
+def copy_rows(db: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence[Any]]) -> int:
+    """
+    Загрузить строки в таблицу через COPY ... FROM STDIN в рамках текущей транзакции сессии.
+    Возвращает количество загруженных строк
+    """
+    count = 0
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE, mode="w+", encoding="utf-8", newline="") as buffer:
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_to_csv_value(value) for value in row])
+            count += 1
+
+        if count:
+            _copy_buffer(db, table, columns, buffer)
+
+    return count
+
+
+def copy_csv_chunks(db: Session, table: str, columns: Sequence[str], chunks: Iterable[str]) -> None:
+    """
+    Загрузить через COPY уже подготовленный CSV текст (куски из целых строк).
+    Для больших объемов, где построчная сериализация в copy_rows становится узким местом
+    """
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE, mode="w+", encoding="utf-8", newline="") as buffer:
+        for chunk in chunks:
+            buffer.write(chunk)
+
+        if buffer.tell():
+            _copy_buffer(db, table, columns, buffer)
+
+
+def _copy_buffer(db: Session, table: str, columns: Sequence[str], buffer) -> None:
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
@@ -0,0 +1,284 @@
+import csv
+import json
+import time
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+from uuid import UUID
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ..models import ComponentCategory
+from ..schemas.component import ComponentImportRow, CatalogImportResult, CatalogImportError
+from .bulk import copy_rows
+from .stock_sync_service import notify_stock_changed
+from .catalog_index import invalidate_catalog_index
+from .response_cache import invalidate_catalog_responses
+from ..monitoring.metrics import timed_job
+
+logger = logging.getLogger(__name__)
+
+# Сколько ошибок валидации возвращать в отчете (считаются все)
+MAX_REPORTED_ERRORS = 100
+
+STAGING_TABLE = "component_import_staging"
+STAGING_COLUMNS = (
+    "row_number", "name", "brand", "model", "description", "price", "category_id",
+    "specifications", "form_factor", "power_consumption", "is_active",
+    "stock_status", "stock_quantity", "expected_date"
+)
+
+# Поля CSV, в которых пустая строка означает, что значение не задано
+_OPTIONAL_CSV_FIELDS = (
+    "description", "category_id", "category_slug", "form_factor", "power_consumption",
+    "is_active", "stock_status", "stock_quantity", "expected_date"
+)
+
+
+class CatalogImportService:
+    """
+    Массовая загрузка каталога из CSV/JSONL фидов поставщиков.
+    Строки валидируются pydantic схемой, загружаются через COPY во временную
+    таблицу и применяются к каталогу несколькими set-based запросами
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @timed_job("catalog_import")
+    def import_stream(self, stream: TextIO, file_format: str = "csv") -> CatalogImportResult:
+        """Загрузить фид из текстового потока (format: csv или jsonl)"""
+        started = time.perf_counter()
+
+        categories = {slug: category_id for category_id, slug in self.db.query(ComponentCategory.id, ComponentCategory.slug)}
+        category_ids = set(categories.values())
+
+        errors: List[CatalogImportError] = []
+        counters = {"read": 0, "valid": 0, "invalid": 0}
+
+        def add_error(line: int, message: str) -> None:
+            counters["invalid"] += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(CatalogImportError(line=line, message=message))
+
+        def staging_rows() -> Iterator[Tuple[Any, ...]]:
+            for line, record, parse_error in self._iter_records(stream, file_format):
+                counters["read"] += 1
+                if parse_error:
+                    add_error(line, parse_error)
+                    continue
+
+                try:
+                    row = ComponentImportRow.model_validate(record)
+                except ValidationError as e:
+                    add_error(line, "; ".join(
+                        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+                        for err in e.errors()
+                    ))
+                    continue
+
+                category_id = row.category_id
+                if category_id is None:
+                    category_id = categories.get(row.category_slug)
+                    if category_id is None:
+                        add_error(line, f"Неизвестная категория: {row.category_slug}")
+                        continue
+                elif category_id not in category_ids:
+                    add_error(line, f"Неизвестная категория: {category_id}")
+                    continue
+
+                counters["valid"] += 1
+                yield (
+                    line, row.name, row.brand, row.model, row.description, row.price, category_id,
+                    row.specifications, row.form_factor, row.power_consumption, row.is_active,
+                    row.stock_status.value if row.stock_status else None, row.stock_quantity, row.expected_date
+                )
+
+        self._create_staging_table()
+        copy_rows(self.db, STAGING_TABLE, STAGING_COLUMNS, staging_rows())
+        stats, stock_changed_ids = self._apply_staging()
+        self.db.commit()
+        if stats["inserted"] or stats["updated"]:
+            invalidate_catalog_index()
+            invalidate_catalog_responses()
+        notify_stock_changed(stock_changed_ids)
+
+        elapsed = time.perf_counter() - started
+        result = CatalogImportResult(
+            rows_read=counters["read"],
+            rows_valid=counters["valid"],
+            rows_invalid=counters["invalid"],
+            errors=errors,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(counters["read"] / elapsed, 1) if elapsed > 0 else 0.0,
+            **stats
+        )
+        logger.info(
+            f"Загрузка каталога: прочитано {result.rows_read}, добавлено {result.inserted}, "
+            f"обновлено {result.updated}, ошибок {result.rows_invalid}, "
+            f"{result.rows_per_second} строк/с"
+        )
+        return result
+
+    def _iter_records(self, stream: TextIO, file_format: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+        """Построчное чтение фида: (номер строки, запись, ошибка разбора)"""
+        if file_format == "jsonl":
+            for line_number, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, None, f"Некорректный JSON: {e}"
+                    continue
+                if not isinstance(record, dict):
+                    yield line_number, None, "Строка должна быть JSON объектом"
+                    continue
+                yield line_number, record, None
+        elif file_format == "csv":
+            reader = csv.DictReader(stream)
+            for record in reader:
+                # Номер строки файла с учетом заголовка
+                line_number = reader.line_num
+                for field in _OPTIONAL_CSV_FIELDS:
+                    if record.get(field) == "":
+                        # Пустое значение - поле не задано, применяется значение по умолчанию схемы
+                        del record[field]
+                specifications = record.get("specifications")
+                if specifications:
+                    try:
+                        record["specifications"] = json.loads(specifications)
+                    except json.JSONDecodeError as e:
+                        yield line_number, None, f"Некорректный JSON в specifications: {e}"
+                        continue
+                else:
+                    record["specifications"] = {}
+                yield line_number, record, None
+        else:
+            raise ValueError(f"Неподдерживаемый формат фида: {file_format}")
+
+    def _create_staging_table(self) -> None:
+        """Временная таблица живет до конца транзакции"""
+        self.db.execute(text(f"""
+            CREATE TEMP TABLE {STAGING_TABLE} (
+                row_number integer,
+                name varchar(200),
+                brand varchar(100),
+                model varchar(100),
+                description text,
+                price numeric(10, 2),
+                category_id uuid,
+                specifications jsonb,
+                form_factor varchar(50),
+                power_consumption integer,
+                is_active boolean,
+                stock_status varchar(20),
+                stock_quantity integer,
+                expected_date date,
+                component_id uuid,
+                is_new boolean NOT NULL DEFAULT false
+            ) ON COMMIT DROP
+        """))
+
+    def _apply_staging(self) -> Tuple[Dict[str, Any], Set[UUID]]:
+        """
+        Применить загруженные строки к каталогу set-based запросами.
+        Возвращает статистику и ID компонентов, у которых изменилось наличие
+        """
+        execute = self.db.execute
+
+        # Дубликаты внутри фида: побеждает последняя строка
+        execute(text(f"""
+            DELETE FROM {STAGING_TABLE} s
+            USING {STAGING_TABLE} d
+            WHERE s.category_id = d.category_id
+              AND s.brand = d.brand
+              AND s.model = d.model
+              AND s.row_number < d.row_number
+        """))
+        execute(text(f"ANALYZE {STAGING_TABLE}"))
+
+        # Сопоставляем с каталогом по ключу (категория, бренд, модель)
+        execute(text(f"""
+            UPDATE {STAGING_TABLE} s
+            SET component_id = c.id
+            FROM components c
+            WHERE c.category_id = s.category_id
+              AND c.brand = s.brand
+              AND c.model = s.model
+        """))
+
+        # Компоненты, у которых меняется цена (для пересчета конфигураций и истории цен)
+        price_changed_ids = [row[0] for row in execute(text(f"""
+            SELECT c.id
+            FROM components c
+            JOIN {STAGING_TABLE} s ON s.component_id = c.id
+            WHERE c.price IS DISTINCT FROM s.price
+        """))]
+
+        updated = execute(text(f"""
+            UPDATE components c
+            SET name = s.name,
+                description = s.description,
+                price = s.price,
+                specifications = s.specifications,
+                form_factor = s.form_factor,
+                power_consumption = s.power_consumption,
+                is_active = s.is_active,
+                updated_at = now()
+            FROM {STAGING_TABLE} s
+            WHERE c.id = s.component_id
+              AND (c.name, c.description, c.price, c.specifications, c.form_factor, c.power_consumption, c.is_active)
+                  IS DISTINCT FROM
+                  (s.name, s.description, s.price, s.specifications, s.form_factor, s.power_consumption, s.is_active)
+        """)).rowcount
+
+        execute(text(f"""
+            UPDATE {STAGING_TABLE}
+            SET component_id = gen_random_uuid(), is_new = true
+            WHERE component_id IS NULL
+        """))
+        inserted = execute(text(f"""
+            INSERT INTO components (
+                id, name, brand, model, description, price, category_id,
+                specifications, form_factor, power_consumption, is_active
+            )
+            SELECT component_id, name, brand, model, description, price, category_id,
+                   specifications, form_factor, power_consumption, is_active
+            FROM {STAGING_TABLE}
+            WHERE is_new
+        """)).rowcount
+
+        stock_updated_ids = {row[0] for row in execute(text(f"""
+            UPDATE component_stock cs
+            SET status = s.stock_status,
+                quantity = s.stock_quantity,
+                expected_date = s.expected_date,
+                updated_at = now()
+            FROM {STAGING_TABLE} s
+            WHERE cs.component_id = s.component_id
+              AND s.stock_status IS NOT NULL
+              AND (cs.status, cs.quantity, cs.expected_date)
+                  IS DISTINCT FROM
+                  (s.stock_status, s.stock_quantity, s.expected_date)
+            RETURNING cs.component_id
+        """))}
+        stock_inserted_ids = {row[0] for row in execute(text(f"""
+            INSERT INTO component_stock (id, component_id, status, quantity, expected_date, updated_at)
+            SELECT gen_random_uuid(), s.component_id, s.stock_status, s.stock_quantity, s.expected_date, now()
+            FROM {STAGING_TABLE} s
+            WHERE s.stock_status IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM component_stock cs WHERE cs.component_id = s.component_id)
+            RETURNING component_id
+        """))}
+
+        total = execute(text(f"SELECT count(*) FROM {STAGING_TABLE}")).scalar()
+
+        stats = {
+            "inserted": inserted,
+            "updated": updated,
+            "unchanged": total - inserted - updated,
+            "stock_inserted": len(stock_inserted_ids),
+            "stock_updated": len(stock_updated_ids),
+            "price_changed_component_ids": price_changed_ids
+        }
+        return stats, stock_updated_ids | stock_inserted_ids
@@ -0,0 +1,209 @@
+import time
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..models import Component, ComponentCategory, ComponentStock
+from .power_model import PowerProfile, PsuProfile, profile_from_specs, psu_profile_from_specs
+
+
+def _as_frozenset(value) -> FrozenSet[str]:
+    """Характеристика может быть строкой или списком строк"""
+    if not value:
+        return frozenset()
+    if isinstance(value, str):
+        return frozenset([value])
+    return frozenset(str(item) for item in value)
+
+
+def _as_int(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+@dataclass(frozen=True)
+class IndexedComponent:
+    """Компонент каталога с характеристиками, нужными для проверки совместимости"""
+    id: UUID
+    category: str
+    name: str
+    brand: str
+    price: float
+    power: int
+    in_stock: bool
+    socket: Optional[str]
+    # Для материнской платы - поддерживаемые типы памяти, для модуля памяти - его тип
+    memory_types: FrozenSet[str]
+    form_factor: Optional[str]
+    supported_form_factors: FrozenSet[str]
+    wattage: int
+    capacity_gb: int
+    max_memory_gb: int
+    memory_slots: int
+    # Модель энергопотребления, общая с CompatibilityService
+    power_profile: PowerProfile
+    psu: Optional[PsuProfile]
+
+    @classmethod
+    def from_row(
+        cls,
+        component_id: UUID,
+        category: str,
+        name: str,
+        brand: str,
+        price,
+        power_consumption: Optional[int],
+        form_factor: Optional[str],
+        specifications: Optional[dict],
+        stock_status: Optional[str]
+    ) -> "IndexedComponent":
+        specs = specifications or {}
+        return cls(
+            id=component_id,
+            category=category,
+            name=name,
+            brand=brand,
+            price=float(price),
+            power=power_consumption or 0,
+            in_stock=stock_status == "in_stock",
+            socket=specs.get("socket"),
+            memory_types=_as_frozenset(specs.get("memory_type")),
+            form_factor=form_factor,
+            supported_form_factors=_as_frozenset(specs.get("supported_form_factors")),
+            wattage=_as_int(specs.get("wattage")),
+            capacity_gb=_as_int(specs.get("capacity_gb")),
+            max_memory_gb=_as_int(specs.get("max_memory_gb")),
+            memory_slots=_as_int(specs.get("memory_slots")),
+            power_profile=profile_from_specs(category, power_consumption, specs),
+            psu=psu_profile_from_specs(specs) if category == "psu" else None,
+        )
+
+
+def is_compatible(candidate: IndexedComponent, chosen: Dict[str, IndexedComponent]) -> bool:
+    """Те же правила, что и в CompatibilityService (ошибки и предупреждения)"""
+    category = candidate.category
+    motherboard = chosen.get("motherboard")
+
+    if category == "cpu" and motherboard:
+        return not (candidate.socket and motherboard.socket and candidate.socket != motherboard.socket)
+
+    if category == "ram" and motherboard:
+        if candidate.memory_types and motherboard.memory_types and not candidate.memory_types <= motherboard.memory_types:
+            return False
+        if motherboard.max_memory_gb > 0 and candidate.capacity_gb > motherboard.max_memory_gb:
+            return False
+        return True
+
+    if category == "case" and motherboard:
+        return not (
+            motherboard.form_factor and candidate.supported_form_factors
+            and motherboard.form_factor not in candidate.supported_form_factors
+        )
+
+    if category == "motherboard":
+        cpu = chosen.get("cpu")
+        ram = chosen.get("ram")
+        case = chosen.get("case")
+        if cpu and not is_compatible(cpu, {"motherboard": candidate}):
+            return False
+        if ram and not is_compatible(ram, {"motherboard": candidate}):
+            return False
+        if case and not is_compatible(case, {"motherboard": candidate}):
+            return False
+
+    return True
+
+
+class CatalogIndex:
+    """
+    Снимок активного каталога в памяти с индексами по категории, сокету,
+    типу памяти и форм-фактору. Списки внутри индексов отсортированы по цене
+    """
+
+    def __init__(self, components: Iterable[IndexedComponent]):
+        self._by_id: Dict[UUID, IndexedComponent] = {}
+        self._by_category: Dict[str, List[IndexedComponent]] = defaultdict(list)
+        self._by_socket: Dict[Tuple[str, str], List[IndexedComponent]] = defaultdict(list)
+        self._by_memory_type: Dict[Tuple[str, str], List[IndexedComponent]] = defaultdict(list)
+        self._by_form_factor: Dict[Tuple[str, str], List[IndexedComponent]] = defaultdict(list)
+
+        for component in sorted(components, key=lambda c: c.price):
+            # Несколько записей о наличии дают повторы строк
+            if component.id in self._by_id:
+                continue
+            self._by_id[component.id] = component
+            self._by_category[component.category].append(component)
+            if component.socket:
+                self._by_socket[(component.category, component.socket)].append(component)
+            for memory_type in component.memory_types:
+                self._by_memory_type[(component.category, memory_type)].append(component)
+            # Корпуса индексируются по поддерживаемым платам, остальные - по своему форм-фактору
+            for form_factor in component.supported_form_factors or ([component.form_factor] if component.form_factor else []):
+                self._by_form_factor[(component.category, form_factor)].append(component)
+
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def load(cls, db: Session) -> "CatalogIndex":
+        """Загрузить активный каталог одним запросом"""
+        rows = db.query(
+            Component.id,
+            ComponentCategory.slug,
+            Component.name,
+            Component.brand,
+            Component.price,
+            Component.power_consumption,
+            Component.form_factor,
+            Component.specifications,
+            ComponentStock.status
+        ).join(ComponentCategory).outerjoin(ComponentStock).filter(
+            Component.is_active == True
+        ).all()
+
+        return cls(IndexedComponent.from_row(*row) for row in rows)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, component_id: UUID) -> Optional[IndexedComponent]:
+        return self._by_id.get(component_id)
+
+    def by_category(self, category: str) -> List[IndexedComponent]:
+        return self._by_category.get(category, [])
+
+    def by_socket(self, category: str, socket: str) -> List[IndexedComponent]:
+        return self._by_socket.get((category, socket), [])
+
+    def by_memory_type(self, category: str, memory_type: str) -> List[IndexedComponent]:
+        return self._by_memory_type.get((category, memory_type), [])
+
+    def by_form_factor(self, category: str, form_factor: str) -> List[IndexedComponent]:
+        return self._by_form_factor.get((category, form_factor), [])
+
+
+_index: Optional[CatalogIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_catalog_index(db: Session) -> CatalogIndex:
+    """Общий индекс каталога; перестраивается по истечении CATALOG_INDEX_TTL_SECONDS или после сброса"""
+    global _index
+    index = _index
+    if index is not None and time.monotonic() - index.loaded_at < settings.CATALOG_INDEX_TTL_SECONDS:
+        return index
+
+    with _index_lock:
+        if _index is None or time.monotonic() - _index.loaded_at >= settings.CATALOG_INDEX_TTL_SECONDS:
+            _index = CatalogIndex.load(db)
+        return _index
+
+
+def invalidate_catalog_index(*_args) -> None:
+    """Сбросить индекс (подходит как обработчик изменения наличия)"""
+    global _index
+    _index = None
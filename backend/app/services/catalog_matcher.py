@@ -0,0 +1,112 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import List, Dict, Iterable, Tuple, FrozenSet
+from uuid import UUID
+from sqlalchemy.orm import Session
+from ..models import Component, ComponentCategory
+
+
+def tokenize(value: str) -> FrozenSet[str]:
+    """Разбить строку на множество слов в нижнем регистре"""
+    return frozenset(value.lower().split())
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """Позиция каталога, подготовленная для сопоставления"""
+    id: UUID
+    category: str
+    name: str
+    brand: str
+    price: float
+    brand_lower: str
+    tokens: FrozenSet[str]
+
+
+@dataclass(frozen=True)
+class CatalogMatch:
+    """Кандидат из каталога с оценкой схожести"""
+    entry: CatalogEntry
+    score: float
+
+
+class CatalogMatcher:
+    """
+    Нечеткий поиск позиций каталога по бренду и названию.
+    Кандидаты для всех строк загружаются одним запросом, а поиск идет
+    по инвертированному индексу слов названия внутри каждой категории
+    """
+
+    def __init__(self, entries: Iterable[CatalogEntry]):
+        self._entries: Dict[str, List[CatalogEntry]] = defaultdict(list)
+        self._postings: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+
+        for entry in entries:
+            position = len(self._entries[entry.category])
+            self._entries[entry.category].append(entry)
+            for token in entry.tokens:
+                self._postings[entry.category][token].append(position)
+
+    @classmethod
+    def load(cls, db: Session, category_slugs: Iterable[str]) -> "CatalogMatcher":
+        """Загрузить активные компоненты нужных категорий одним запросом"""
+        slugs = set(category_slugs)
+        if not slugs:
+            return cls([])
+
+        rows = db.query(
+            Component.id,
+            Component.name,
+            Component.brand,
+            Component.price,
+            ComponentCategory.slug
+        ).join(ComponentCategory).filter(
+            ComponentCategory.slug.in_(slugs),
+            Component.is_active == True
+        ).all()
+
+        return cls(
+            CatalogEntry(
+                id=row.id,
+                category=row.slug,
+                name=row.name,
+                brand=row.brand,
+                price=float(row.price),
+                brand_lower=row.brand.lower(),
+                tokens=tokenize(row.name)
+            )
+            for row in rows
+        )
+
+    def match(self, category: str, brand: str, name: str, top_k: int = 3) -> List[CatalogMatch]:
+        """
+        Найти лучшие совпадения в категории.
+        Бренд каталога должен содержать искомый бренд (как ILIKE '%brand%'),
+        схожесть названий - коэффициент Жаккара по словам
+        """
+        entries = self._entries.get(category)
+        if not entries:
+            return []
+
+        query_tokens = tokenize(name)
+        if not query_tokens:
+            return []
+
+        # Кандидаты - только позиции, у которых есть хотя бы одно общее слово
+        postings = self._postings[category]
+        candidate_positions = set()
+        for token in query_tokens:
+            candidate_positions.update(postings.get(token, ()))
+
+        brand_lower = brand.lower()
+        scored: List[Tuple[float, CatalogEntry]] = []
+        for position in candidate_positions:
+            entry = entries[position]
+            if brand_lower not in entry.brand_lower:
+                continue
+            intersection = len(query_tokens & entry.tokens)
+            score = intersection / (len(query_tokens) + len(entry.tokens) - intersection)
+            scored.append((score, entry))
+
+        scored.sort(key=lambda pair: (-pair[0], pair[1].price))
+        return [CatalogMatch(entry=entry, score=score) for score, entry in scored[:top_k]]
@@ -0,0 +1,156 @@
+import time
+import logging
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from .bulk import copy_csv_chunks
+from .catalog_index import CatalogIndex, IndexedComponent
+from ..monitoring.metrics import timed_job
+
+logger = logging.getLogger(__name__)
+
+Extractor = Callable[[IndexedComponent], FrozenSet[str]]
+
+# Пары категорий и характеристики, которые должны пересекаться (правила ComponentService._check_basic_compatibility).
+# Если у одной из сторон характеристика не указана, пара считается совместимой
+MATRIX_RULES: Dict[Tuple[str, str], Tuple[Extractor, Extractor]] = {
+    ("cpu", "motherboard"): (
+        lambda c: frozenset([c.socket]) if c.socket else frozenset(),
+        lambda m: frozenset([m.socket]) if m.socket else frozenset(),
+    ),
+    ("ram", "motherboard"): (
+        lambda r: r.memory_types,
+        lambda m: m.memory_types,
+    ),
+    ("case", "motherboard"): (
+        lambda c: c.supported_form_factors,
+        lambda m: frozenset([m.form_factor]) if m.form_factor else frozenset(),
+    ),
+}
+
+COPY_COLUMNS = ("component1_id", "component2_id", "compatibility_type", "source")
+
+# Строк левой категории на один блок матрицы (ограничивает память)
+DEFAULT_CHUNK_SIZE = 2048
+
+
+def _membership_matrix(value_sets: Sequence[FrozenSet[str]], vocabulary: Dict[str, int]) -> np.ndarray:
+    """Матрица принадлежности: строка - компонент, столбец - значение характеристики"""
+    matrix = np.zeros((len(value_sets), max(len(vocabulary), 1)), dtype=np.float32)
+    for row, values in enumerate(value_sets):
+        for value in values:
+            matrix[row, vocabulary[value]] = 1.0
+    return matrix
+
+
+class CompatibilityMatrixService:
+    """
+    Пакетный расчет матриц совместимости пар категорий.
+    Характеристики кодируются матрицами принадлежности, совместимость блока
+    компонентов считается одним матричным умножением, совместимые пары
+    записываются в component_compatibility через COPY (source='computed')
+    """
+
+    def __init__(self, db: Session, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.db = db
+        self.chunk_size = chunk_size
+
+    def compatible_pairs(
+        self,
+        left: List[IndexedComponent],
+        right: List[IndexedComponent],
+        left_extractor: Extractor,
+        right_extractor: Extractor
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Индексы совместимых пар (позиции в left, позиции в right) по блокам левой категории"""
+        if not left or not right:
+            return
+
+        left_sets = [left_extractor(component) for component in left]
+        right_sets = [right_extractor(component) for component in right]
+        vocabulary: Dict[str, int] = {}
+        for values in left_sets + right_sets:
+            for value in values:
+                vocabulary.setdefault(value, len(vocabulary))
+
+        right_matrix = _membership_matrix(right_sets, vocabulary)
+        right_unknown = ~right_matrix.any(axis=1)
+
+        for start in range(0, len(left), self.chunk_size):
+            left_matrix = _membership_matrix(left_sets[start:start + self.chunk_size], vocabulary)
+            left_unknown = ~left_matrix.any(axis=1)
+
+            # Пересечение множеств характеристик; неизвестная характеристика совместима со всем
+            compatible = (left_matrix @ right_matrix.T) > 0
+            compatible |= left_unknown[:, None]
+            compatible |= right_unknown[None, :]
+
+            rows, columns = np.nonzero(compatible)
+            yield rows + start, columns
+
+    @timed_job("compatibility_matrix")
+    def rebuild(self, pairs: Optional[Sequence[Tuple[str, str]]] = None) -> Dict[str, object]:
+        """
+        Пересчитать матрицы для указанных пар категорий (по умолчанию - всех) и заменить
+        рассчитанные строки этих пар одной транзакцией. Ручные строки не затрагиваются
+        """
+        started = time.perf_counter()
+        pairs = list(pairs or MATRIX_RULES.keys())
+        unknown = [pair for pair in pairs if pair not in MATRIX_RULES]
+        if unknown:
+            raise ValueError(f"Нет правил для пар категорий: {unknown}")
+
+        index = CatalogIndex.load(self.db)
+        counts: Dict[str, int] = {}
+
+        for left_category, right_category in pairs:
+            self.db.execute(text("""
+                DELETE FROM component_compatibility cc
+                USING components c1, component_categories k1, components c2, component_categories k2
+                WHERE cc.source = 'computed'
+                  AND c1.id = cc.component1_id AND k1.id = c1.category_id AND k1.slug = :left
+                  AND c2.id = cc.component2_id AND k2.id = c2.category_id AND k2.slug = :right
+            """), {"left": left_category, "right": right_category})
+
+            counts[f"{left_category}:{right_category}"] = self._copy_pairs(
+                index.by_category(left_category),
+                index.by_category(right_category),
+                *MATRIX_RULES[(left_category, right_category)]
+            )
+
+        self.db.commit()
+        self.db.execute(text("ANALYZE component_compatibility"))
+        self.db.commit()
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Матрицы совместимости пересчитаны: {counts} за {elapsed:.1f}с")
+        return {
+            "pairs": counts,
+            "components": len(index),
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+    def _copy_pairs(
+        self,
+        left: List[IndexedComponent],
+        right: List[IndexedComponent],
+        left_extractor: Extractor,
+        right_extractor: Extractor
+    ) -> int:
+        """Записать совместимые пары через COPY; CSV собирается по блокам, без построчной сериализации"""
+        left_ids = np.array([str(component.id) for component in left], dtype=object)
+        right_ids = np.array([str(component.id) for component in right], dtype=object)
+        count = 0
+
+        def chunks() -> Iterator[str]:
+            nonlocal count
+            for rows, columns in self.compatible_pairs(left, right, left_extractor, right_extractor):
+                count += len(rows)
+                yield "".join(
+                    f"{left_id},{right_id},compatible,computed\n"
+                    for left_id, right_id in zip(left_ids[rows].tolist(), right_ids[columns].tolist())
+                )
+
+        copy_csv_chunks(self.db, "component_compatibility", COPY_COLUMNS, chunks())
+        return count
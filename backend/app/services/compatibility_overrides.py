@@ -0,0 +1,180 @@
+import time
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+from ..config import settings
+from ..models import ComponentCompatibility
+
+# Ключ в session.info, где копятся изменения ручных записей до коммита
+_PENDING_KEY = "compatibility_override_changes"
+
+PairKey = FrozenSet[UUID]
+
+
+@dataclass(frozen=True)
+class CompatibilityOverride:
+    """Ручной вердикт совместимости для пары компонентов"""
+    id: UUID
+    component_ids: PairKey
+    verdict: str  # "compatible", "incompatible", "warning"
+    notes: Optional[str]
+
+    @classmethod
+    def from_row(cls, row: ComponentCompatibility) -> "CompatibilityOverride":
+        return cls(
+            id=row.id,
+            component_ids=frozenset((row.component1_id, row.component2_id)),
+            verdict=row.compatibility_type,
+            notes=row.notes
+        )
+
+
+class CompatibilityOverrideIndex:
+    """
+    Ручные исключения из правил совместимости (source='manual') в памяти.
+    Поиск вердикта для пары - O(1) по frozenset из двух ID; для сборки
+    перебираются только исключения, в которых участвуют ее компоненты
+    """
+
+    def __init__(self, overrides: Iterable[CompatibilityOverride]):
+        self._by_pair: Dict[PairKey, CompatibilityOverride] = {}
+        self._by_component: Dict[UUID, FrozenSet[PairKey]] = {}
+        self._lock = threading.Lock()
+        for override in overrides:
+            self._put(override)
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def load(cls, db: Session) -> "CompatibilityOverrideIndex":
+        rows = db.query(ComponentCompatibility).filter(ComponentCompatibility.source == "manual").all()
+        return cls(CompatibilityOverride.from_row(row) for row in rows)
+
+    def __len__(self) -> int:
+        return len(self._by_pair)
+
+    def get(self, first_id: UUID, second_id: UUID) -> Optional[CompatibilityOverride]:
+        return self._by_pair.get(frozenset((first_id, second_id)))
+
+    def for_components(self, component_ids: Iterable[UUID]) -> List[CompatibilityOverride]:
+        """Исключения для всех пар внутри набора компонентов"""
+        ids = set(component_ids)
+        found: Dict[PairKey, CompatibilityOverride] = {}
+        for component_id in ids:
+            for pair in self._by_component.get(component_id, ()):
+                if pair not in found and pair <= ids:
+                    override = self._by_pair.get(pair)
+                    if override is not None:
+                        found[pair] = override
+        return list(found.values())
+
+    def conflicts(self, component_id: UUID, others: Iterable[UUID]) -> bool:
+        """Есть ли ручной вердикт «несовместимы» между компонентом и любым из остальных"""
+        for other_id in others:
+            override = self.get(component_id, other_id)
+            if override is not None and override.verdict == "incompatible":
+                return True
+        return False
+
+    def apply(self, changes: Iterable[Tuple[Optional[PairKey], Optional[CompatibilityOverride]]]) -> None:
+        """Применить закоммиченные изменения: (удаляемая пара, новое исключение)"""
+        with self._lock:
+            for removed, override in changes:
+                if removed is not None:
+                    self._remove(removed)
+                if override is not None:
+                    self._put(override)
+
+    # Множества пар заменяются целиком, чтобы читатели из других потоков не видели изменение на лету
+    def _put(self, override: CompatibilityOverride) -> None:
+        self._by_pair[override.component_ids] = override
+        for component_id in override.component_ids:
+            self._by_component[component_id] = self._by_component.get(component_id, frozenset()) | {override.component_ids}
+
+    def _remove(self, pair: PairKey) -> None:
+        if self._by_pair.pop(pair, None) is None:
+            return
+        for component_id in pair:
+            remaining = self._by_component.get(component_id, frozenset()) - {pair}
+            if remaining:
+                self._by_component[component_id] = remaining
+            else:
+                self._by_component.pop(component_id, None)
+
+
+_index: Optional[CompatibilityOverrideIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_override_index(db: Session) -> CompatibilityOverrideIndex:
+    """
+    Общий индекс исключений. Изменения через ORM применяются сразу после коммита;
+    полная перезагрузка раз в COMPATIBILITY_OVERRIDES_TTL_SECONDS подхватывает
+    правки из других процессов и прямые изменения в БД
+    """
+    global _index
+    index = _index
+    if index is not None and time.monotonic() - index.loaded_at < settings.COMPATIBILITY_OVERRIDES_TTL_SECONDS:
+        return index
+
+    with _index_lock:
+        if _index is None or time.monotonic() - _index.loaded_at >= settings.COMPATIBILITY_OVERRIDES_TTL_SECONDS:
+            _index = CompatibilityOverrideIndex.load(db)
+        return _index
+
+
+def invalidate_override_index() -> None:
+    global _index
+    _index = None
+
+
+def _pair_key(first_id: Optional[UUID], second_id: Optional[UUID]) -> Optional[PairKey]:
+    if first_id is None or second_id is None:
+        return None
+    return frozenset((first_id, second_id))
+
+
+def _record_change(target: ComponentCompatibility, removed: Optional[PairKey], deleted: bool = False) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    override = None
+    if not deleted and target.source == "manual":
+        override = CompatibilityOverride.from_row(target)
+    session.info.setdefault(_PENDING_KEY, []).append((removed, override))
+
+
+@event.listens_for(ComponentCompatibility, "after_insert")
+def _after_insert(mapper, connection, target):
+    _record_change(target, None)
+
+
+@event.listens_for(ComponentCompatibility, "after_update")
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    old_first = state.attrs.component1_id.history.deleted
+    old_second = state.attrs.component2_id.history.deleted
+    removed = _pair_key(
+        old_first[0] if old_first else target.component1_id,
+        old_second[0] if old_second else target.component2_id
+    )
+    _record_change(target, removed)
+
+
+@event.listens_for(ComponentCompatibility, "after_delete")
+def _after_delete(mapper, connection, target):
+    _record_change(target, _pair_key(target.component1_id, target.component2_id), deleted=True)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes and _index is not None:
+        _index.apply(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
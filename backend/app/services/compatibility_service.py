@@ -1,8 +1,11 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from ..models import Component
-from ..schemas.configuration import CompatibilityCheck, CompatibilityIssue, CompatibilityStatus
+from ..schemas.configuration import CompatibilityCheck, CompatibilityIssue, CompatibilityStatus, PowerBudgetSummary
+from .alternatives_service import AlternativesService
+from .compatibility_overrides import get_override_index
+from .power_model import PEAK_HEADROOM, PowerBudget, calculate_power_budget, psu_profile
 
 
 class CompatibilityService:
@@ -11,10 +14,30 @@ class CompatibilityService:
     def __init__(self, db: Session):
         self.db = db
     
-    def check_configuration_compatibility(self, component_ids: List[UUID]) -> CompatibilityCheck:
+    def check_configuration_compatibility(
+        self,
+        component_ids: List[UUID],
+        with_alternatives: bool = False,
+        quantities: Optional[Dict[UUID, int]] = None
+    ) -> CompatibilityCheck:
         """Проверка совместимости конфигурации"""
-        components = self.db.query(Component).filter(Component.id.in_(component_ids)).all()
+        components = self.db.query(Component).options(
+            joinedload(Component.category)
+        ).filter(Component.id.in_(component_ids)).all()
         
+        return self.check_components_compatibility(components, with_alternatives, quantities)
+    
+    def check_components_compatibility(
+        self,
+        components: List[Component],
+        with_alternatives: bool = False,
+        quantities: Optional[Dict[UUID, int]] = None
+    ) -> CompatibilityCheck:
+        """
+        Проверка совместимости уже загруженных компонентов (без обращения к БД).
+        with_alternatives - подобрать конкретные замены по индексу каталога,
+        quantities - количество по ID компонента (по умолчанию 1)
+        """
         if not components:
             return CompatibilityCheck(
                 is_compatible=False,
@@ -33,31 +56,34 @@ class CompatibilityService:
             components_by_category[category_slug].append(comp)
         
         issues = []
-        total_power = 0
         
         # Проверяем основные совместимости
         issues.extend(self._check_cpu_motherboard_compatibility(components_by_category))
         issues.extend(self._check_ram_motherboard_compatibility(components_by_category))
         issues.extend(self._check_case_motherboard_compatibility(components_by_category))
         
-        # Считаем энергопотребление
-        total_power = self._calculate_total_power_consumption(components)
-        power_issues = self._check_power_supply_compatibility(components_by_category, total_power)
+        # Считаем энергопотребление с учетом количества
+        power_budget = calculate_power_budget(components, quantities)
+        power_issues = self._check_power_supply_compatibility(components_by_category, power_budget)
         issues.extend(power_issues)
         
+        # Ручные исключения важнее правил по характеристикам
+        issues = self._apply_overrides(issues, components)
+        
+        if with_alternatives:
+            AlternativesService(self.db).attach_alternatives(issues, components)
+        
         # Определяем общий статус
         status = self._determine_compatibility_status(issues)
         is_compatible = status == CompatibilityStatus.COMPATIBLE
         
-        # Рекомендуемая мощность БП (с запасом 20%)
-        recommended_psu = int(total_power * 1.2) if total_power > 0 else None
-        
         return CompatibilityCheck(
             is_compatible=is_compatible,
             status=status,
             issues=issues,
-            total_power_consumption=total_power,
-            recommended_psu_wattage=recommended_psu
+            total_power_consumption=power_budget.peak,
+            recommended_psu_wattage=power_budget.recommended_psu_wattage,
+            power_budget=self._power_budget_summary(components_by_category, power_budget)
         )
     
     def _check_cpu_motherboard_compatibility(self, components_by_category: Dict[str, List[Component]]) -> List[CompatibilityIssue]:
@@ -164,28 +190,46 @@ class CompatibilityService:
         
         return issues
     
-    def _check_power_supply_compatibility(self, components_by_category: Dict[str, List[Component]], total_power: int) -> List[CompatibilityIssue]:
-        """Проверка совместимости блока питания"""
+    def _check_power_supply_compatibility(self, components_by_category: Dict[str, List[Component]], power_budget: PowerBudget) -> List[CompatibilityIssue]:
+        """Проверка блока питания: номинал, линия 12В, кратковременные пики и запас мощности"""
         issues = []
         
         psus = components_by_category.get('psu', [])
         
-        if len(psus) == 1 and total_power > 0:
+        if len(psus) == 1 and power_budget.peak > 0:
             psu = psus[0]
-            psu_wattage = psu.specifications.get('wattage', 0)
+            profile = psu_profile(psu)
+            total_power = power_budget.peak
+            recommended_wattage = power_budget.recommended_psu_wattage
             
-            # Рекомендуем запас в 20%
-            recommended_wattage = int(total_power * 1.2)
-            
-            if psu_wattage < total_power:
+            if profile.wattage < total_power:
                 issues.append(CompatibilityIssue(
                     type="power_insufficient",
                     severity="error",
-                    message=f"Мощность БП ({psu_wattage}Вт) недостаточна для системы ({total_power}Вт)",
+                    message=f"Мощность БП ({profile.wattage}Вт) недостаточна для системы ({total_power}Вт)",
                     component_ids=[psu.id],
                     suggestions=[f"Выберите БП мощностью от {recommended_wattage}Вт"]
                 ))
-            elif psu_wattage < recommended_wattage:
+            elif profile.rail_12v < power_budget.rail_12v:
+                issues.append(CompatibilityIssue(
+                    type="power_12v_insufficient",
+                    severity="error",
+                    message=f"Линия 12В БП ({profile.rail_12v}Вт) не обеспечивает нагрузку на эту линию ({power_budget.rail_12v}Вт)",
+                    component_ids=[psu.id],
+                    suggestions=[f"Выберите БП с линией 12В от {power_budget.rail_12v}Вт"]
+                ))
+            elif profile.wattage * profile.transient_tolerance < power_budget.transient:
+                issues.append(CompatibilityIssue(
+                    type="power_transient",
+                    severity="warning",
+                    message=f"Кратковременные пики нагрузки (до {power_budget.transient}Вт) могут вызвать срабатывание защиты БП",
+                    component_ids=[psu.id],
+                    suggestions=[
+                        f"Выберите БП стандарта ATX 3.0 мощностью от {recommended_wattage}Вт",
+                        f"Или БП мощностью от {power_budget.psu_wattage_for(profile.transient_tolerance)}Вт"
+                    ]
+                ))
+            elif profile.wattage < total_power * PEAK_HEADROOM:
                 issues.append(CompatibilityIssue(
                     type="power_warning",
                     severity="warning",
@@ -196,15 +240,65 @@ class CompatibilityService:
         
         return issues
     
-    def _calculate_total_power_consumption(self, components: List[Component]) -> int:
-        """Расчет общего энергопотребления"""
-        total_power = 0
+    def _power_budget_summary(self, components_by_category: Dict[str, List[Component]], power_budget: PowerBudget) -> PowerBudgetSummary:
+        """Детали бюджета мощности; нагрузка и КПД - для единственного БП сборки"""
+        summary = PowerBudgetSummary(
+            peak_power=power_budget.peak,
+            typical_power=power_budget.typical,
+            transient_power=power_budget.transient,
+            rail_12v_load=power_budget.rail_12v
+        )
+        
+        psus = components_by_category.get('psu', [])
+        if len(psus) == 1:
+            profile = psu_profile(psus[0])
+            if profile.wattage > 0:
+                summary.psu_load_percent = round(power_budget.typical / profile.wattage * 100, 1)
+                summary.psu_efficiency = round(profile.efficiency_at(power_budget.typical), 3)
+                summary.estimated_wall_draw = profile.wall_draw(power_budget.typical)
         
-        for component in components:
-            if component.power_consumption:
-                total_power += component.power_consumption
+        return summary
+    
+    def _apply_overrides(self, issues: List[CompatibilityIssue], components: List[Component]) -> List[CompatibilityIssue]:
+        """
+        Учет ручных исключений для пар компонентов сборки: «совместимы» снимает проблемы
+        этой пары, найденные по характеристикам; «несовместимы» и «предупреждение» сообщают
+        о проблеме, которую правила не видят (обновление BIOS, габариты кулера и т.п.)
+        """
+        overrides = get_override_index(self.db).for_components(comp.id for comp in components)
+        if not overrides:
+            return issues
+        
+        names = {comp.id: comp.name for comp in components}
+        for override in overrides:
+            pair_issues = [issue for issue in issues if frozenset(issue.component_ids) == override.component_ids]
+            component_ids = sorted(override.component_ids, key=lambda component_id: names[component_id])
+            pair_names = " и ".join(names[component_id] for component_id in component_ids)
+            
+            if override.verdict == "incompatible":
+                # Ошибка по характеристикам точнее описывает причину, дублировать ее не нужно
+                if not any(issue.severity == "error" for issue in pair_issues):
+                    issues.append(CompatibilityIssue(
+                        type="known_incompatibility",
+                        severity="error",
+                        message=f"Известная несовместимость: {pair_names}",
+                        component_ids=component_ids,
+                        suggestions=[override.notes] if override.notes else []
+                    ))
+                continue
+            
+            # «Совместимы» и «предупреждение» заменяют вердикт правил для этой пары
+            issues = [issue for issue in issues if not any(issue is pair_issue for pair_issue in pair_issues)]
+            if override.verdict == "warning":
+                issues.append(CompatibilityIssue(
+                    type="known_issue",
+                    severity="warning",
+                    message=f"Известная особенность совместимости: {pair_names}",
+                    component_ids=component_ids,
+                    suggestions=[override.notes] if override.notes else []
+                ))
         
-        return total_power
+        return issues
     
     def _determine_compatibility_status(self, issues: List[CompatibilityIssue]) -> CompatibilityStatus:
         """Определение общего статуса совместимости"""
@@ -0,0 +1,160 @@
+"""
+Проекция компонентов для списков.
+
+Списки каталога выбираются одним SELECT нужных колонок (компонент, категория,
+наличие) и превращаются в словари той же формы, что ComponentResponse, без
+создания ORM объектов и валидации pydantic на каждую строку. Словари отдаются
+через ComponentListResponse (orjson).
+
+Параметр fields списков (sparse fieldsets) сужает и SELECT, и ответ: перечень
+полей ComponentResponse через запятую или имя набора (card - карточка каталога).
+Поле id выбирается всегда
+"""
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import orjson
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Query, Session
+from ..models import Component, ComponentCategory, ComponentStock
+
+
+class ComponentListResponse(ORJSONResponse):
+    """ORJSONResponse с датами UTC в виде «...Z», как при сериализации pydantic"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+def _price(values: Tuple[Any, ...]) -> float:
+    return float(values[0])
+
+
+def _specifications(values: Tuple[Any, ...]) -> Dict[str, Any]:
+    return values[0] or {}
+
+
+def _category(values: Tuple[Any, ...]) -> Dict[str, Any]:
+    category_id, name, slug, description, order_priority, icon, created_at, updated_at = values
+    return {
+        "id": category_id,
+        "name": name,
+        "slug": slug,
+        "description": description,
+        "order_priority": order_priority,
+        "icon": icon,
+        "created_at": created_at,
+        "updated_at": updated_at,
+    }
+
+
+def _stock(values: Tuple[Any, ...]) -> Optional[Dict[str, Any]]:
+    status, quantity, expected_date, updated_at = values
+    if status is None:
+        return None
+    return {"status": status, "quantity": quantity, "expected_date": expected_date, "updated_at": updated_at}
+
+
+# Поля ответа в порядке ComponentResponse: колонки и преобразование их значений
+# (None - значение единственной колонки как есть)
+_FIELDS: Dict[str, Tuple[tuple, Optional[Callable[[Tuple[Any, ...]], Any]]]] = {
+    "id": ((Component.id,), None),
+    "name": ((Component.name,), None),
+    "brand": ((Component.brand,), None),
+    "model": ((Component.model,), None),
+    "description": ((Component.description,), None),
+    "price": ((Component.price,), _price),
+    "category": ((
+        ComponentCategory.id, ComponentCategory.name, ComponentCategory.slug, ComponentCategory.description,
+        ComponentCategory.order_priority, ComponentCategory.icon, ComponentCategory.created_at,
+        ComponentCategory.updated_at,
+    ), _category),
+    "specifications": ((Component.specifications,), _specifications),
+    "form_factor": ((Component.form_factor,), None),
+    "power_consumption": ((Component.power_consumption,), None),
+    "created_at": ((Component.created_at,), None),
+    "updated_at": ((Component.updated_at,), None),
+    "is_active": ((Component.is_active,), None),
+    "stock": ((
+        ComponentStock.status, ComponentStock.quantity, ComponentStock.expected_date, ComponentStock.updated_at,
+    ), _stock),
+}
+
+# Наборы полей, доступные по имени в параметре fields
+FIELD_SETS: Dict[str, Tuple[str, ...]] = {
+    "full": tuple(_FIELDS),
+    "card": ("id", "name", "brand", "model", "price", "category", "stock"),
+}
+
+
+class ComponentProjection:
+    """Набор полей списка: колонки для SELECT и сборка словарей из строк"""
+
+    def __init__(self, fields: Sequence[str]):
+        requested = set(fields) | {"id"}
+        self.fields = tuple(name for name in _FIELDS if name in requested)
+
+        self._columns: List[Any] = []
+        self._getters: List[Tuple[str, Callable[[Tuple[Any, ...]], Any]]] = []
+        for name in self.fields:
+            columns, convert = _FIELDS[name]
+            start = len(self._columns)
+            self._columns.extend(columns)
+            if convert is None:
+                self._getters.append((name, itemgetter(start)))
+            else:
+                self._getters.append((name, self._converter(convert, slice(start, start + len(columns)))))
+
+    @staticmethod
+    def _converter(convert: Callable[[Tuple[Any, ...]], Any], columns: slice) -> Callable[[Tuple[Any, ...]], Any]:
+        return lambda row: convert(row[columns])
+
+    def query(self, db: Session) -> Query:
+        """
+        Запрос выбранных колонок. Категория присоединена (JOIN), наличие - LEFT JOIN
+        независимо от набора полей: фильтры по ComponentCategory и ComponentStock
+        накладываются без дополнительных join
+        """
+        return (
+            db.query(*self._columns)
+            .select_from(Component)
+            .join(ComponentCategory, Component.category_id == ComponentCategory.id)
+            .outerjoin(ComponentStock, ComponentStock.component_id == Component.id)
+        )
+
+    def to_dicts(self, rows: Sequence[Tuple[Any, ...]]) -> List[Dict[str, Any]]:
+        """Строки query() в словари с выбранными полями (порядок полей как в ComponentResponse)"""
+        getters = self._getters
+        return [{name: get(row) for name, get in getters} for row in rows]
+
+
+FULL_PROJECTION = ComponentProjection(FIELD_SETS["full"])
+CARD_PROJECTION = ComponentProjection(FIELD_SETS["card"])
+
+
+def parse_fields(fields: Optional[str]) -> ComponentProjection:
+    """
+    Проекция по значению параметра fields: пусто - все поля, иначе поля и имена
+    наборов (full, card) через запятую, например card,description. Неизвестное поле - ValueError
+    """
+    if not fields or not fields.strip():
+        return FULL_PROJECTION
+
+    names: List[str] = []
+    unknown: List[str] = []
+    for name in (part.strip() for part in fields.split(",")):
+        if name in FIELD_SETS:
+            names.extend(FIELD_SETS[name])
+        elif name in _FIELDS:
+            names.append(name)
+        elif name:
+            unknown.append(name)
+    if unknown:
+        raise ValueError(
+            f"Неизвестные поля: {', '.join(unknown)}. Доступные поля: {', '.join(_FIELDS)}; "
+            f"наборы: {', '.join(FIELD_SETS)}"
+        )
+
+    for projection in (CARD_PROJECTION, FULL_PROJECTION):
+        if set(names) | {"id"} == set(projection.fields):
+            return projection
+    return ComponentProjection(names)
@@ -2,8 +2,8 @@ from typing import List, Optional
 from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
 import uuid
-from ..models import Configuration, ConfigurationItem, Component, ComponentStock
-from ..schemas.configuration import ConfigurationCreate, AvailabilityStatus
+from ..models import Configuration, ConfigurationItem, Component, ComponentCategory, ComponentStock
+from ..schemas.configuration import ConfigurationCreate, AvailabilityStatus, ESSENTIAL_CATEGORIES
 from .compatibility_service import CompatibilityService
 
 
@@ -122,7 +122,10 @@ class ConfigurationService:
         
         # Проверяем совместимость
         component_ids = [item.component_id for item in items]
-        compatibility_result = self.compatibility_service.check_configuration_compatibility(component_ids)
+        quantities = {item.component_id: item.quantity for item in items}
+        compatibility_result = self.compatibility_service.check_configuration_compatibility(
+            component_ids, quantities=quantities
+        )
         
         # Обновляем конфигурацию
         config.compatibility_status = compatibility_result.status.value
@@ -144,7 +147,6 @@ class ConfigurationService:
         
         # Группируем компоненты по категориям
         components_by_category = {}
-        total_power = 0
         total_price = 0
         
         for item in config.items:
@@ -158,22 +160,20 @@ class ConfigurationService:
                 "price": item.price_snapshot or item.component.price
             })
             
-            # Считаем общее энергопотребление
-            if item.component.power_consumption:
-                total_power += item.component.power_consumption * item.quantity
-            
             # Считаем общую стоимость
             price = item.price_snapshot or item.component.price
             total_price += price * item.quantity
         
-        # Проверяем совместимость
-        component_ids = [item.component_id for item in config.items]
-        compatibility = self.compatibility_service.check_configuration_compatibility(component_ids)
+        # Проверяем совместимость; энергопотребление считается той же моделью, что и в проверке
+        compatibility = self.compatibility_service.check_components_compatibility(
+            [item.component for item in config.items],
+            quantities={item.component_id: item.quantity for item in config.items}
+        )
         
         return {
             "configuration": config,
             "components_by_category": components_by_category,
-            "total_power_consumption": total_power,
+            "total_power_consumption": compatibility.total_power_consumption,
             "total_price": total_price,
             "compatibility": compatibility,
             "missing_categories": self._get_missing_categories(config.items)
@@ -193,6 +193,7 @@ class ConfigurationService:
         
         if not items:
             config.total_price = 0.0
+            config.current_total_price = 0.0
             config.availability_status = AvailabilityStatus.UNKNOWN.value
             config.expected_delivery_date = None
             self.db.commit()
@@ -200,9 +201,12 @@ class ConfigurationService:
         
         # Считаем общую стоимость
         total_price = 0.0
+        current_total_price = 0.0
         for item in items:
             price = item.price_snapshot or item.component.price
             total_price += price * item.quantity
+            # Стоимость по текущим ценам каталога (как в задаче переоценки)
+            current_total_price += item.component.price * item.quantity
         
         # Определяем статус наличия
         availability_status = self._calculate_availability_status(items)
@@ -212,6 +216,7 @@ class ConfigurationService:
         
         # Обновляем конфигурацию
         config.total_price = total_price
+        config.current_total_price = current_total_price
         config.availability_status = availability_status.value
         config.expected_delivery_date = expected_date
         config.updated_at = datetime.now()
@@ -257,26 +262,20 @@ class ConfigurationService:
     def _get_missing_categories(self, items: List[ConfigurationItem]) -> List[str]:
         """Получить список отсутствующих категорий"""
         
-        # Основные категории для полной сборки ПК
-        essential_categories = [
-            "cpu", "motherboard", "ram", "storage", 
-            "gpu", "psu", "case"
-        ]
-        
         # Получаем категории, которые уже есть в конфигурации
         existing_categories = set()
         for item in items:
             existing_categories.add(item.component.category.slug)
         
         # Находим недостающие
-        missing = []
-        for category in essential_categories:
-            if category not in existing_categories:
-                # Получаем человекочитаемое название категории
-                cat_obj = self.db.query(ComponentCategory).filter(
-                    ComponentCategory.slug == category
-                ).first()
-                if cat_obj:
-                    missing.append(cat_obj.name)
-        
-        return missing 
\ No newline at end of file
+        missing_slugs = [category for category in ESSENTIAL_CATEGORIES if category not in existing_categories]
+        if not missing_slugs:
+            return []
+
+        # Человекочитаемые названия одним запросом, в порядке ESSENTIAL_CATEGORIES
+        names = dict(
+            self.db.query(ComponentCategory.slug, ComponentCategory.name)
+            .filter(ComponentCategory.slug.in_(missing_slugs))
+            .all()
+        )
+        return [names[slug] for slug in missing_slugs if slug in names] 
\ No newline at end of file
@@ -0,0 +1,372 @@
+"""
+Генератор синтетических данных для бенчмарков и нагрузочных тестов.
+
+Каталог генерируется детерминированно (seed) с управляемым распределением сокетов,
+типов памяти, форм-факторов, статусов наличия и цен; конфигурации собираются из
+совместимых между собой компонентов. Все строки загружаются через COPY.
+Сгенерированные компоненты помечены префиксом модели, конфигурации - префиксом
+названия, поэтому их можно удалить, не трогая настоящий каталог (purge).
+"""
+import math
+import random
+import time
+import uuid
+import logging
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ..models import Component, ComponentCategory
+from .bulk import copy_rows
+from .catalog_index import invalidate_catalog_index
+from .response_cache import invalidate_catalog_responses
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFIX = "GEN-"
+
+# Тип памяти, который поддерживают платы под сокет
+SOCKET_MEMORY = {"AM4": "DDR4", "AM5": "DDR5", "LGA1700": "DDR5", "LGA1200": "DDR4"}
+
+BRANDS = {
+    "cpu": ["Intel", "AMD"],
+    "motherboard": ["ASUS", "MSI", "GIGABYTE", "ASRock"],
+    "ram": ["Kingston", "Corsair", "G.Skill", "Crucial"],
+    "gpu": ["ASUS", "MSI", "GIGABYTE", "Palit", "Sapphire"],
+    "storage": ["Samsung", "WD", "Seagate", "Kingston", "Crucial"],
+    "psu": ["Corsair", "be quiet!", "Seasonic", "Cooler Master"],
+    "case": ["NZXT", "Fractal Design", "Lian Li", "Corsair"],
+    "cooler": ["Noctua", "DeepCool", "Arctic", "be quiet!"],
+    "accessories": ["Logitech", "Razer", "HyperX", "LG"],
+}
+
+# Пиковое энергопотребление по категориям, Вт
+_POWER_RANGES = {
+    "cpu": (35, 253), "motherboard": (20, 60), "ram": (5, 15), "gpu": (75, 450),
+    "storage": (3, 10), "cooler": (3, 15), "case": (0, 10),
+}
+
+_COMPONENT_COLUMNS = (
+    "id", "name", "brand", "model", "description", "price", "category_id",
+    "specifications", "form_factor", "power_consumption", "is_active"
+)
+_STOCK_COLUMNS = ("id", "component_id", "status", "quantity", "expected_date")
+_CONFIGURATION_COLUMNS = (
+    "id", "name", "description", "public_uuid", "total_price", "current_total_price",
+    "total_power_consumption", "compatibility_status", "availability_status", "status", "is_public"
+)
+_ITEM_COLUMNS = ("id", "configuration_id", "component_id", "quantity", "price_snapshot")
+
+_RAM_POSITION = 2
+
+
+@dataclass
+class GeneratorProfile:
+    """Распределения генерируемого каталога (веса нормировать не нужно)"""
+    category_weights: Dict[str, float] = field(default_factory=lambda: {
+        "cpu": 12, "motherboard": 14, "ram": 14, "gpu": 14, "storage": 14,
+        "psu": 10, "case": 10, "cooler": 6, "accessories": 6,
+    })
+    socket_weights: Dict[str, float] = field(default_factory=lambda: {
+        "AM5": 30, "LGA1700": 35, "AM4": 20, "LGA1200": 15,
+    })
+    form_factor_weights: Dict[str, float] = field(default_factory=lambda: {
+        "ATX": 50, "mATX": 35, "Mini-ITX": 15,
+    })
+    stock_status_weights: Dict[str, float] = field(default_factory=lambda: {
+        "in_stock": 70, "expected": 15, "out_of_stock": 15,
+    })
+    # Диапазоны цен, ₽; внутри диапазона цены распределены логарифмически равномерно
+    price_ranges: Dict[str, Tuple[int, int]] = field(default_factory=lambda: {
+        "cpu": (6000, 70000), "motherboard": (6000, 60000), "ram": (2000, 30000),
+        "gpu": (15000, 250000), "storage": (3000, 40000), "psu": (4000, 35000),
+        "case": (3000, 25000), "cooler": (1000, 20000), "accessories": (800, 80000),
+    })
+    inactive_share: float = 0.02  # Доля снятых с продажи компонентов
+
+
+@dataclass(frozen=True)
+class _PoolItem:
+    """Сгенерированный компонент, из которых собираются конфигурации"""
+    id: UUID
+    price: Decimal
+    power: int
+    specs: dict
+    form_factor: Optional[str]
+
+
+class DataGenerator:
+    """
+    Массовая генерация каталога и сохраненных конфигураций.
+    Одна транзакция на вызов generate_*; индекс каталога в памяти сбрасывается после загрузки
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        seed: int = 42,
+        profile: Optional[GeneratorProfile] = None,
+        prefix: str = DEFAULT_PREFIX
+    ):
+        self.db = db
+        self.rng = random.Random(seed)
+        self.profile = profile or GeneratorProfile()
+        self.prefix = prefix
+        self._pool: Optional[Dict[str, List[_PoolItem]]] = None
+
+    def _choice(self, weights: Dict[str, float]) -> str:
+        return self.rng.choices(list(weights), list(weights.values()))[0]
+
+    def _price(self, category: str) -> Decimal:
+        low, high = self.profile.price_ranges[category]
+        value = math.exp(self.rng.uniform(math.log(low), math.log(high)))
+        # Магазинные цены: 24 990, 7 490
+        return Decimal(max(int(round(value, -1)) - 10, 10))
+
+    def _specs(self, category: str) -> Tuple[dict, Optional[str]]:
+        """Характеристики в том же виде, что и в init.sql, и форм-фактор"""
+        rng = self.rng
+        socket = self._choice(self.profile.socket_weights)
+        if category == "cpu":
+            cores = rng.choice([4, 6, 8, 12, 16, 24])
+            return {"socket": socket, "cores": cores, "threads": cores * 2,
+                    "base_freq": round(rng.uniform(2.5, 4.7), 1), "boost_freq": round(rng.uniform(4.4, 5.8), 1)}, None
+        if category == "motherboard":
+            return {"socket": socket, "memory_type": [SOCKET_MEMORY[socket]], "memory_slots": rng.choice([2, 4]),
+                    "max_memory_gb": rng.choice([64, 128, 192])}, self._choice(self.profile.form_factor_weights)
+        if category == "ram":
+            modules = rng.choice([1, 2])
+            memory_type = SOCKET_MEMORY[socket]
+            frequency = rng.choice([3200, 3600] if memory_type == "DDR4" else [5600, 6000, 6400])
+            return {"memory_type": memory_type, "capacity_gb": modules * rng.choice([8, 16, 32]),
+                    "frequency": frequency, "modules": modules}, None
+        if category == "gpu":
+            return {"memory_gb": rng.choice([8, 12, 16, 24]), "memory_type": "GDDR6", "interface": "PCIe 4.0",
+                    "length_mm": rng.randint(200, 340)}, None
+        if category == "storage":
+            return {"capacity_gb": rng.choice([500, 1000, 2000, 4000]),
+                    "interface": rng.choice(["NVMe PCIe 4.0", "NVMe PCIe 3.0", "SATA III"])}, None
+        if category == "psu":
+            return {"wattage": rng.choice([450, 550, 650, 750, 850, 1000, 1200]),
+                    "efficiency_rating": rng.choice(["80+ Bronze", "80+ Gold", "80+ Platinum"]),
+                    "atx_version": rng.choice([2.4, 3.0])}, None
+        if category == "case":
+            form_factors = list(self.profile.form_factor_weights)
+            supported = form_factors[form_factors.index(self._choice(self.profile.form_factor_weights)):]
+            return {"supported_form_factors": supported, "max_gpu_length": rng.choice([320, 360, 400])}, supported[0]
+        if category == "cooler":
+            return {"type": rng.choice(["air", "aio"]), "socket_support": list(SOCKET_MEMORY)}, None
+        return {"type": rng.choice(["mouse", "keyboard", "monitor", "headset"]),
+                "connection": rng.choice(["wired", "wireless"])}, None
+
+    def generate_catalog(self, count: int) -> Dict[str, float]:
+        """Сгенерировать count компонентов с записями о наличии"""
+        started = time.perf_counter()
+        categories = {slug: category_id for category_id, slug in self.db.query(ComponentCategory.id, ComponentCategory.slug)}
+        weights = {slug: weight for slug, weight in self.profile.category_weights.items() if slug in categories}
+        if not weights:
+            raise ValueError("В БД нет категорий каталога, сначала загрузите init.sql")
+
+        pool = self._pool if self._pool is not None else {}
+        components = []
+        stock = []
+        today = date.today()
+        offset = self.db.query(Component).filter(Component.model.like(f"{self.prefix}%")).count()
+
+        for index in range(offset, offset + count):
+            category = self._choice(weights)
+            brand = self.rng.choice(BRANDS.get(category, ["Generic"]))
+            specs, form_factor = self._specs(category)
+            power_range = _POWER_RANGES.get(category)
+            power = self.rng.randint(*power_range) if power_range else None
+            price = self._price(category)
+            component_id = uuid.uuid4()
+            active = self.rng.random() >= self.profile.inactive_share
+
+            components.append((
+                component_id, f"{brand} {category.upper()} {index}", brand, f"{self.prefix}{category}-{index}",
+                None, price, categories[category], specs, form_factor, power, active
+            ))
+
+            status = self._choice(self.profile.stock_status_weights)
+            quantity = self.rng.randint(1, 50) if status == "in_stock" else 0
+            expected = today + timedelta(days=self.rng.randint(3, 30)) if status == "expected" else None
+            stock.append((uuid.uuid4(), component_id, status, quantity, expected))
+
+            if active:
+                pool.setdefault(category, []).append(
+                    _PoolItem(component_id, price, power or 0, specs, form_factor)
+                )
+
+        copy_rows(self.db, "components", _COMPONENT_COLUMNS, components)
+        copy_rows(self.db, "component_stock", _STOCK_COLUMNS, stock)
+        self.db.commit()
+        self._analyze("components", "component_stock")
+        invalidate_catalog_index()
+        invalidate_catalog_responses()
+        self._pool = pool
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"Сгенерировано компонентов: {count} за {elapsed:.1f} с")
+        return {"components": count, "elapsed_seconds": round(elapsed, 3)}
+
+    def _load_pool(self) -> Dict[str, List[_PoolItem]]:
+        """Компоненты, сгенерированные ранее (другим запуском), для сборки конфигураций"""
+        rows = (
+            self.db.query(
+                Component.id, Component.price, Component.power_consumption,
+                Component.specifications, Component.form_factor, ComponentCategory.slug
+            )
+            .join(ComponentCategory)
+            .filter(Component.model.like(f"{self.prefix}%"), Component.is_active == True)
+            .all()
+        )
+        pool: Dict[str, List[_PoolItem]] = {}
+        for component_id, price, power, specs, form_factor, slug in rows:
+            pool.setdefault(slug, []).append(_PoolItem(component_id, price, power or 0, specs or {}, form_factor))
+        return pool
+
+    def _pick_build(self, by_socket, by_memory, by_form_factor, pool) -> List[_PoolItem]:
+        """Совместимый набор: сокет, тип памяти, форм-фактор и запас мощности согласованы"""
+        rng = self.rng
+        for _ in range(20):
+            socket = self._choice(self.profile.socket_weights)
+            cpus = by_socket["cpu"].get(socket)
+            boards = by_socket["motherboard"].get(socket)
+            memory = by_memory.get(SOCKET_MEMORY[socket])
+            if cpus and boards and memory:
+                break
+        else:
+            return []
+
+        board = rng.choice(boards)
+        build = [rng.choice(cpus), board, rng.choice(memory)]  # Память - на позиции _RAM_POSITION
+        cases = by_form_factor.get(board.form_factor)
+        if cases:
+            build.append(rng.choice(cases))
+        if pool.get("gpu") and rng.random() < 0.85:
+            build.append(rng.choice(pool["gpu"]))
+        if pool.get("storage"):
+            build.extend(rng.sample(pool["storage"], min(len(pool["storage"]), rng.choice([1, 1, 2]))))
+        if pool.get("cooler") and rng.random() < 0.5:
+            build.append(rng.choice(pool["cooler"]))
+        if pool.get("psu"):
+            load = sum(item.power for item in build)
+            psus = [item for item in pool["psu"] if item.specs.get("wattage", 0) >= load * 1.2] or pool["psu"]
+            build.append(rng.choice(psus))
+        return build
+
+    def generate_configurations(
+        self,
+        count: int,
+        accessories_range: Tuple[int, int] = (0, 3),
+        name_prefix: Optional[str] = None
+    ) -> List[UUID]:
+        """Сгенерировать count сохраненных конфигураций; возвращает их ID"""
+        started = time.perf_counter()
+        pool = self._pool if self._pool is not None else self._load_pool()
+        self._pool = pool
+        if not pool.get("cpu") or not pool.get("motherboard"):
+            raise ValueError("Нет сгенерированного каталога: сначала выполните generate_catalog")
+
+        by_socket = {
+            category: _group(pool.get(category, []), lambda item: item.specs.get("socket"))
+            for category in ("cpu", "motherboard")
+        }
+        by_memory = _group(pool.get("ram", []), lambda item: item.specs.get("memory_type"))
+        by_form_factor: Dict[str, List[_PoolItem]] = {}
+        for case in pool.get("case", []):
+            for form_factor in case.specs.get("supported_form_factors", []):
+                by_form_factor.setdefault(form_factor, []).append(case)
+        accessories = pool.get("accessories", [])
+
+        name_prefix = name_prefix or self.prefix
+        configurations = []
+        items = []
+        accessory_rows = []
+        ids: List[UUID] = []
+
+        for index in range(count):
+            build = self._pick_build(by_socket, by_memory, by_form_factor, pool)
+            if not build:
+                continue
+            configuration_id = uuid.uuid4()
+            ids.append(configuration_id)
+            total = Decimal(0)
+            # Память иногда берется двумя комплектами
+            ram_quantity = 2 if self.rng.random() < 0.3 else 1
+            for position, item in enumerate(build):
+                quantity = ram_quantity if position == _RAM_POSITION else 1
+                items.append((uuid.uuid4(), configuration_id, item.id, quantity, item.price))
+                total += item.price * quantity
+
+            if accessories:
+                chosen = self.rng.sample(accessories, min(len(accessories), self.rng.randint(*accessories_range)))
+                for item in chosen:
+                    accessory_rows.append((uuid.uuid4(), configuration_id, item.id, 1, item.price))
+                    total += item.price
+
+            configurations.append((
+                configuration_id, f"{name_prefix}Сборка {index + 1}", None, str(uuid.uuid4()), total, total,
+                sum(item.power for item in build), "compatible", "unknown",
+                self.rng.choice(["draft", "draft", "completed", "exported"]), self.rng.random() < 0.2
+            ))
+
+        copy_rows(self.db, "configurations", _CONFIGURATION_COLUMNS, configurations)
+        copy_rows(self.db, "configuration_items", _ITEM_COLUMNS, items)
+        copy_rows(self.db, "configuration_accessories", _ITEM_COLUMNS, accessory_rows)
+        self.db.commit()
+        self._analyze("configurations", "configuration_items", "configuration_accessories")
+
+        logger.info(
+            f"Сгенерировано конфигураций: {len(ids)} ({len(items)} позиций, {len(accessory_rows)} аксессуаров) "
+            f"за {time.perf_counter() - started:.1f} с"
+        )
+        return ids
+
+    def purge(self, name_prefix: Optional[str] = None) -> Dict[str, int]:
+        """Удалить сгенерированные конфигурации и компоненты (по префиксам)"""
+        name_prefix = name_prefix or self.prefix
+        params = {"model": f"{self.prefix}%", "name": f"{name_prefix}%"}
+        generated = "SELECT id FROM components WHERE model LIKE :model"
+        configurations = f"""
+            SELECT id FROM configurations WHERE name LIKE :name
+            UNION
+            SELECT configuration_id FROM configuration_items WHERE component_id IN ({generated})
+            UNION
+            SELECT configuration_id FROM configuration_accessories WHERE component_id IN ({generated})
+        """
+        execute = self.db.execute
+        # Временная таблица, чтобы не пересчитывать список конфигураций для каждого DELETE
+        execute(text(f"CREATE TEMP TABLE generated_configurations ON COMMIT DROP AS {configurations}"), params)
+        for table in ("configuration_items", "configuration_accessories"):
+            execute(text(f"DELETE FROM {table} WHERE configuration_id IN (SELECT id FROM generated_configurations)"))
+        removed_configurations = execute(text(
+            "DELETE FROM configurations WHERE id IN (SELECT id FROM generated_configurations)"
+        )).rowcount
+        execute(text(
+            f"DELETE FROM component_compatibility WHERE component1_id IN ({generated}) OR component2_id IN ({generated})"
+        ), params)
+        execute(text(f"DELETE FROM component_stock WHERE component_id IN ({generated})"), params)
+        removed_components = execute(text("DELETE FROM components WHERE model LIKE :model"), params).rowcount
+        self.db.commit()
+        invalidate_catalog_index()
+        invalidate_catalog_responses()
+        self._pool = None
+        return {"components": removed_components, "configurations": removed_configurations}
+
+    def _analyze(self, *tables: str) -> None:
+        # Статистика планировщика после массовой загрузки, иначе первые запросы строятся по пустым таблицам
+        for table in tables:
+            self.db.execute(text(f"ANALYZE {table}"))
+        self.db.commit()
+
+
+def _group(items: Sequence[_PoolItem], key) -> Dict[str, List[_PoolItem]]:
+    groups: Dict[str, List[_PoolItem]] = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return groups
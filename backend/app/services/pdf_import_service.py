@@ -1,33 +1,133 @@
 import re
+import time
+import asyncio
 import pdfplumber
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from sqlalchemy.orm import Session
-from ..models import Component, ComponentCategory
+from ..config import settings
+from .process_pool import get_process_pool, get_process_pool_size
+from .catalog_matcher import CatalogMatcher
+from ..monitoring.metrics import timed_job
 import logging
 from io import BytesIO
 
 logger = logging.getLogger(__name__)
 
+# Паттерны для извлечения названия конфигурации
+_NAME_PATTERNS = [
+    re.compile(r'Конфигурация:\s*(.+)'),
+    re.compile(r'Название:\s*(.+)'),
+    re.compile(r'^(.+?)(?:\s*-\s*Конфигурация)?$')  # Первая строка как название
+]
+_NAME_SKIP_REGEX = re.compile(r'pdf|page|дата|date')
+
+# Паттерны категорий (как на русском, так и на английском)
+_CATEGORY_PATTERNS = {
+    'Процессоры': 'cpu',
+    'Процессор': 'cpu',
+    'CPU': 'cpu',
+    'Материнские платы': 'motherboard',
+    'Материнская плата': 'motherboard',
+    'Motherboard': 'motherboard',
+    'Оперативная память': 'ram',
+    'RAM': 'ram',
+    'Memory': 'ram',
+    'Видеокарты': 'gpu',
+    'Видеокарта': 'gpu',
+    'GPU': 'gpu',
+    'Graphics': 'gpu',
+    'Накопители': 'storage',
+    'Накопитель': 'storage',
+    'Storage': 'storage',
+    'SSD': 'storage',
+    'HDD': 'storage',
+    'Блоки питания': 'psu',
+    'Блок питания': 'psu',
+    'PSU': 'psu',
+    'Power Supply': 'psu',
+    'Корпуса': 'case',
+    'Корпус': 'case',
+    'Case': 'case',
+    'Охлаждение': 'cooler',
+    'Cooler': 'cooler',
+    'Cooling': 'cooler'
+}
+_CATEGORY_BY_NAME = {name.lower(): slug for name, slug in _CATEGORY_PATTERNS.items()}
+# Если в строке несколько названий, побеждает объявленное раньше в _CATEGORY_PATTERNS,
+# а не первое по положению в строке ("Cooling for SSD" - storage, "Блок питания для GPU" - gpu)
+_CATEGORY_PRIORITY = {name: priority for priority, name in enumerate(_CATEGORY_BY_NAME)}
+# Все категории одним выражением; длинные названия раньше коротких ("процессоры" раньше "процессор")
+_CATEGORY_ALTERNATION = '|'.join(re.escape(name) for name in sorted(_CATEGORY_BY_NAME, key=len, reverse=True))
+_CATEGORY_REGEX = re.compile(_CATEGORY_ALTERNATION)
+# Просмотр вперед находит названия, начинающиеся в каждой позиции, в том числе перекрывающиеся
+_CATEGORY_ALL_REGEX = re.compile(f'(?=({_CATEGORY_ALTERNATION}))')
+
+
+def _match_category(line_lower: str) -> Optional[str]:
+    """Название категории, найденное в строке, с наивысшим приоритетом"""
+    # Большинство строк без категорий отсекается одним поиском
+    first = _CATEGORY_REGEX.search(line_lower)
+    if first is None:
+        return None
+    names = [match.group(1) for match in _CATEGORY_ALL_REGEX.finditer(line_lower, first.start())]
+    return min(names, key=_CATEGORY_PRIORITY.__getitem__)
+
+# Служебные строки, которые не являются компонентами
+_SKIP_LINE_REGEX = re.compile(r'количество|модель|наличие|характеристики|итого|всего|цена|стоимость')
+
+# Паттерны строк с компонентами
+_COMPONENT_PATTERNS = [
+    # Паттерн: "Бренд Название ₽12,345" или "Бренд Название 12,345 ₽"
+    re.compile(r'^([A-Za-z0-9\.\-]+)\s+(.+?)\s+₽?([\d\s,]+)₽?\s*$'),
+    # Паттерн: "Полное название ₽12,345"
+    re.compile(r'^(.+?)\s+₽([\d\s,]+)₽?\s*$')
+]
+_PRICE_CLEANUP_REGEX = re.compile(r'[,\s]')
+
+
+def _count_pdf_pages(pdf_content: bytes) -> int:
+    """Подсчет страниц PDF (выполняется в пуле процессов)"""
+    with pdfplumber.open(BytesIO(pdf_content)) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_pages_text(pdf_content: bytes, page_numbers: List[int]) -> List[Tuple[int, str]]:
+    """Извлечение текста указанных страниц PDF (выполняется в пуле процессов)"""
+    result = []
+    with pdfplumber.open(BytesIO(pdf_content)) as pdf:
+        for page_number in page_numbers:
+            result.append((page_number, pdf.pages[page_number].extract_text() or ""))
+    return result
+
 
 class PDFImportService:
     def __init__(self, db: Session):
         self.db = db
         
+    @timed_job("pdf_import")
     async def import_configuration_from_pdf(self, pdf_content: bytes) -> Dict[str, Any]:
         """
         Импортирует конфигурацию из PDF файла
         """
         try:
-            # Извлекаем текст из PDF
-            text = self._extract_text_from_pdf(pdf_content)
+            timings = {}
+            
+            # Извлекаем текст из PDF (вне event loop, страницы параллельно)
+            started = time.perf_counter()
+            text, page_count = await self._extract_text_from_pdf(pdf_content)
+            timings['extract_ms'] = (time.perf_counter() - started) * 1000
             
             # Парсим конфигурацию
+            started = time.perf_counter()
             config_data = self._parse_configuration_text(text)
+            timings['parse_ms'] = (time.perf_counter() - started) * 1000
             
             # Находим компоненты в базе данных
+            started = time.perf_counter()
             components = await self._find_components_in_db(config_data['components'])
+            timings['match_ms'] = (time.perf_counter() - started) * 1000
             
-            return {
+            result = {
                 'name': config_data.get('name', 'Импортированная конфигурация'),
                 'description': config_data.get('description'),
                 'components': components,
@@ -35,39 +135,68 @@ class PDFImportService:
                 'compatibility_status': config_data.get('compatibility_status', 'unknown')
             }
             
+            if settings.DEBUG:
+                result['debug'] = {
+                    'pages': page_count,
+                    'text_length': len(text),
+                    'timings_ms': {key: round(value, 2) for key, value in timings.items()}
+                }
+            
+            return result
+            
         except Exception as e:
             logger.error(f"Ошибка импорта PDF: {str(e)}")
             raise Exception(f"Не удалось импортировать конфигурацию: {str(e)}")
     
-    def _extract_text_from_pdf(self, pdf_content: bytes) -> str:
+    async def _extract_text_from_pdf(self, pdf_content: bytes) -> Tuple[str, int]:
         """
-        Извлекает текст из PDF файла
+        Извлекает текст из PDF файла в пуле процессов, распределяя страницы между воркерами.
+        Возвращает текст и количество страниц
         """
-        text = ""
+        loop = asyncio.get_running_loop()
+        pool = get_process_pool()
+        
         try:
             logger.info(f"Начинаю извлечение текста из PDF, размер файла: {len(pdf_content)} байт")
-            # Оборачиваем байты в BytesIO для pdfplumber
-            pdf_stream = BytesIO(pdf_content)
-            with pdfplumber.open(pdf_stream) as pdf:
-                logger.info(f"PDF открыт, количество страниц: {len(pdf.pages)}")
-                for i, page in enumerate(pdf.pages):
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                        logger.debug(f"Извлечен текст со страницы {i+1}, длина: {len(page_text)} символов")
-                    else:
-                        logger.warning(f"Страница {i+1} не содержит текста")
-            
-            logger.info(f"Извлечение завершено, общая длина текста: {len(text)} символов")
+            page_count = await loop.run_in_executor(pool, _count_pdf_pages, pdf_content)
+            logger.info(f"PDF открыт, количество страниц: {page_count}")
+        except Exception as e:
+            logger.error(f"Ошибка извлечения текста из PDF: {str(e)}", exc_info=True)
+            raise Exception("Не удалось прочитать PDF файл")
+        
+        if page_count > settings.PDF_IMPORT_MAX_PAGES:
+            raise Exception(
+                f"PDF содержит {page_count} страниц, максимум - {settings.PDF_IMPORT_MAX_PAGES}"
+            )
+        
+        # Раскладываем страницы по воркерам через одну, чтобы нагрузка была равномерной
+        chunks_count = max(1, min(get_process_pool_size(), page_count))
+        chunks = [list(range(start, page_count, chunks_count)) for start in range(chunks_count)]
+        
+        try:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(pool, _extract_pages_text, pdf_content, chunk)
+                for chunk in chunks if chunk
+            ))
         except Exception as e:
             logger.error(f"Ошибка извлечения текста из PDF: {str(e)}", exc_info=True)
             raise Exception("Не удалось прочитать PDF файл")
         
-        return text
+        pages = sorted(page for chunk_result in results for page in chunk_result)
+        text = ""
+        for page_number, page_text in pages:
+            if page_text:
+                text += page_text + "\n"
+            else:
+                logger.warning(f"Страница {page_number + 1} не содержит текста")
+        
+        logger.info(f"Извлечение завершено, общая длина текста: {len(text)} символов")
+        return text, page_count
     
     def _parse_configuration_text(self, text: str) -> Dict[str, Any]:
         """
-        Парсит текст конфигурации и извлекает информацию о компонентах
+        Парсит текст конфигурации и извлекает информацию о компонентах.
+        Один проход по строкам с заранее скомпилированными паттернами
         """
         logger.info(f"Парсинг PDF текста, длина: {len(text)} символов")
         logger.debug(f"Первые 500 символов текста: {text[:500]}")
@@ -82,51 +211,12 @@ class PDFImportService:
         lines = text.split('\n')
         current_category = None
         
-        # Паттерны для извлечения информации (более гибкие)
-        name_patterns = [
-            r'Конфигурация:\s*(.+)',
-            r'Название:\s*(.+)',
-            r'^(.+?)(?:\s*-\s*Конфигурация)?$'  # Первая строка как название
-        ]
-        
-        # Паттерны категорий (как на русском, так и на английском)
-        category_patterns = {
-            'Процессоры': 'cpu',
-            'Процессор': 'cpu',
-            'CPU': 'cpu',
-            'Материнские платы': 'motherboard',
-            'Материнская плата': 'motherboard', 
-            'Motherboard': 'motherboard',
-            'Оперативная память': 'ram',
-            'RAM': 'ram',
-            'Memory': 'ram',
-            'Видеокарты': 'gpu',
-            'Видеокарта': 'gpu',
-            'GPU': 'gpu',
-            'Graphics': 'gpu',
-            'Накопители': 'storage',
-            'Накопитель': 'storage',
-            'Storage': 'storage',
-            'SSD': 'storage',
-            'HDD': 'storage',
-            'Блоки питания': 'psu',
-            'Блок питания': 'psu',
-            'PSU': 'psu',
-            'Power Supply': 'psu',
-            'Корпуса': 'case',
-            'Корпус': 'case',
-            'Case': 'case',
-            'Охлаждение': 'cooler',
-            'Cooler': 'cooler',
-            'Cooling': 'cooler'
-        }
-        
         # Извлекаем название конфигурации
         for i, line in enumerate(lines[:10]):  # Ищем в первых 10 строках
             line = line.strip()
-            if line and not any(keyword in line.lower() for keyword in ['pdf', 'page', 'дата', 'date']):
-                for pattern in name_patterns:
-                    match = re.search(pattern, line)
+            if line and not _NAME_SKIP_REGEX.search(line.lower()):
+                for pattern in _NAME_PATTERNS:
+                    match = pattern.search(line)
                     if match:
                         config_data['name'] = match.group(1).strip()
                         break
@@ -145,125 +235,118 @@ class PDFImportService:
         elif 'несовместимо' in text_lower or 'incompatible' in text_lower:
             config_data['compatibility_status'] = 'incompatible'
         
+        # Ключи уже найденных компонентов для проверки дубликатов за O(1)
+        seen_components = set()
+        
         # Парсим компоненты
-        for i, line in enumerate(lines):
+        for line in lines:
             line = line.strip()
             if not line:
                 continue
+            line_lower = line.lower()
             
-            # Проверяем, является ли строка категорией
-            for category_name, category_slug in category_patterns.items():
-                if category_name.lower() in line.lower():
-                    current_category = category_slug
-                    logger.debug(f"Найдена категория: {category_name} -> {category_slug}")
-                    break
+            # Проверяем, является ли строка категорией (одно регулярное выражение на все категории)
+            category_name = _match_category(line_lower)
+            if category_name:
+                current_category = _CATEGORY_BY_NAME[category_name]
+                logger.debug("Найдена категория: %s -> %s", category_name, current_category)
             
             # Если у нас есть текущая категория, пытаемся найти компонент
-            if current_category:
-                # Пропускаем служебные строки
-                skip_keywords = ['количество', 'модель', 'наличие', 'характеристики', 'итого', 'всего', 'цена', 'стоимость']
-                if any(keyword in line.lower() for keyword in skip_keywords):
+            if not current_category:
+                continue
+            
+            # Пропускаем служебные строки
+            if _SKIP_LINE_REGEX.search(line_lower):
+                continue
+            
+            for pattern_idx, pattern in enumerate(_COMPONENT_PATTERNS):
+                component_match = pattern.search(line)
+                if not component_match:
                     continue
                 
-                # Более точные паттерны для компонентов
-                component_patterns = [
-                    # Паттерн: "Бренд Название ₽12,345" или "Бренд Название 12,345 ₽"
-                    r'^([A-Za-z0-9\.\-]+)\s+(.+?)\s+₽?([\d\s,]+)₽?\s*$',
-                    # Паттерн: "Полное название ₽12,345"
-                    r'^(.+?)\s+₽([\d\s,]+)₽?\s*$'
-                ]
+                if pattern_idx == 0:
+                    # Первый паттерн: бренд + название + цена
+                    brand = component_match.group(1).strip()
+                    name = component_match.group(2).strip()
+                    price_str = component_match.group(3)
+                else:
+                    # Второй паттерн: полное название + цена
+                    full_name = component_match.group(1).strip()
+                    price_str = component_match.group(2)
+                    
+                    # Пытаемся разделить на бренд и название
+                    name_parts = full_name.split(' ', 1)
+                    if len(name_parts) >= 2:
+                        brand = name_parts[0]
+                        name = name_parts[1]
+                    else:
+                        brand = "Unknown"
+                        name = full_name
+                
+                try:
+                    price = float(_PRICE_CLEANUP_REGEX.sub('', price_str))
+                except ValueError:
+                    continue
                 
-                for pattern_idx, pattern in enumerate(component_patterns):
-                    component_match = re.search(pattern, line.strip())
-                    if component_match:
-                        if pattern_idx == 0 and len(component_match.groups()) == 3:
-                            # Первый паттерн: бренд + название + цена
-                            brand = component_match.group(1).strip()
-                            name = component_match.group(2).strip()
-                            price_str = component_match.group(3).replace(',', '').replace(' ', '')
-                        else:
-                            # Второй паттерн: полное название + цена
-                            full_name = component_match.group(1).strip()
-                            price_str = component_match.group(2).replace(',', '').replace(' ', '')
-                            
-                            # Пытаемся разделить на бренд и название
-                            name_parts = full_name.split(' ', 1)
-                            if len(name_parts) >= 2:
-                                brand = name_parts[0]
-                                name = name_parts[1]
-                            else:
-                                brand = "Unknown"
-                                name = full_name
-                        
-                        try:
-                            price = float(price_str)
-                            # Проверяем, что цена разумная (больше 100 рублей)
-                            if price >= 100:
-                                # Проверяем, что такой компонент еще не добавлен
-                                already_exists = any(
-                                    comp['category'] == current_category and 
-                                    comp['brand'].lower() == brand.lower() and 
-                                    comp['name'].lower() == name.lower()
-                                    for comp in config_data['components']
-                                )
-                                
-                                if not already_exists:
-                                    config_data['components'].append({
-                                        'category': current_category,
-                                        'brand': brand,
-                                        'name': name,
-                                        'price': price
-                                    })
-                                    logger.debug(f"Найден компонент: {brand} {name} - {price}₽")
-                                    break
-                        except ValueError:
-                            continue
+                # Проверяем, что цена разумная (больше 100 рублей)
+                if price < 100:
+                    continue
+                
+                component_key = (current_category, brand.lower(), name.lower())
+                if component_key in seen_components:
+                    continue
+                
+                seen_components.add(component_key)
+                config_data['components'].append({
+                    'category': current_category,
+                    'brand': brand,
+                    'name': name,
+                    'price': price
+                })
+                logger.debug("Найден компонент: %s %s - %s₽", brand, name, price)
+                break
         
         logger.info(f"Найдено компонентов: {len(config_data['components'])}")
         return config_data
     
     async def _find_components_in_db(self, parsed_components: List[Dict]) -> List[Dict]:
         """
-        Находит компоненты в базе данных по названию и бренду
+        Находит компоненты в базе данных по названию и бренду.
+        Кандидаты для всех строк загружаются одним запросом
         """
+        matcher = CatalogMatcher.load(self.db, (comp['category'] for comp in parsed_components))
         found_components = []
         
         for comp_data in parsed_components:
-            # Ищем компонент в базе данных
-            category = self.db.query(ComponentCategory).filter(
-                ComponentCategory.slug == comp_data['category']
-            ).first()
-            
-            if not category:
-                continue
+            # Ранжированные кандидаты по бренду и названию (нечеткий поиск)
+            matches = matcher.match(
+                comp_data['category'],
+                comp_data['brand'],
+                comp_data['name'],
+                top_k=settings.PDF_IMPORT_TOP_K
+            )
+            candidates = [
+                {
+                    'id': str(match.entry.id),
+                    'name': match.entry.name,
+                    'brand': match.entry.brand,
+                    'price': match.entry.price,
+                    'score': round(match.score, 3)
+                }
+                for match in matches
+            ]
             
-            # Ищем компонент по бренду и названию (нечеткий поиск)
-            components = self.db.query(Component).filter(
-                Component.category_id == category.id,
-                Component.is_active == True,
-                Component.brand.ilike(f"%{comp_data['brand']}%")
-            ).all()
-            
-            # Ищем наиболее подходящий компонент
-            best_match = None
-            best_score = 0
-            
-            for component in components:
-                score = self._calculate_similarity(
-                    comp_data['name'].lower(),
-                    component.name.lower()
-                )
-                if score > best_score and score > 0.5:  # Минимальный порог схожести
-                    best_match = component
-                    best_score = score
+            best_match = matches[0] if matches and matches[0].score > 0.5 else None  # Минимальный порог схожести
             
             if best_match:
                 found_components.append({
-                    'id': str(best_match.id),
+                    'id': str(best_match.entry.id),
                     'category': comp_data['category'],
-                    'name': best_match.name,
-                    'brand': best_match.brand,
-                    'price': float(best_match.price)
+                    'name': best_match.entry.name,
+                    'brand': best_match.entry.brand,
+                    'price': best_match.entry.price,
+                    'score': round(best_match.score, 3),
+                    'matches': candidates
                 })
             else:
                 # Если не нашли точное соответствие, создаем запись без ID
@@ -274,27 +357,8 @@ class PDFImportService:
                     'name': comp_data['name'],
                     'brand': comp_data['brand'],
                     'price': comp_data['price'],
-                    'not_found': True
+                    'not_found': True,
+                    'matches': candidates
                 })
         
         return found_components
-    
-    def _calculate_similarity(self, str1: str, str2: str) -> float:
-        """
-        Вычисляет схожесть двух строк (простой алгоритм)
-        """
-        # Удаляем лишние пробелы и приводим к нижнему регистру
-        str1 = ' '.join(str1.split())
-        str2 = ' '.join(str2.split())
-        
-        # Простой алгоритм на основе общих слов
-        words1 = set(str1.split())
-        words2 = set(str2.split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union) if union else 0.0
\ No newline at end of file
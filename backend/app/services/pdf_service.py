@@ -1,8 +1,10 @@
 import os
+import json
 import tempfile
 import logging
+from io import BytesIO
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple, Iterator, Dict, Any
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -11,26 +13,46 @@ from reportlab.lib import colors
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-from jinja2 import Environment, FileSystemLoader
-from ..schemas.configuration import ConfigurationExport
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+from ..schemas.configuration import ConfigurationExport, ExportFormat
 from ..config import settings
+from ..monitoring.metrics import timed_job
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
 
+# Окружение Jinja2 общее для всех экземпляров сервиса: шаблоны компилируются
+# один раз на процесс, auto_reload отключен, чтобы не проверять mtime файла на каждый рендер
+_template_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
+_jinja_env = Environment(
+    loader=FileSystemLoader(_template_dir),
+    autoescape=select_autoescape(['html']),
+    auto_reload=False
+)
+
+# Шрифты регистрируются в reportlab глобально, повторная регистрация не нужна
+_fonts_registered = False
+
+
 class PDFService:
-    """Сервис для генерации PDF отчетов"""
+    """Сервис для генерации отчетов конфигураций (PDF, HTML, JSON)"""
+    
+    REPORT_TEMPLATE = 'configuration_pdf.html'
     
     def __init__(self):
         # Настройка Jinja2 для шаблонов
-        template_dir = os.path.join(os.path.dirname(__file__), '..', 'templates')
-        self.jinja_env = Environment(loader=FileSystemLoader(template_dir))
+        self.jinja_env = _jinja_env
         
         # Регистрируем русские шрифты
         self._register_fonts()
     
     def _register_fonts(self):
         """Регистрация шрифтов для поддержки русского языка"""
+        global _fonts_registered
+        if _fonts_registered:
+            return
+        _fonts_registered = True
+        
         try:
             # Пытаемся использовать системные шрифты
             font_paths = [
@@ -57,6 +79,7 @@ class PDFService:
         except Exception as e:
             logger.error(f"Ошибка регистрации шрифтов: {e}")
     
+    @timed_job("pdf_export")
     def generate_configuration_pdf(self, export_data: ConfigurationExport) -> str:
         """Генерация PDF отчета конфигурации"""
         
@@ -100,8 +123,83 @@ class PDFService:
             logger.info(f"HTML файл создан: {html_path}")
             return html_path
     
+    def render_configuration_document(
+        self,
+        export_data: ConfigurationExport,
+        export_format: ExportFormat = ExportFormat.PDF
+    ) -> Tuple[bytes, str]:
+        """Генерация отчета конфигурации в памяти, возвращает (содержимое, расширение)"""
+        if export_format == ExportFormat.HTML:
+            return self._generate_html_from_template(export_data).encode("utf-8"), "html"
+        if export_format == ExportFormat.JSON:
+            return self.render_compact_json(export_data), "json"
+        
+        try:
+            pdf_buffer = BytesIO()
+            self._generate_modern_pdf(export_data, pdf_buffer)
+            return pdf_buffer.getvalue(), "pdf"
+        except Exception as e:
+            # Как и при записи в файл, при ошибке reportlab отдаем HTML отчет
+            logger.error(f"Ошибка генерации PDF: {e}", exc_info=True)
+            return self._generate_html_from_template(export_data).encode("utf-8"), "html"
+    
+    def stream_html(self, export_data: ConfigurationExport) -> Iterator[str]:
+        """Потоковый рендеринг HTML отчета (по частям, без сборки всей строки в памяти)"""
+        template_data = self._build_template_data(export_data)
+        return self._get_report_template().generate(**template_data)
+    
+    @timed_job("json_export")
+    def render_compact_json(self, export_data: ConfigurationExport) -> bytes:
+        """Компактное JSON представление конфигурации для легковесного обмена"""
+        config = export_data.configuration
+        compatibility = export_data.compatibility_check
+        
+        def _line(entry) -> Dict[str, Any]:
+            price = entry.price_snapshot or entry.component.price
+            return {
+                'id': str(entry.component.id),
+                'category': entry.component.category.slug,
+                'brand': entry.component.brand,
+                'name': entry.component.name,
+                'model': entry.component.model,
+                'quantity': entry.quantity,
+                'price': price
+            }
+        
+        items = [_line(item) for item in config.items]
+        accessories = [_line(acc) for acc in config.accessories]
+        
+        payload = {
+            'id': str(config.id),
+            'public_uuid': config.public_uuid,
+            'name': config.name,
+            'description': config.description,
+            'export_date': export_data.export_date.isoformat(),
+            'total_price': sum(line['price'] * line['quantity'] for line in items + accessories),
+            'total_power_consumption': compatibility.total_power_consumption,
+            'recommended_psu_wattage': compatibility.recommended_psu_wattage,
+            'compatibility_status': compatibility.status.value,
+            'compatibility_issues': [
+                {'type': issue.type, 'severity': issue.severity, 'message': issue.message}
+                for issue in compatibility.issues
+            ],
+            'items': items,
+            'accessories': accessories
+        }
+        
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    def _get_report_template(self) -> Template:
+        """Скомпилированный шаблон отчета (кэшируется окружением Jinja2)"""
+        return self.jinja_env.get_template(self.REPORT_TEMPLATE)
+    
     def _generate_html_from_template(self, export_data: ConfigurationExport) -> str:
         """Генерация HTML отчета с помощью Jinja2 шаблона"""
+        template_data = self._build_template_data(export_data)
+        return self._get_report_template().render(**template_data)
+    
+    def _build_template_data(self, export_data: ConfigurationExport) -> Dict[str, Any]:
+        """Подготовка данных для HTML шаблона"""
         
         config = export_data.configuration
         compatibility = export_data.compatibility_check
@@ -157,9 +255,7 @@ class PDFService:
             'notes': export_data.notes
         }
         
-        # Рендерим шаблон
-        template = self.jinja_env.get_template('configuration_pdf.html')
-        return template.render(**template_data)
+        return template_data
     
     def _get_compatibility_status_text(self, status: str) -> str:
         """Получить текстовое описание статуса совместимости"""
@@ -215,8 +311,8 @@ class PDFService:
         
         return " | ".join(formatted)
 
-    def _generate_modern_pdf(self, export_data: ConfigurationExport, pdf_path: str):
-        """Генерация современного PDF отчета в стиле фронтенда"""
+    def _generate_modern_pdf(self, export_data: ConfigurationExport, pdf_path):
+        """Генерация современного PDF отчета в стиле фронтенда (pdf_path - путь или файловый объект)"""
         
         config = export_data.configuration
         compatibility = export_data.compatibility_check
@@ -534,4 +630,19 @@ class PDFService:
             spaceBefore=0,
         )
         
-        return styles 
\ No newline at end of file
+        return styles
+
+
+# Экземпляр сервиса внутри процесса пула: шрифты регистрируются один раз на процесс
+_worker_pdf_service: Optional[PDFService] = None
+
+
+def render_configuration_document_in_worker(
+    export_data: ConfigurationExport,
+    export_format: ExportFormat = ExportFormat.PDF
+) -> Tuple[bytes, str]:
+    """Точка входа для пула процессов при пакетном экспорте"""
+    global _worker_pdf_service
+    if _worker_pdf_service is None:
+        _worker_pdf_service = PDFService()
+    return _worker_pdf_service.render_configuration_document(export_data, export_format)
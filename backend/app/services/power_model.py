@@ -0,0 +1,212 @@
+"""
+Модель энергопотребления сборки.
+
+Для каждого компонента считается профиль нагрузки (пиковая, типичная и кратковременная
+мощность, доля нагрузки на линию 12В), для блока питания - кривая КПД, мощность линии 12В
+и допустимые кратковременные перегрузки. Профили строятся из характеристик один раз
+и кешируются, поэтому проверка сборки линейна по числу позиций.
+"""
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple, Union
+from uuid import UUID
+from ..models import Component
+
+# Запас мощности БП относительно пиковой нагрузки; меньший запас - предупреждение
+PEAK_HEADROOM = 1.2
+
+# Шаг округления рекомендуемой мощности БП
+_PSU_WATTAGE_STEP = 50
+
+# Профили по категориям: доля пиковой мощности в типичной нагрузке,
+# множитель кратковременных пиков, доля нагрузки на линию 12В
+_CATEGORY_PROFILES: Dict[str, Tuple[float, float, float]] = {
+    "cpu": (0.6, 1.3, 1.0),  # Турбо-режим (PL2) кратковременно превышает TDP
+    "gpu": (0.75, 2.0, 0.95),  # Видеокарты дают всплески до 2x TBP (учтено в ATX 3.0)
+    "motherboard": (0.8, 1.0, 0.3),
+    "ram": (0.7, 1.0, 0.2),
+    "storage": (0.5, 1.5, 0.5),  # Раскрутка шпинделя HDD
+    "cooler": (0.6, 1.0, 1.0),
+    "case": (0.6, 1.0, 1.0),  # Вентиляторы и подсветка
+}
+_DEFAULT_PROFILE = (0.7, 1.0, 0.5)
+
+# КПД по сертификатам 80 PLUS (115В) при нагрузке 10%, 20%, 50% и 100% от номинала
+_EFFICIENCY_CURVES: Dict[str, Tuple[Tuple[float, float], ...]] = {
+    "80_plus": ((0.1, 0.75), (0.2, 0.80), (0.5, 0.80), (1.0, 0.80)),
+    "bronze": ((0.1, 0.77), (0.2, 0.82), (0.5, 0.85), (1.0, 0.82)),
+    "silver": ((0.1, 0.80), (0.2, 0.85), (0.5, 0.88), (1.0, 0.85)),
+    "gold": ((0.1, 0.82), (0.2, 0.87), (0.5, 0.90), (1.0, 0.87)),
+    "platinum": ((0.1, 0.85), (0.2, 0.90), (0.5, 0.92), (1.0, 0.89)),
+    "titanium": ((0.1, 0.90), (0.2, 0.92), (0.5, 0.94), (1.0, 0.90)),
+}
+_DEFAULT_EFFICIENCY = ((0.1, 0.70), (0.2, 0.75), (0.5, 0.78), (1.0, 0.75))
+
+# Допустимая кратковременная перегрузка: ATX 3.x - 200% номинала, более старые БП - около 130%
+_TRANSIENT_TOLERANCE_ATX3 = 2.0
+_TRANSIENT_TOLERANCE_LEGACY = 1.3
+
+# Если мощность линии 12В не указана, считаем, что на нее приходится почти весь номинал
+_DEFAULT_12V_SHARE = 0.9
+
+
+def _as_number(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@dataclass(frozen=True)
+class PowerProfile:
+    """Профиль нагрузки одного компонента, Вт"""
+    peak: int
+    typical: int
+    transient: int
+    rail_12v: int
+
+
+@dataclass(frozen=True)
+class PsuProfile:
+    """Характеристики блока питания, важные для проверки бюджета мощности"""
+    wattage: int
+    rail_12v: int
+    transient_tolerance: float
+    efficiency_curve: Tuple[Tuple[float, float], ...]
+
+    def efficiency_at(self, load: float) -> float:
+        """КПД при заданной нагрузке (линейная интерполяция по точкам кривой)"""
+        if self.wattage <= 0:
+            return self.efficiency_curve[0][1]
+        fraction = load / self.wattage
+        points = self.efficiency_curve
+        if fraction <= points[0][0]:
+            return points[0][1]
+        for (x0, y0), (x1, y1) in zip(points, points[1:]):
+            if fraction <= x1:
+                return y0 + (y1 - y0) * (fraction - x0) / (x1 - x0)
+        return points[-1][1]
+
+    def wall_draw(self, load: float) -> int:
+        """Потребление из розетки при заданной нагрузке"""
+        return int(round(load / self.efficiency_at(load))) if load > 0 else 0
+
+    def covers(self, budget: "PowerBudget") -> bool:
+        """
+        БП выдерживает нагрузку без ошибок и предупреждений проверки совместимости:
+        запас по пиковой мощности, линия 12В и кратковременные пики
+        """
+        return (
+            self.wattage >= budget.peak * PEAK_HEADROOM
+            and self.rail_12v >= budget.rail_12v
+            and self.wattage * self.transient_tolerance >= budget.transient
+        )
+
+
+@dataclass(frozen=True)
+class PowerBudget:
+    """Суммарная нагрузка сборки с учетом количества, Вт"""
+    peak: int
+    typical: int
+    transient: int
+    rail_12v: int
+
+    @property
+    def recommended_psu_wattage(self) -> Optional[int]:
+        """Рекомендуемая мощность БП стандарта ATX 3.x"""
+        if self.peak <= 0:
+            return None
+        return self.psu_wattage_for(_TRANSIENT_TOLERANCE_ATX3)
+
+    def psu_wattage_for(self, transient_tolerance: float) -> int:
+        """Мощность БП с запасом по пиковой нагрузке и по кратковременным всплескам"""
+        required = max(self.peak * PEAK_HEADROOM, self.transient / transient_tolerance)
+        return int(math.ceil(required / _PSU_WATTAGE_STEP) * _PSU_WATTAGE_STEP)
+
+    def add(self, profile: Union[PowerProfile, "PowerBudget"], quantity: int = 1) -> "PowerBudget":
+        """Бюджет с добавленным компонентом или другим бюджетом (отрицательное quantity - вычитание)"""
+        return PowerBudget(
+            peak=self.peak + profile.peak * quantity,
+            typical=self.typical + profile.typical * quantity,
+            transient=self.transient + profile.transient * quantity,
+            rail_12v=self.rail_12v + profile.rail_12v * quantity,
+        )
+
+
+@lru_cache(maxsize=8192)
+def _build_profile(category: str, peak: int, typical: float, transient: float) -> PowerProfile:
+    typical_share, transient_factor, share_12v = _CATEGORY_PROFILES.get(category, _DEFAULT_PROFILE)
+    return PowerProfile(
+        peak=peak,
+        typical=int(round(typical or peak * typical_share)),
+        transient=int(round(max(transient or peak * transient_factor, peak))),
+        rail_12v=int(round(peak * share_12v)),
+    )
+
+
+@lru_cache(maxsize=1024)
+def _build_psu_profile(wattage: int, rail_12v: float, efficiency_rating: str, atx_version: float) -> PsuProfile:
+    return PsuProfile(
+        wattage=wattage,
+        rail_12v=int(rail_12v) if rail_12v > 0 else int(wattage * _DEFAULT_12V_SHARE),
+        transient_tolerance=_TRANSIENT_TOLERANCE_ATX3 if atx_version >= 3 else _TRANSIENT_TOLERANCE_LEGACY,
+        efficiency_curve=_EFFICIENCY_CURVES.get(efficiency_rating, _DEFAULT_EFFICIENCY),
+    )
+
+
+def component_profile(component: Component) -> PowerProfile:
+    """
+    Профиль нагрузки компонента. Пиковая мощность - power_consumption; типичную и
+    кратковременную можно задать в характеристиках (typical_power, transient_power)
+    """
+    return profile_from_specs(component.category.slug, component.power_consumption, component.specifications)
+
+
+def profile_from_specs(category: str, power_consumption: Optional[int], specifications: Optional[dict]) -> PowerProfile:
+    """Профиль нагрузки по полям компонента (для строк индекса каталога без ORM объектов)"""
+    specs = specifications or {}
+    return _build_profile(
+        category,
+        power_consumption or 0,
+        _as_number(specs.get("typical_power")),
+        _as_number(specs.get("transient_power")),
+    )
+
+
+def psu_profile(component: Component) -> PsuProfile:
+    """
+    Профиль блока питания из характеристик: wattage, мощность линии 12В
+    (rail_12v_w или ток rail_12v_a), сертификат efficiency_rating и atx_version
+    """
+    return psu_profile_from_specs(component.specifications)
+
+
+def psu_profile_from_specs(specifications: Optional[dict]) -> PsuProfile:
+    specs = specifications or {}
+    rail_12v = _as_number(specs.get("rail_12v_w")) or _as_number(specs.get("rail_12v_a")) * 12
+    rating = str(specs.get("efficiency_rating") or "").lower().replace("80 plus", "").replace("80+", "").strip(" _-")
+    return _build_psu_profile(
+        int(_as_number(specs.get("wattage"))),
+        rail_12v,
+        rating or ("80_plus" if specs.get("efficiency_rating") else ""),
+        _as_number(specs.get("atx_version")),
+    )
+
+
+def calculate_power_budget(
+    components: Iterable[Component],
+    quantities: Optional[Dict[UUID, int]] = None
+) -> PowerBudget:
+    """Суммарная нагрузка сборки; блоки питания в нагрузку не входят"""
+    peak = typical = transient = rail_12v = 0
+    for component in components:
+        if component.category.slug == "psu":
+            continue
+        quantity = quantities.get(component.id, 1) if quantities else 1
+        profile = component_profile(component)
+        peak += profile.peak * quantity
+        typical += profile.typical * quantity
+        transient += profile.transient * quantity
+        rail_12v += profile.rail_12v * quantity
+    return PowerBudget(peak=peak, typical=typical, transient=transient, rail_12v=rail_12v)
@@ -0,0 +1,190 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..schemas.price_history import (
+    PriceHistoryBucket, PriceHistoryPoint, ConfigurationPriceHistoryPoint,
+    ComponentPriceHistoryResponse, ConfigurationPriceHistoryResponse
+)
+
+logger = logging.getLogger(__name__)
+
+_BUCKET_INTERVALS = {
+    PriceHistoryBucket.DAY: timedelta(days=1),
+    PriceHistoryBucket.WEEK: timedelta(weeks=1),
+    PriceHistoryBucket.MONTH: timedelta(days=31),
+}
+
+# Интервалы строятся в SQL, для каждого берется последняя цена до конца интервала
+# (LATERAL + индекс (component_id, recorded_at)), поэтому пропуски без изменений цены заполняются
+_BUCKETS_CTE = """
+    buckets AS (
+        SELECT bucket_start, bucket_start + CAST(:step AS interval) AS bucket_end
+        FROM generate_series(
+            date_trunc(:unit, CAST(:start AS timestamptz)),
+            CAST(:end AS timestamptz),
+            CAST(:step AS interval)
+        ) AS bucket_start
+    )
+"""
+
+_COMPONENT_HISTORY_SQL = text(f"""
+    WITH {_BUCKETS_CTE}
+    SELECT b.bucket_start, last_price.price
+    FROM buckets b
+    LEFT JOIN LATERAL (
+        SELECT h.price
+        FROM component_price_history h
+        WHERE h.component_id = :component_id
+          AND h.recorded_at < b.bucket_end
+        ORDER BY h.recorded_at DESC
+        LIMIT 1
+    ) last_price ON true
+    ORDER BY b.bucket_start
+""")
+
+_CONFIGURATION_HISTORY_SQL = text(f"""
+    WITH {_BUCKETS_CTE},
+    items AS (
+        SELECT component_id, coalesce(quantity, 1) AS quantity
+        FROM configuration_items
+        WHERE configuration_id = :configuration_id
+    )
+    SELECT b.bucket_start,
+           sum(last_price.price * i.quantity) AS price,
+           count(last_price.price) = count(*) AS complete
+    FROM buckets b
+    CROSS JOIN items i
+    LEFT JOIN LATERAL (
+        SELECT h.price
+        FROM component_price_history h
+        WHERE h.component_id = i.component_id
+          AND h.recorded_at < b.bucket_end
+        ORDER BY h.recorded_at DESC
+        LIMIT 1
+    ) last_price ON true
+    GROUP BY b.bucket_start
+    ORDER BY b.bucket_start
+""")
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class PriceHistoryService:
+    """История цен компонентов и конфигураций с агрегацией по интервалам"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ensure_partitions(self, months_ahead: Optional[int] = None) -> List[str]:
+        """Создать секции истории цен на текущий и следующие месяцы"""
+        months_ahead = settings.PRICE_HISTORY_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+        partitions = [row[0] for row in self.db.execute(text("""
+            SELECT create_price_history_partition((now() + make_interval(months => m))::date)
+            FROM generate_series(0, :months_ahead) AS m
+        """), {"months_ahead": months_ahead})]
+        self.db.commit()
+        return partitions
+
+    def get_component_history(
+        self,
+        component_id: UUID,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        bucket: Optional[PriceHistoryBucket] = None
+    ) -> ComponentPriceHistoryResponse:
+        """История цены компонента за период"""
+        start, end, bucket = self._resolve_range(start, end, bucket)
+        rows = self.db.execute(_COMPONENT_HISTORY_SQL, {
+            **self._range_params(start, end, bucket),
+            "component_id": component_id
+        })
+
+        return ComponentPriceHistoryResponse(
+            component_id=component_id,
+            start=start,
+            end=end,
+            bucket=bucket,
+            points=[
+                PriceHistoryPoint(
+                    bucket_start=row.bucket_start,
+                    price=float(row.price) if row.price is not None else None
+                )
+                for row in rows
+            ]
+        )
+
+    def get_configuration_history(
+        self,
+        configuration_id: UUID,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        bucket: Optional[PriceHistoryBucket] = None
+    ) -> ConfigurationPriceHistoryResponse:
+        """Стоимость компонентов конфигурации по текущему составу за период"""
+        start, end, bucket = self._resolve_range(start, end, bucket)
+        rows = self.db.execute(_CONFIGURATION_HISTORY_SQL, {
+            **self._range_params(start, end, bucket),
+            "configuration_id": configuration_id
+        })
+
+        return ConfigurationPriceHistoryResponse(
+            configuration_id=configuration_id,
+            start=start,
+            end=end,
+            bucket=bucket,
+            points=[
+                ConfigurationPriceHistoryPoint(
+                    bucket_start=row.bucket_start,
+                    price=float(row.price) if row.price is not None else None,
+                    complete=row.complete
+                )
+                for row in rows
+            ]
+        )
+
+    def _resolve_range(
+        self,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        bucket: Optional[PriceHistoryBucket]
+    ) -> Tuple[datetime, datetime, PriceHistoryBucket]:
+        """
+        Период по умолчанию - последние 90 дней, интервал подбирается по длине периода.
+        Границы без часового пояса считаются UTC
+        """
+        end = _as_utc(end) if end else datetime.now(timezone.utc)
+        start = _as_utc(start) if start else end - timedelta(days=90)
+        if start >= end:
+            raise ValueError("Начало периода должно быть раньше конца")
+
+        span = end - start
+        if bucket is None:
+            if span <= timedelta(days=92):
+                bucket = PriceHistoryBucket.DAY
+            elif span <= timedelta(days=730):
+                bucket = PriceHistoryBucket.WEEK
+            else:
+                bucket = PriceHistoryBucket.MONTH
+
+        points = span / _BUCKET_INTERVALS[bucket]
+        if points > settings.PRICE_HISTORY_MAX_POINTS:
+            raise ValueError(
+                f"Слишком много точек ({int(points)}) для интервала '{bucket.value}', "
+                f"максимум {settings.PRICE_HISTORY_MAX_POINTS}"
+            )
+
+        return start, end, bucket
+
+    def _range_params(self, start: datetime, end: datetime, bucket: PriceHistoryBucket) -> dict:
+        return {
+            "start": start,
+            "end": end,
+            "unit": bucket.value,
+            "step": f"1 {bucket.value}",
+        }
@@ -0,0 +1,47 @@
+import os
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_process_pool_size() -> int:
+    """Количество процессов в общем пуле"""
+    return settings.PROCESS_POOL_WORKERS or os.cpu_count() or 1
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Получить общий пул процессов для CPU-нагруженных задач (рендеринг, парсинг)"""
+    global _executor
+    executor = _executor
+    if executor is not None:
+        return executor
+
+    # Первые запросы могут прийти одновременно из разных потоков: пул создается один раз
+    with _executor_lock:
+        if _executor is None:
+            max_workers = get_process_pool_size()
+            # spawn вместо fork: воркер uvicorn многопоточный, fork может унаследовать захваченные блокировки
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Запущен пул процессов, воркеров: {max_workers}")
+        return _executor
+
+
+def shutdown_process_pool() -> None:
+    """Остановить пул процессов (вызывается при завершении приложения)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+            logger.info("Пул процессов остановлен")
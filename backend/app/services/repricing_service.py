@@ -0,0 +1,186 @@
+import time
+import logging
+from typing import List, Optional, Iterator
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..schemas.configuration import ConfigurationRepriceResult
+from ..monitoring.metrics import timed_job
+
+logger = logging.getLogger(__name__)
+
+# Код ошибки PostgreSQL lock_not_available (истек lock_timeout)
+_LOCK_NOT_AVAILABLE = "55P03"
+
+# Обновление снимков цен; экспортированные конфигурации сохраняют цены, по которым их выгрузили
+_REFRESH_SNAPSHOTS_SQL = """
+    UPDATE configuration_items ci
+    SET price_snapshot = c.price
+    FROM components c, configurations cfg
+    WHERE c.id = ci.component_id
+      AND cfg.id = ci.configuration_id
+      AND ci.configuration_id = ANY(:config_ids)
+      AND coalesce(cfg.status, 'draft') <> 'exported'
+      AND ci.price_snapshot IS DISTINCT FROM c.price
+      {component_filter}
+"""
+
+# Итоги считаются так же, как в _update_configuration_totals: снимок цены, а если его нет - цена каталога
+_RECALCULATE_TOTALS_SQL = text("""
+    WITH totals AS (
+        SELECT ci.configuration_id,
+               sum(coalesce(nullif(ci.price_snapshot, 0), c.price) * coalesce(ci.quantity, 1)) AS total_price,
+               sum(c.price * coalesce(ci.quantity, 1)) AS current_total_price
+        FROM configuration_items ci
+        JOIN components c ON c.id = ci.component_id
+        WHERE ci.configuration_id = ANY(:config_ids)
+        GROUP BY ci.configuration_id
+    ),
+    target AS (
+        SELECT cfg.id,
+               coalesce(totals.total_price, 0) AS total_price,
+               coalesce(totals.current_total_price, 0) AS current_total_price
+        FROM configurations cfg
+        LEFT JOIN totals ON totals.configuration_id = cfg.id
+        WHERE cfg.id = ANY(:config_ids)
+    )
+    UPDATE configurations cfg
+    SET total_price = t.total_price,
+        current_total_price = t.current_total_price
+    FROM target t
+    WHERE cfg.id = t.id
+      AND (cfg.total_price, cfg.current_total_price)
+          IS DISTINCT FROM
+          (t.total_price, t.current_total_price)
+""")
+
+
+class RepricingService:
+    """
+    Переоценка сохраненных конфигураций после изменения цен каталога.
+    Работает пачками: каждая пачка - короткая транзакция с ограниченным
+    ожиданием блокировок; при таймауте пачка повторяется
+    """
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None):
+        self.db = db
+        self.batch_size = batch_size or settings.REPRICING_BATCH_SIZE
+
+    @timed_job("repricing")
+    def reprice(
+        self,
+        component_ids: Optional[List[UUID]] = None,
+        keep_snapshots: bool = False
+    ) -> ConfigurationRepriceResult:
+        """
+        Пересчитать конфигурации с указанными компонентами (или все, если список не задан).
+        keep_snapshots=True оставляет price_snapshot как есть и обновляет только
+        текущую стоимость, по которой видна разница со стоимостью по снимкам
+        """
+        started = time.perf_counter()
+        stats = {"checked": 0, "updated": 0, "items": 0, "batches": 0, "retries": 0}
+        skipped: List[UUID] = []
+
+        if component_ids is not None:
+            component_ids = list(set(component_ids))
+            if not component_ids:
+                return self._build_result(stats, skipped, started)
+
+        for batch in self._iter_batches(component_ids):
+            if self._reprice_batch(batch, component_ids, keep_snapshots, stats):
+                stats["checked"] += len(batch)
+            else:
+                skipped.extend(batch)
+            stats["batches"] += 1
+
+        result = self._build_result(stats, skipped, started)
+        logger.info(
+            f"Переоценка конфигураций: проверено {result.configurations_checked}, "
+            f"обновлено {result.configurations_updated}, позиций {result.items_repriced}, "
+            f"пропущено {len(skipped)} за {result.elapsed_seconds}с"
+        )
+        return result
+
+    def _iter_batches(self, component_ids: Optional[List[UUID]]) -> Iterator[List[UUID]]:
+        """Пачки ID конфигураций, обход по ключу без OFFSET"""
+        if component_ids is None:
+            query = text("""
+                SELECT id FROM configurations
+                WHERE id > :last_id
+                ORDER BY id
+                LIMIT :limit
+            """)
+            params = {}
+        else:
+            query = text("""
+                SELECT DISTINCT configuration_id FROM configuration_items
+                WHERE component_id = ANY(:component_ids)
+                  AND configuration_id > :last_id
+                ORDER BY configuration_id
+                LIMIT :limit
+            """)
+            params = {"component_ids": component_ids}
+
+        last_id = UUID(int=0)
+        while True:
+            batch = [row[0] for row in self.db.execute(query, {**params, "last_id": last_id, "limit": self.batch_size})]
+            # Чтение ID не держит транзакцию открытой между пачками
+            self.db.commit()
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1]
+
+    def _reprice_batch(
+        self,
+        config_ids: List[UUID],
+        component_ids: Optional[List[UUID]],
+        keep_snapshots: bool,
+        stats: dict
+    ) -> bool:
+        """Переоценить одну пачку в отдельной транзакции; False - пачка пропущена из-за блокировок"""
+        for attempt in range(settings.REPRICING_MAX_RETRIES + 1):
+            try:
+                self.db.execute(text(f"SET LOCAL lock_timeout = {int(settings.REPRICING_LOCK_TIMEOUT_MS)}"))
+
+                items = 0
+                if not keep_snapshots:
+                    component_filter = "AND ci.component_id = ANY(:component_ids)" if component_ids is not None else ""
+                    params = {"config_ids": config_ids}
+                    if component_ids is not None:
+                        params["component_ids"] = component_ids
+                    items = self.db.execute(
+                        text(_REFRESH_SNAPSHOTS_SQL.format(component_filter=component_filter)), params
+                    ).rowcount
+
+                updated = self.db.execute(_RECALCULATE_TOTALS_SQL, {"config_ids": config_ids}).rowcount
+                self.db.commit()
+            except OperationalError as e:
+                self.db.rollback()
+                if getattr(e.orig, "pgcode", None) != _LOCK_NOT_AVAILABLE:
+                    raise
+                stats["retries"] += 1
+                logger.warning(
+                    f"Переоценка: пачка из {len(config_ids)} конфигураций заблокирована, попытка {attempt + 1}"
+                )
+                time.sleep(0.1 * (attempt + 1))
+                continue
+
+            stats["items"] += items
+            stats["updated"] += updated
+            return True
+
+        return False
+
+    def _build_result(self, stats: dict, skipped: List[UUID], started: float) -> ConfigurationRepriceResult:
+        return ConfigurationRepriceResult(
+            configurations_checked=stats["checked"],
+            configurations_updated=stats["updated"],
+            items_repriced=stats["items"],
+            batches=stats["batches"],
+            lock_retries=stats["retries"],
+            skipped_configuration_ids=skipped,
+            elapsed_seconds=round(time.perf_counter() - started, 3)
+        )
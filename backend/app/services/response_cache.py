@@ -0,0 +1,191 @@
+"""
+Кэш готовых ответов с заранее сжатыми телами.
+
+Редко меняющиеся ответы (категории, варианты фильтров, публичные конфигурации)
+сериализуются и сжимаются всеми поддерживаемыми кодировками один раз при
+заполнении записи (уровни RESPONSE_CACHE_GZIP_LEVEL, RESPONSE_CACHE_BROTLI_QUALITY);
+запрос получает готовые байты под свой Accept-Encoding. При выключенном кэше
+ответ отдается без сжатия, его сжимает CompressionMiddleware с обычными уровнями.
+
+Записи помечены тегами и сбрасываются:
+- "catalog" - после импорта каталога, синхронизации наличия и изменения компонентов,
+  категорий и наличия через ORM;
+- "configuration:<id>" - после коммита изменений конфигурации, ее позиций и аксессуаров через ORM.
+Массовые обновления в обход ORM (переоценка, пересчет доступности) ограничены
+временем жизни записи RESPONSE_CACHE_TTL_SECONDS
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Union
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..compression import SUPPORTED_ENCODINGS, compress, negotiate_encoding
+from ..config import settings
+from ..models import (
+    Component, ComponentCategory, ComponentStock, Configuration, ConfigurationAccessory, ConfigurationItem
+)
+
+CATALOG_TAG = "catalog"
+
+# Теги записи: список или функция от построенного содержимого (когда ID известен только после выборки)
+Tags = Union[Iterable[str], Callable[[Any], Iterable[str]]]
+
+# Сжатие выполняется один раз на заполнение записи
+_PRECOMPRESS_LEVELS = {"gzip": settings.RESPONSE_CACHE_GZIP_LEVEL, "br": settings.RESPONSE_CACHE_BROTLI_QUALITY}
+
+
+def configuration_tag(configuration_id: Any) -> str:
+    return f"configuration:{configuration_id}"
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    media_type: str
+    encoded: Dict[str, bytes]  # Кодировка -> сжатое тело
+    tags: FrozenSet[str]
+    expires_at: float
+
+
+class ResponseCache:
+    """Записи по ключу (без префикса API), не больше max_entries, самые старые вытесняются"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int, minimum_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.minimum_size = minimum_size
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def encode(self, content: Any, tags: Tags, precompress: bool = True) -> CachedResponse:
+        """
+        Сериализовать content в JSON и сжать всеми поддерживаемыми кодировками
+        (precompress=False - без сжатия, для ответов, которые не сохраняются)
+        """
+        if callable(tags):
+            tags = tags(content)
+        body = orjson.dumps(jsonable_encoder(content))
+        encoded = {}
+        if precompress and len(body) >= self.minimum_size:
+            for encoding in SUPPORTED_ENCODINGS:
+                compressed = compress(body, encoding, _PRECOMPRESS_LEVELS[encoding])
+                if len(compressed) < len(body):
+                    encoded[encoding] = compressed
+        return CachedResponse(
+            body=body,
+            media_type="application/json",
+            encoded=encoded,
+            tags=frozenset(tags),
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+
+    def put(self, key: str, entry: CachedResponse, generation: int) -> bool:
+        """
+        Сохранить запись, если с момента generation (снят до построения ответа)
+        не было сброса: иначе ответ мог быть собран из уже устаревших данных
+        """
+        with self._lock:
+            if generation != self._generation:
+                return False
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, *tags: str) -> int:
+        """Удалить записи с любым из тегов; возвращает число удаленных"""
+        wanted = set(tags)
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, entry in self._entries.items() if entry.tags & wanted]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def respond(self, request: Request, key: str, tags: Tags, build: Callable[[], Any]) -> Response:
+        """
+        Ответ из кэша (X-Cache: hit) или построенный build() и сохраненный (X-Cache: miss).
+        Тело отдается сжатым под Accept-Encoding запроса, если запись достаточно велика
+        """
+        if not settings.RESPONSE_CACHE_ENABLED:
+            # Ответ не сохраняется: сжимать его заранее всеми кодировками незачем
+            entry, status = self.encode(build(), tags, precompress=False), "bypass"
+        else:
+            entry, status = self.get(key), "hit"
+            if entry is None:
+                generation = self._generation
+                entry, status = self.encode(build(), tags), "miss"
+                self.put(key, entry, generation)
+
+        headers = {"vary": "Accept-Encoding", "x-cache": status}
+        body = entry.body
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        if encoding in entry.encoded:
+            body = entry.encoded[encoding]
+            headers["content-encoding"] = encoding
+        return Response(content=body, media_type=entry.media_type, headers=headers)
+
+
+response_cache = ResponseCache(
+    settings.RESPONSE_CACHE_TTL_SECONDS, settings.RESPONSE_CACHE_MAX_ENTRIES, settings.COMPRESSION_MIN_SIZE
+)
+
+
+def invalidate_catalog_responses(*_args) -> None:
+    """Сбросить ответы, зависящие от каталога (подходит как обработчик изменения наличия)"""
+    response_cache.invalidate(CATALOG_TAG)
+
+
+_CATALOG_MODELS = (Component, ComponentCategory, ComponentStock)
+_CHANGED_TAGS_KEY = "response_cache_tags"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_tags(session, flush_context):
+    tags = session.info.setdefault(_CHANGED_TAGS_KEY, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, _CATALOG_MODELS):
+            tags.add(CATALOG_TAG)
+        elif isinstance(obj, Configuration):
+            tags.add(configuration_tag(obj.id))
+        elif isinstance(obj, (ConfigurationItem, ConfigurationAccessory)):
+            tags.add(configuration_tag(obj.configuration_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed(session):
+    tags = session.info.pop(_CHANGED_TAGS_KEY, None)
+    if tags:
+        response_cache.invalidate(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed(session):
+    session.info.pop(_CHANGED_TAGS_KEY, None)
@@ -0,0 +1,144 @@
+import time
+import logging
+from typing import Callable, List, Set
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ..config import settings
+from ..schemas.stock import StockSnapshot, StockSyncResult
+from .bulk import copy_rows
+from ..monitoring.metrics import timed_job
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = "stock_sync_staging"
+STAGING_COLUMNS = ("component_id", "status", "quantity", "expected_date")
+
+# Подписчики на изменения наличия: получают множество ID затронутых компонентов
+_stock_change_listeners: List[Callable[[Set[UUID]], None]] = []
+
+
+def register_stock_change_listener(listener: Callable[[Set[UUID]], None]) -> None:
+    """Подписаться на изменения наличия (вызывается после коммита синхронизации)"""
+    if listener not in _stock_change_listeners:
+        _stock_change_listeners.append(listener)
+
+
+def notify_stock_changed(component_ids: Set[UUID]) -> None:
+    """Оповестить подписчиков об изменении наличия компонентов"""
+    if not component_ids:
+        return
+    for listener in _stock_change_listeners:
+        try:
+            listener(component_ids)
+        except Exception as e:
+            logger.error(f"Ошибка обработчика изменения наличия: {e}", exc_info=True)
+
+
+class StockSyncService:
+    """
+    Синхронизация наличия со снимками складов.
+    Снимок загружается через COPY во временную таблицу, сравнивается с component_stock
+    одним запросом на каждый тип изменения, и в одной транзакции применяются только
+    реально изменившиеся строки
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @timed_job("stock_sync")
+    def sync(self, snapshot: StockSnapshot) -> StockSyncResult:
+        """Применить полный или частичный снимок наличия"""
+        started = time.perf_counter()
+
+        # Повторы одного компонента в снимке: побеждает последняя запись
+        items = {item.component_id: item for item in snapshot.items}
+
+        self.db.execute(text(f"""
+            CREATE TEMP TABLE {STAGING_TABLE} (
+                component_id uuid PRIMARY KEY,
+                status varchar(20) NOT NULL,
+                quantity integer NOT NULL,
+                expected_date date
+            ) ON COMMIT DROP
+        """))
+        copy_rows(self.db, STAGING_TABLE, STAGING_COLUMNS, (
+            (item.component_id, item.status.value, item.quantity, item.expected_date)
+            for item in items.values()
+        ))
+
+        unknown_ids = [row[0] for row in self.db.execute(text(f"""
+            DELETE FROM {STAGING_TABLE} s
+            WHERE NOT EXISTS (SELECT 1 FROM components c WHERE c.id = s.component_id)
+            RETURNING s.component_id
+        """))]
+
+        if snapshot.full:
+            known_fraction = (len(items) - len(unknown_ids)) / len(items)
+            if known_fraction < settings.STOCK_SYNC_FULL_MIN_KNOWN_FRACTION or len(unknown_ids) == len(items):
+                self.db.rollback()
+                raise ValueError(
+                    f"Полный снимок отклонен: известно {len(items) - len(unknown_ids)} из {len(items)} компонентов, "
+                    f"нужно не меньше {settings.STOCK_SYNC_FULL_MIN_KNOWN_FRACTION:.0%}"
+                )
+
+        updated_ids = {row[0] for row in self.db.execute(text(f"""
+            UPDATE component_stock cs
+            SET status = s.status,
+                quantity = s.quantity,
+                expected_date = s.expected_date,
+                updated_at = now()
+            FROM {STAGING_TABLE} s
+            WHERE cs.component_id = s.component_id
+              AND (cs.status, cs.quantity, cs.expected_date)
+                  IS DISTINCT FROM
+                  (s.status, s.quantity, s.expected_date)
+            RETURNING cs.component_id
+        """))}
+
+        inserted_ids = {row[0] for row in self.db.execute(text(f"""
+            INSERT INTO component_stock (id, component_id, status, quantity, expected_date, updated_at)
+            SELECT gen_random_uuid(), s.component_id, s.status, s.quantity, s.expected_date, now()
+            FROM {STAGING_TABLE} s
+            WHERE NOT EXISTS (SELECT 1 FROM component_stock cs WHERE cs.component_id = s.component_id)
+            RETURNING component_id
+        """))}
+
+        zeroed_ids = set()
+        if snapshot.full:
+            # Всё, чего нет в полном снимке, отсутствует на складе
+            zeroed_ids = {row[0] for row in self.db.execute(text(f"""
+                UPDATE component_stock cs
+                SET status = 'out_of_stock',
+                    quantity = 0,
+                    expected_date = NULL,
+                    updated_at = now()
+                WHERE NOT EXISTS (SELECT 1 FROM {STAGING_TABLE} s WHERE s.component_id = cs.component_id)
+                  AND (cs.status, cs.quantity, cs.expected_date)
+                      IS DISTINCT FROM
+                      ('out_of_stock', 0, NULL::date)
+                RETURNING cs.component_id
+            """))}
+
+        self.db.commit()
+
+        affected_ids = updated_ids | inserted_ids | zeroed_ids
+        notify_stock_changed(affected_ids)
+
+        elapsed = time.perf_counter() - started
+        known_count = len(items) - len(unknown_ids)
+        logger.info(
+            f"Синхронизация наличия: получено {len(items)}, изменено {len(affected_ids)} "
+            f"за {elapsed:.3f}с"
+        )
+
+        return StockSyncResult(
+            received=len(snapshot.items),
+            inserted=len(inserted_ids),
+            updated=len(updated_ids),
+            zeroed=len(zeroed_ids),
+            unchanged=known_count - len(updated_ids) - len(inserted_ids),
+            unknown_component_ids=unknown_ids,
+            affected_component_ids=sorted(affected_ids, key=str),
+            elapsed_seconds=round(elapsed, 3)
+        )
@@ -0,0 +1 @@
+"""Бенчмарки горячих путей бэкенда конфигуратора ПК"""
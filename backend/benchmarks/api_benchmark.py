@@ -0,0 +1,253 @@
+"""
+Бенчмарк основных сценариев API на синтетическом каталоге.
+
+Каталог заданного размера загружается в БД из DATABASE_URL генератором данных
+(повторный запуск с тем же размером переиспользует его), затем каждый сценарий выполняется через
+TestClient в процессе: сериализация, middleware и запросы к БД учитываются,
+сеть - нет. Результат - JSON отчет; при сравнении с базовым отчетом код возврата 1,
+если медиана какого-либо сценария выросла больше допустимого.
+
+Запуск из каталога backend:
+    python -m benchmarks.api_benchmark --size 10000 --iterations 50 --output report.json
+    python -m benchmarks.api_benchmark --size 10000 --baseline report.json --max-regression 0.2
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.main import app
+from app.models import Configuration
+from benchmarks.seed import seed_catalog, seeded_in_stock
+
+BENCHMARK_CONFIGURATION_PREFIX = "Бенчмарк"
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compatible_build(db) -> List[UUID]:
+    """Совместимая сборка из каталога бенчмарка: сокет, память и форм-фактор согласованы"""
+    cpus = seeded_in_stock(db, "cpu", 200)
+    boards = seeded_in_stock(db, "motherboard", 500)
+    memory = seeded_in_stock(db, "ram", 500)
+    cases = seeded_in_stock(db, "case", 200)
+    psus = sorted(seeded_in_stock(db, "psu", 200), key=lambda c: -(c.specifications or {}).get("wattage", 0))
+
+    for cpu in cpus:
+        socket = cpu.specifications.get("socket")
+        for board in boards:
+            if board.specifications.get("socket") != socket:
+                continue
+            ram = next((r for r in memory if r.specifications.get("memory_type") in board.specifications.get("memory_type", [])), None)
+            case = next((c for c in cases if board.form_factor in c.specifications.get("supported_form_factors", [])), None)
+            if ram and case and psus:
+                extra = seeded_in_stock(db, "gpu", 1) + seeded_in_stock(db, "storage", 1)
+                return [cpu.id, board.id, ram.id, case.id, psus[0].id] + [c.id for c in extra]
+
+    raise RuntimeError("В каталоге бенчмарка нет совместимой сборки, увеличьте --size")
+
+
+class Scenario:
+    def __init__(self, name: str, request: Callable[[int], object]):
+        self.name = name
+        self.request = request
+
+
+def _scenarios(client: TestClient, build: List[UUID], configuration_id: UUID, public_uuid: str, scratch_id: UUID,
+               pdf: bytes, storage_ids: List[UUID]) -> List[Scenario]:
+    ids = [str(component_id) for component_id in build]
+    categories = ["cpu", "motherboard", "ram", "gpu", "storage"]
+
+    return [
+        Scenario("components_list", lambda i: client.get("/api/v1/components", params={
+            "category_slug": categories[i % len(categories)], "only_in_stock": True,
+            "price_max": 100000, "page": i % 5 + 1, "limit": 20,
+        })),
+        Scenario("components_list_specs", lambda i: client.get("/api/v1/components", params={
+            "category_slug": "motherboard", "socket": ["AM5", "LGA1700"][i % 2], "memory_type": "DDR5", "limit": 20,
+        })),
+        Scenario("components_page_100", lambda i: client.get("/api/v1/components", params={
+            "page": i % 10 + 1, "limit": 100,
+        })),
+        Scenario("components_search", lambda i: client.get("/api/v1/components", params={
+            "search": f"GPU {i % 100}", "limit": 20,
+        })),
+        Scenario("filter_options", lambda i: client.get("/api/v1/components/filters/options", params={
+            "category_slug": categories[i % len(categories)],
+        })),
+        Scenario("compatibility_check", lambda i: client.post("/api/v1/components/check-compatibility", json=ids)),
+        Scenario("configuration_add_item", lambda i: client.post(f"/api/v1/configurations/{scratch_id}/items", json={
+            "component_id": str(storage_ids[i % len(storage_ids)]), "quantity": 1,
+        })),
+        Scenario("configuration_read", lambda i: client.get(f"/api/v1/configurations/{configuration_id}")),
+        Scenario("configuration_public", lambda i: client.get(f"/api/v1/configurations/uuid/{public_uuid}")),
+        Scenario("pdf_export", lambda i: client.get(f"/api/v1/configurations/{configuration_id}/export/pdf")),
+        Scenario("pdf_import", lambda i: client.post("/api/v1/configurations/import-pdf", files={
+            "file": ("configuration.pdf", pdf, "application/pdf"),
+        })),
+    ]
+
+
+def _measure(scenario: Scenario, iterations: int, warmup: int) -> Dict:
+    for i in range(warmup):
+        scenario.request(i)
+
+    samples: List[float] = []
+    queries: List[int] = []
+    errors = 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        request_started = time.perf_counter()
+        response = scenario.request(i)
+        samples.append((time.perf_counter() - request_started) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+        # Счетчик SQL запросов отдается в заголовке в режиме DEBUG
+        query_count = response.headers.get("x-db-query-count")
+        if query_count is not None:
+            queries.append(int(query_count))
+    total = time.perf_counter() - started
+
+    result = {
+        "iterations": iterations,
+        "errors": errors,
+        "mean_ms": round(statistics.mean(samples), 3),
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(_percentile(samples, 0.95), 3),
+        "p99_ms": round(_percentile(samples, 0.99), 3),
+        "max_ms": round(max(samples), 3),
+        "requests_per_sec": round(iterations / total, 1),
+    }
+    if queries:
+        result["db_queries_mean"] = round(statistics.mean(queries), 1)
+    return result
+
+
+def _create_configuration(client: TestClient, name: str, component_ids: List[UUID]) -> UUID:
+    response = client.post("/api/v1/configurations", json={"name": name})
+    response.raise_for_status()
+    configuration_id = response.json()["id"]
+    for component_id in component_ids:
+        client.post(f"/api/v1/configurations/{configuration_id}/items", json={
+            "component_id": str(component_id), "quantity": 1,
+        }).raise_for_status()
+    return configuration_id
+
+
+def _cleanup_configurations(client: TestClient) -> None:
+    with SessionLocal() as db:
+        ids = [row.id for row in db.query(Configuration.id).filter(
+            Configuration.name.like(f"{BENCHMARK_CONFIGURATION_PREFIX}%")
+        )]
+    for configuration_id in ids:
+        client.delete(f"/api/v1/configurations/{configuration_id}")
+
+
+def run(size: int, iterations: int, warmup: int, seed: int, only: Optional[List[str]] = None) -> Dict:
+    with SessionLocal() as db:
+        seed_stats = seed_catalog(db, size, seed)
+        build = _compatible_build(db)
+        storage_ids = [c.id for c in seeded_in_stock(db, "storage", 50)]
+
+    results: Dict[str, Dict] = {}
+    with TestClient(app) as client:
+        try:
+            configuration_id = _create_configuration(client, f"{BENCHMARK_CONFIGURATION_PREFIX}: сборка", build)
+            scratch_id = _create_configuration(client, f"{BENCHMARK_CONFIGURATION_PREFIX}: добавление", [])
+            public_uuid = client.get(f"/api/v1/configurations/{configuration_id}").json()["public_uuid"]
+            pdf = client.get(f"/api/v1/configurations/{configuration_id}/export/pdf").content
+
+            for scenario in _scenarios(client, build, configuration_id, public_uuid, scratch_id, pdf, storage_ids):
+                if only and scenario.name not in only:
+                    continue
+                results[scenario.name] = _measure(scenario, iterations, warmup)
+                print(f"{scenario.name}: p50 {results[scenario.name]['p50_ms']} мс", file=sys.stderr)
+        finally:
+            _cleanup_configurations(client)
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "catalog_size": size,
+            "seed": seed,
+            "iterations": iterations,
+            "warmup": warmup,
+            "seeding": seed_stats,
+        },
+        "results": results,
+    }
+
+
+def compare(report: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """Сценарии, медиана которых выросла больше чем на max_regression (доля) относительно базового отчета"""
+    regressions = []
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("p50_ms"):
+            continue
+        ratio = result["p50_ms"] / base["p50_ms"]
+        result["baseline_p50_ms"] = base["p50_ms"]
+        result["p50_change"] = round(ratio - 1, 3)
+        if ratio > 1 + max_regression:
+            regressions.append(f"{name}: p50 {base['p50_ms']} -> {result['p50_ms']} мс (+{(ratio - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк сценариев API на синтетическом каталоге")
+    parser.add_argument("--size", type=int, default=1000, help="Размер каталога (1000, 10000, 100000)")
+    parser.add_argument("--iterations", type=int, default=50, help="Запросов на сценарий")
+    parser.add_argument("--warmup", type=int, default=5, help="Прогревочных запросов на сценарий")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора каталога")
+    parser.add_argument("--scenario", action="append", help="Запустить только указанные сценарии")
+    parser.add_argument("--output", help="Файл для JSON отчета (по умолчанию stdout)")
+    parser.add_argument("--baseline", help="Базовый отчет для сравнения")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Допустимый рост медианы (доля)")
+    args = parser.parse_args()
+
+    report = run(args.size, args.iterations, args.warmup, args.seed, args.scenario)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        report["regressions"] = regressions
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    for line in regressions:
+        print(f"Регрессия: {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Бенчмарк парсера текста импортируемых конфигураций на синтетическом прайсе.
+
+Запуск из каталога backend:
+    python -m benchmarks.parser_benchmark --lines 1000 --repeat 50
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import List
+
+from app.services.pdf_import_service import PDFImportService
+
+CATEGORY_HEADERS = [
+    "Процессоры", "Материнские платы", "Оперативная память", "Видеокарты",
+    "Накопители", "Блоки питания", "Корпуса", "Охлаждение"
+]
+BRANDS = ["AMD", "Intel", "ASUS", "MSI", "GIGABYTE", "Kingston", "Corsair", "NZXT", "Samsung", "be-quiet"]
+SERVICE_LINES = ["Количество: 1", "Наличие: В наличии", "Характеристики: socket AM5 | cores 8", "Модель: X-100"]
+
+
+def build_synthetic_quote(lines_count: int, seed: int = 42) -> str:
+    """Синтетический прайс поставщика: заголовки категорий, строки товаров, служебные строки и дубликаты"""
+    rng = random.Random(seed)
+    lines: List[str] = ["Конфигурация: Синтетический прайс", "Дата: 01.01.2025", "Статус: Совместимо"]
+    produced = []
+
+    while len(lines) < lines_count:
+        roll = rng.random()
+        if roll < 0.05:
+            lines.append(rng.choice(CATEGORY_HEADERS))
+        elif roll < 0.25:
+            lines.append(rng.choice(SERVICE_LINES))
+        elif roll < 0.30 and produced:
+            # Повтор уже встречавшейся позиции
+            lines.append(rng.choice(produced))
+        else:
+            price = rng.randint(1000, 200000)
+            line = f"{rng.choice(BRANDS)} Model-{rng.randint(1, 5000)} Series {rng.randint(1, 9)} ₽{price:,}"
+            produced.append(line)
+            lines.append(line)
+
+    return "\n".join(lines[:lines_count])
+
+
+def run(lines_count: int, repeat: int) -> dict:
+    service = PDFImportService(db=None)
+    text = build_synthetic_quote(lines_count)
+
+    # Прогрев
+    parsed = service._parse_configuration_text(text)
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        service._parse_configuration_text(text)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "benchmark": "import_parser",
+        "lines": lines_count,
+        "repeat": repeat,
+        "components_found": len(parsed["components"]),
+        "mean_ms": round(statistics.mean(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "lines_per_sec": round(lines_count / (statistics.median(samples) / 1000)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк парсера импортируемых конфигураций")
+    parser.add_argument("--lines", type=int, default=1000, help="Количество строк синтетического прайса")
+    parser.add_argument("--repeat", type=int, default=50, help="Количество повторов")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.lines, args.repeat), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
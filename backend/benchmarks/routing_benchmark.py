@@ -0,0 +1,140 @@
+"""
+Бенчмарк поиска маршрута на запрос.
+
+Starlette перебирает таблицу маршрутов по порядку, пока маршрут не совпадет
+полностью. Сравниваются две раскладки для одних и тех же запросов фронтенда
+(с префиксом /api/v1 и без):
+- duplicate: роутеры подключены дважды, с префиксом и без (как было раньше);
+- rewrite: роутеры подключены один раз, пути без префикса переписываются
+  ApiPrefixRewriteMiddleware (стоимость переписывания входит в замер).
+БД не нужна: замеряется только сопоставление путей.
+
+Запуск из каталога backend:
+    python -m benchmarks.routing_benchmark --iterations 20000
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import FastAPI
+from starlette.routing import Match
+
+from app.main import app
+from app.routers import accessories, categories, compatibility, components, configurations, stock
+from app.routing import ApiPrefixRewriteMiddleware, find_shadowed_routes
+
+ROUTER_MODULES = (categories, components, configurations, accessories, stock, compatibility)
+
+_ID = "0b5e1c4e-8a4f-4d7e-9a59-3d2f4a1c6b7e"
+
+# Запросы фронтенда и внешних клиентов; последний не совпадает ни с одним маршрутом
+REQUESTS: Tuple[Tuple[str, str], ...] = (
+    ("GET", "/components"),
+    ("GET", f"/components/{_ID}"),
+    ("GET", "/components/category/cpu"),
+    ("GET", "/components/filters/options"),
+    ("POST", "/components/check-compatibility"),
+    ("GET", "/categories"),
+    ("GET", "/accessories"),
+    ("GET", "/accessories/categories"),
+    ("GET", f"/configurations/{_ID}"),
+    ("POST", f"/configurations/{_ID}/items"),
+    ("POST", "/configurations/import-pdf"),
+    ("GET", "/health"),
+    ("GET", "/api/v1/components"),
+    ("GET", f"/api/v1/configurations/{_ID}/export/pdf"),
+    ("GET", "/api/v1/stock/availability/metrics"),
+    ("GET", "/favicon.ico"),
+)
+
+
+def _duplicate_routes() -> List:
+    """Таблица маршрутов прежней раскладки: каждый роутер с префиксом и без"""
+    legacy = FastAPI()
+    for module in ROUTER_MODULES:
+        legacy.include_router(module.router, prefix="/api/v1")
+    for module in ROUTER_MODULES:
+        legacy.include_router(module.router)
+    own = [route for route in app.routes if getattr(route, "path", "") in ("/", "/health", "/metrics")]
+    return legacy.router.routes + own
+
+
+def _rewrite() -> ApiPrefixRewriteMiddleware:
+    for middleware in app.user_middleware:
+        if middleware.cls is ApiPrefixRewriteMiddleware:
+            return ApiPrefixRewriteMiddleware(None, **middleware.options)
+    raise RuntimeError("ApiPrefixRewriteMiddleware не подключен в app.main")
+
+
+def _scope(method: str, path: str) -> Dict:
+    return {"type": "http", "method": method, "path": path, "raw_path": path.encode(), "root_path": "", "headers": []}
+
+
+def _lookup(routes: List, scope: Dict) -> Tuple[Optional[str], int]:
+    """Поиск как в starlette.routing.Router: первый полный матч; (шаблон, число проверенных маршрутов)"""
+    for scanned, route in enumerate(routes, 1):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", None), scanned
+    return None, len(routes)
+
+
+def _measure(routes: List, rewrite: Optional[ApiPrefixRewriteMiddleware], iterations: int) -> Dict:
+    per_request = {}
+    for method, path in REQUESTS:
+        samples = []
+        for _ in range(5):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                scope = _scope(method, path)
+                if rewrite is not None:
+                    rewrite.rewrite(scope)
+                _lookup(routes, scope)
+            samples.append((time.perf_counter() - started) / iterations * 1e6)
+
+        scope = _scope(method, path)
+        if rewrite is not None:
+            rewrite.rewrite(scope)
+        matched, scanned = _lookup(routes, scope)
+        per_request[f"{method} {path}"] = {
+            "us": round(min(samples), 3),
+            "routes_scanned": scanned,
+            "matched": matched,
+        }
+
+    return {
+        "routes": len(routes),
+        "mean_us": round(statistics.mean(r["us"] for r in per_request.values()), 3),
+        "mean_routes_scanned": round(statistics.mean(r["routes_scanned"] for r in per_request.values()), 1),
+        "requests": per_request,
+    }
+
+
+def run(iterations: int) -> Dict:
+    duplicate = _measure(_duplicate_routes(), None, iterations)
+    rewrite = _measure(list(app.routes), _rewrite(), iterations)
+    for name, result in (("duplicate", duplicate), ("rewrite", rewrite)):
+        print(f"{name}: {result['routes']} маршрутов, {result['mean_us']} мкс на запрос", file=sys.stderr)
+
+    return {
+        "meta": {"iterations": iterations},
+        "results": {"duplicate": duplicate, "rewrite": rewrite},
+        "speedup": round(duplicate["mean_us"] / rewrite["mean_us"], 2),
+        "shadowed_routes": find_shadowed_routes(app.routes),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска маршрута на запрос")
+    parser.add_argument("--iterations", type=int, default=20000, help="Повторов поиска на запрос")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.iterations), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
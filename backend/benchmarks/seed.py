@@ -0,0 +1,45 @@
+"""
+Синтетический каталог для бенчмарков.
+
+Каталог строит генератор данных (app.services.data_generator) с префиксом моделей
+BENCH-: повторный запуск того же размера переиспользует уже загруженный каталог,
+другой размер - пересоздает его.
+"""
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models import Component, ComponentCategory, ComponentStock
+from app.services.data_generator import DataGenerator
+
+MODEL_PREFIX = "BENCH-"
+
+
+def seed_catalog(db: Session, size: int, seed: int = 42) -> Optional[Dict]:
+    """Подготовить каталог из size компонентов; None - подходящий каталог уже загружен"""
+    if count_seeded(db) == size:
+        return None
+    generator = DataGenerator(db, seed=seed, prefix=MODEL_PREFIX)
+    generator.purge()
+    return generator.generate_catalog(size)
+
+
+def count_seeded(db: Session) -> int:
+    return db.query(Component).filter(Component.model.like(f"{MODEL_PREFIX}%")).count()
+
+
+def seeded_in_stock(db: Session, category: str, limit: int) -> List[Component]:
+    """Компоненты каталога бенчмарка в наличии, для сборки тестовых конфигураций"""
+    return (
+        db.query(Component)
+        .join(ComponentCategory)
+        .join(ComponentStock)
+        .filter(
+            Component.model.like(f"{MODEL_PREFIX}%"),
+            Component.is_active == True,
+            ComponentCategory.slug == category,
+            ComponentStock.status == "in_stock",
+        )
+        .limit(limit)
+        .all()
+    )
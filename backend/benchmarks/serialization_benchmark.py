@@ -0,0 +1,143 @@
+"""
+Бенчмарк выдачи страниц списка компонентов по 100 штук.
+
+Сравниваются два пути для одной и той же страницы каталога бенчмарка:
+- orm_pydantic: ORM объекты с joinedload категории и наличия, валидация
+  List[ComponentResponse], jsonable_encoder и json.dumps (как было до ORJSONResponse);
+- projection_orjson: SELECT колонок (component_projection), словари и orjson;
+- card_orjson: то же с набором полей card (fields=card).
+
+Для каждого пути отдельно замеряются выборка из БД, сериализация и их сумма.
+
+Запуск из каталога backend:
+    python -m benchmarks.serialization_benchmark --size 10000 --pages 50
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, joinedload
+
+from app.database import SessionLocal
+from app.models import Component
+from app.schemas.component import ComponentResponse
+from app.services.component_projection import (
+    CARD_PROJECTION, FULL_PROJECTION, ComponentListResponse, ComponentProjection
+)
+from benchmarks.api_benchmark import _percentile
+from benchmarks.seed import MODEL_PREFIX, seed_catalog
+
+PAGE_SIZE = 100
+
+_components_adapter = TypeAdapter(List[ComponentResponse])
+
+
+def _fetch_orm(db: Session, offset: int) -> List[Component]:
+    return (
+        db.query(Component)
+        .options(joinedload(Component.category), joinedload(Component.stock))
+        .filter(Component.is_active == True, Component.model.like(f"{MODEL_PREFIX}%"))
+        .order_by(Component.id)
+        .offset(offset)
+        .limit(PAGE_SIZE)
+        .all()
+    )
+
+
+def _serialize_orm(components: List[Component]) -> bytes:
+    content = jsonable_encoder(_components_adapter.validate_python(components))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _projection_fetcher(projection: ComponentProjection) -> Callable:
+    def fetch(db: Session, offset: int) -> List[tuple]:
+        return (
+            projection.query(db)
+            .filter(Component.is_active == True, Component.model.like(f"{MODEL_PREFIX}%"))
+            .order_by(Component.id)
+            .offset(offset)
+            .limit(PAGE_SIZE)
+            .all()
+        )
+    return fetch
+
+
+def _projection_serializer(projection: ComponentProjection) -> Callable:
+    return lambda rows: ComponentListResponse(projection.to_dicts(rows)).body
+
+
+def _measure(db: Session, fetch: Callable, serialize: Callable, pages: int, page_count: int) -> Dict:
+    fetch_ms: List[float] = []
+    serialize_ms: List[float] = []
+    payload = 0
+    for i in range(pages):
+        # Сессия очищается, чтобы ORM путь не брал объекты из identity map
+        db.expunge_all()
+        started = time.perf_counter()
+        data = fetch(db, (i % page_count) * PAGE_SIZE)
+        fetched = time.perf_counter()
+        body = serialize(data)
+        finished = time.perf_counter()
+        fetch_ms.append((fetched - started) * 1000)
+        serialize_ms.append((finished - fetched) * 1000)
+        payload = len(body)
+
+    total_ms = [a + b for a, b in zip(fetch_ms, serialize_ms)]
+    return {
+        "fetch_p50_ms": round(statistics.median(fetch_ms), 3),
+        "serialize_p50_ms": round(statistics.median(serialize_ms), 3),
+        "total_p50_ms": round(statistics.median(total_ms), 3),
+        "total_p95_ms": round(_percentile(total_ms, 0.95), 3),
+        "page_bytes": payload,
+    }
+
+
+def run(size: int, pages: int, warmup: int, seed: int) -> Dict:
+    results: Dict[str, Dict] = {}
+    with SessionLocal() as db:
+        seed_catalog(db, size, seed)
+        page_count = max(1, size // PAGE_SIZE)
+
+        for name, fetch, serialize in (
+            ("orm_pydantic", _fetch_orm, _serialize_orm),
+            ("projection_orjson", _projection_fetcher(FULL_PROJECTION), _projection_serializer(FULL_PROJECTION)),
+            ("card_orjson", _projection_fetcher(CARD_PROJECTION), _projection_serializer(CARD_PROJECTION)),
+        ):
+            _measure(db, fetch, serialize, warmup, page_count)
+            results[name] = _measure(db, fetch, serialize, pages, page_count)
+            print(f"{name}: p50 {results[name]['total_p50_ms']} мс", file=sys.stderr)
+
+    base = results["orm_pydantic"]
+    return {
+        "meta": {"catalog_size": size, "page_size": PAGE_SIZE, "pages": pages, "seed": seed},
+        "results": results,
+        "speedup": {
+            name: {
+                "serialize": round(base["serialize_p50_ms"] / result["serialize_p50_ms"], 2),
+                "total": round(base["total_p50_ms"] / result["total_p50_ms"], 2),
+                "page_bytes": round(result["page_bytes"] / base["page_bytes"], 3),
+            }
+            for name, result in results.items() if name != "orm_pydantic"
+        },
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарк сериализации страниц списка компонентов")
+    parser.add_argument("--size", type=int, default=1000, help="Размер каталога")
+    parser.add_argument("--pages", type=int, default=50, help="Страниц на вариант")
+    parser.add_argument("--warmup", type=int, default=5, help="Прогревочных страниц на вариант")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора каталога")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.size, args.pages, args.warmup, args.seed), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,6 +25,9 @@ echo "Подключение к базе: $DATABASE_URL"
 echo "Запуск миграций Alembic..."
 alembic upgrade head
 
+# Секции истории цен на ближайшие месяцы
+python -m app.cli ensure-price-partitions
+
 # Проверяем, есть ли данные в таблице component_categories
 echo "Проверка наличия начальных данных..."
 CATEGORY_COUNT=$(psql "$DATABASE_URL" -t -c "SELECT COUNT(*) FROM component_categories;" 2>/dev/null || echo "0")
@@ -37,6 +40,12 @@ else
     echo "Начальные данные уже присутствуют (найдено $CATEGORY_COUNT категорий), пропускаем инициализацию."
 fi
 
+# Массовая загрузка каталога из фида поставщика (повторный запуск безопасен: upsert по категории, бренду и модели)
+if [ -n "$CATALOG_SEED_FILE" ]; then
+    echo "Загрузка каталога из $CATALOG_SEED_FILE..."
+    python -m app.cli import-catalog "$CATALOG_SEED_FILE"
+fi
+
 echo "Инициализация базы данных завершена!"
 echo "Запуск приложения..."
 exec "$@" 
\ No newline at end of file
@@ -0,0 +1,35 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.database import engine
+
+
+@pytest.fixture
+def db():
+    """Сессия в транзакции, которая откатывается после теста; без доступной БД тест пропускается"""
+    try:
+        connection = engine.connect()
+    except OperationalError as e:
+        pytest.skip(f"БД недоступна: {e.orig}")
+    transaction = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def client(db):
+    """TestClient, обработчики которого работают в транзакции фикстуры db (без запуска фоновых задач)"""
+    from fastapi.testclient import TestClient
+    from app.database import get_db
+    from app.main import app
+
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
@@ -0,0 +1,46 @@
+import itertools
+import pytest
+from app.services.pdf_import_service import PDFImportService, _CATEGORY_PATTERNS, _match_category, _CATEGORY_BY_NAME
+
+
+def _legacy_category(line: str):
+    """Прежнее правило: первое по порядку _CATEGORY_PATTERNS название, входящее в строку"""
+    for name, slug in _CATEGORY_PATTERNS.items():
+        if name.lower() in line.lower():
+            return slug
+    return None
+
+
+def _category(line: str):
+    name = _match_category(line.lower())
+    return _CATEGORY_BY_NAME[name] if name else None
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("Cooling for SSD", "storage"),
+    ("Блок питания для GPU", "gpu"),
+    ("Корпус с блоком питания", "case"),
+    ("Процессоры", "cpu"),
+    ("Кулер для процессора", "cpu"),
+    ("Итого", None),
+])
+def test_ambiguous_lines_follow_pattern_order(line, expected):
+    assert _category(line) == expected == _legacy_category(line)
+
+
+def test_matches_legacy_rule_for_pairs_of_names():
+    for first, second in itertools.permutations(_CATEGORY_PATTERNS, 2):
+        line = f"{first} для {second}"
+        assert _category(line) == _legacy_category(line), line
+
+
+def test_parse_assigns_components_to_section_category():
+    text = "\n".join([
+        "Игровой ПК",
+        "Блок питания для GPU",
+        "Corsair RM850x 12 990 ₽",
+        "Cooling for SSD",
+        "Samsung 990 Pro 1TB 9 490 ₽",
+    ])
+    parsed = PDFImportService(db=None)._parse_configuration_text(text)
+    assert [(c["category"], c["brand"]) for c in parsed["components"]] == [("gpu", "Corsair"), ("storage", "Samsung")]
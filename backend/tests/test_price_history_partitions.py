@@ -0,0 +1,34 @@
+import pytest
+from sqlalchemy import text
+
+# Месяц, для которого секции заведомо нет: его строки попадают в секцию по умолчанию
+MONTH = "2099-03-01"
+PARTITION = "component_price_history_2099_03"
+
+
+def _rows(db, table: str) -> int:
+    return db.execute(text(f"""
+        SELECT count(*) FROM {table}
+        WHERE recorded_at >= DATE '2099-03-01' AND recorded_at < DATE '2099-04-01'
+    """)).scalar()
+
+
+def test_create_partition_moves_rows_from_default(db):
+    component_id = db.execute(text("SELECT id FROM components LIMIT 1")).scalar()
+    if component_id is None:
+        pytest.skip("Каталог пуст")
+    assert db.execute(text("SELECT to_regclass(:name)"), {"name": PARTITION}).scalar() is None
+
+    db.execute(text("""
+        INSERT INTO component_price_history (component_id, price, recorded_at)
+        VALUES (:id, 100, TIMESTAMPTZ '2099-03-10 12:00+00'), (:id, 110, TIMESTAMPTZ '2099-03-20 12:00+00')
+    """), {"id": component_id})
+    assert _rows(db, "component_price_history_default") == 2
+
+    created = db.execute(text("SELECT create_price_history_partition(DATE :month)"), {"month": MONTH}).scalar()
+
+    assert created == PARTITION
+    assert _rows(db, PARTITION) == 2
+    assert _rows(db, "component_price_history_default") == 0
+    # Повторный вызов не падает на существующей секции
+    assert db.execute(text("SELECT create_price_history_partition(DATE :month)"), {"month": MONTH}).scalar() == PARTITION
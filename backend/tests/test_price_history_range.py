@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.schemas.price_history import PriceHistoryBucket
+from app.services.price_history_service import PriceHistoryService
+
+# _resolve_range не обращается к БД
+service = PriceHistoryService(db=None)
+
+
+@pytest.mark.parametrize("start, end", [
+    (datetime(2026, 9, 1), datetime(2026, 10, 1)),
+    (datetime(2026, 9, 1, tzinfo=timezone.utc), datetime(2026, 10, 1, tzinfo=timezone.utc)),
+    (datetime(2026, 9, 1), datetime(2026, 10, 1, tzinfo=timezone.utc)),
+    (datetime(2026, 9, 1, tzinfo=timezone.utc), datetime(2026, 10, 1)),
+])
+def test_resolve_range_naive_bounds_are_utc(start, end):
+    resolved_start, resolved_end, bucket = service._resolve_range(start, end, None)
+    assert resolved_start == datetime(2026, 9, 1, tzinfo=timezone.utc)
+    assert resolved_end == datetime(2026, 10, 1, tzinfo=timezone.utc)
+    assert bucket == PriceHistoryBucket.DAY
+
+
+def test_resolve_range_naive_start_with_default_end():
+    start = datetime.utcnow() - timedelta(days=10)
+    resolved_start, resolved_end, _ = service._resolve_range(start, None, None)
+    assert resolved_start.tzinfo is not None
+    assert resolved_start < resolved_end
+
+
+def test_resolve_range_keeps_offset():
+    start = datetime(2026, 9, 1, 3, tzinfo=timezone(timedelta(hours=3)))
+    resolved_start, _, _ = service._resolve_range(start, datetime(2026, 10, 1), None)
+    assert resolved_start == datetime(2026, 9, 1, tzinfo=timezone.utc)
+
+
+def test_resolve_range_rejects_inverted_mixed_bounds():
+    with pytest.raises(ValueError):
+        service._resolve_range(datetime(2026, 10, 1), datetime(2026, 9, 1, tzinfo=timezone.utc), None)
@@ -0,0 +1,72 @@
+import uuid
+import pytest
+from sqlalchemy import text
+from app.config import settings
+from app.models import Configuration, ConfigurationAccessory, ConfigurationItem
+from app.monitoring.queries import QueryStats, assert_max_queries, statement_shape
+
+# Конфигурация читается тремя запросами: сама конфигурация, позиции и аксессуары
+# (компоненты, категории и наличие присоединяются к позициям и аксессуарам)
+CONFIGURATION_QUERIES = 3
+
+
+def test_statement_shape_ignores_parameter_values():
+    assert statement_shape("SELECT * FROM t WHERE id = %(id_1)s") == statement_shape("SELECT * FROM t WHERE id = %(id_2)s")
+
+
+def test_statement_shape_same_for_in_lists_of_any_length():
+    one = statement_shape("SELECT * FROM t WHERE id IN (%(id_1_1)s)")
+    three = statement_shape("SELECT * FROM t WHERE id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s)")
+    assert one == three == "SELECT * FROM t WHERE id IN (?...)"
+
+
+def test_repeated_groups_by_shape():
+    stats = QueryStats()
+    for i in range(4):
+        stats.statements[f"SELECT * FROM t WHERE id IN ({', '.join(['%(id_1_1)s'] * (i + 1))})"] += 1
+    stats.statements["SELECT 1"] += 1
+
+    assert stats.repeated(threshold=4) == [("SELECT * FROM t WHERE id IN (?...)", 4)]
+    assert stats.repeated(threshold=5) == []
+
+
+def _create_configurations(db, count: int):
+    component_ids = [row[0] for row in db.execute(text("SELECT id FROM components ORDER BY id LIMIT 3"))]
+    if len(component_ids) < 3:
+        pytest.skip("В каталоге меньше трех компонентов")
+
+    configs = []
+    for i in range(count):
+        config = Configuration(name=f"Query budget {i}", public_uuid=str(uuid.uuid4()))
+        config.items = [ConfigurationItem(component_id=component_id, quantity=1) for component_id in component_ids[:2]]
+        config.accessories = [ConfigurationAccessory(component_id=component_ids[2], quantity=1)]
+        db.add(config)
+        configs.append(config)
+    db.commit()
+    # Перечитываем созданное до замеров: после commit фикстура открывает новую точку сохранения
+    for config in configs:
+        db.refresh(config)
+    return configs
+
+
+def test_configuration_read_query_budget(db, client, monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    config = _create_configurations(db, 1)[0]
+
+    with assert_max_queries(CONFIGURATION_QUERIES):
+        response = client.get(f"/api/v1/configurations/{config.id}")
+        assert response.status_code == 200
+        assert (len(response.json()["items"]), len(response.json()["accessories"])) == (2, 1)
+
+    with assert_max_queries(CONFIGURATION_QUERIES):
+        assert client.get(f"/api/v1/configurations/uuid/{config.public_uuid}").status_code == 200
+
+
+def test_configuration_list_query_budget(db, client):
+    _create_configurations(db, 15)
+
+    # Число запросов не зависит от количества конфигураций на странице
+    with assert_max_queries(CONFIGURATION_QUERIES):
+        response = client.get("/api/v1/configurations", params={"limit": 15})
+        assert response.status_code == 200
+        assert len(response.json()) == 15
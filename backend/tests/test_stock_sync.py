@@ -0,0 +1,45 @@
+import uuid
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import text
+from app.config import settings
+from app.schemas.component import StockStatus
+from app.schemas.stock import StockSnapshot, StockSnapshotItem
+from app.services.stock_sync_service import StockSyncService
+
+
+def _item(component_id) -> StockSnapshotItem:
+    return StockSnapshotItem(component_id=component_id, status=StockStatus.IN_STOCK, quantity=5)
+
+
+def _out_of_stock(db) -> int:
+    return db.execute(text("SELECT count(*) FROM component_stock WHERE status = 'out_of_stock'")).scalar()
+
+
+def test_full_snapshot_must_not_be_empty():
+    with pytest.raises(ValidationError):
+        StockSnapshot(items=[], full=True)
+
+
+def test_full_snapshot_of_unknown_ids_is_rejected(db):
+    before = _out_of_stock(db)
+    snapshot = StockSnapshot(items=[_item(uuid.uuid4()) for _ in range(3)], full=True)
+
+    with pytest.raises(ValueError, match="Полный снимок отклонен"):
+        StockSyncService(db).sync(snapshot)
+
+    assert _out_of_stock(db) == before
+
+
+def test_full_snapshot_below_known_fraction_is_rejected(db, monkeypatch):
+    component_id = db.execute(text("SELECT id FROM components LIMIT 1")).scalar()
+    if component_id is None:
+        pytest.skip("Каталог пуст")
+    monkeypatch.setattr(settings, "STOCK_SYNC_FULL_MIN_KNOWN_FRACTION", 0.5)
+    before = _out_of_stock(db)
+    snapshot = StockSnapshot(items=[_item(component_id)] + [_item(uuid.uuid4()) for _ in range(3)], full=True)
+
+    with pytest.raises(ValueError, match="Полный снимок отклонен"):
+        StockSyncService(db).sync(snapshot)
+
+    assert _out_of_stock(db) == before
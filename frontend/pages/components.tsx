@@ -26,7 +26,7 @@ interface Component {
     name: string;
     slug: string;
   };
-  specifications: any;
+  specifications?: any;
   stock?: {
     status: 'in_stock' | 'expected' | 'out_of_stock';
     quantity: number;
@@ -61,7 +61,7 @@ export default function Components() {
       setCategories(categoriesData);
 
       // Загружаем все компоненты
-      const componentsResponse = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/components?limit=100`);
+      const componentsResponse = await fetch(`${process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'}/components?limit=100&fields=card,description`);
       const componentsData = await componentsResponse.json();
       setComponents(componentsData);
       